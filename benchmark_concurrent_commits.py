@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+동시 커밋 스트레스 벤치마크: 여러 프로세스가 하나의 스냅샷 테이블에 append
+낙관적 동시성 제어(버전 배타적 생성 + rebase) 하에서 커밋 유실이 없는지와 처리량을 측정
+"""
+
+import time
+import tempfile
+import os
+import multiprocessing
+import pandas as pd
+from src.atio.snapshot import write_snapshot, _current_version
+from src.atio.read import read_table
+
+def ingest_worker(table_dir, worker_id, commits, rows):
+    """한 프로세스가 commits번 append 커밋"""
+    for seq in range(commits):
+        df = pd.DataFrame({
+            'worker': [worker_id] * rows,
+            'seq': [seq] * rows,
+            'value': range(rows),
+        })
+        write_snapshot(df, table_dir, mode='append')
+
+def run_benchmark(workers, commits, rows):
+    """workers개 프로세스로 벤치마크 실행"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        table_dir = os.path.join(temp_dir, 'stress_table')
+        ctx = multiprocessing.get_context('spawn')
+        processes = [
+            ctx.Process(target=ingest_worker, args=(table_dir, w, commits, rows))
+            for w in range(workers)
+        ]
+
+        start_time = time.perf_counter()
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        elapsed = time.perf_counter() - start_time
+
+        failed = [p.exitcode for p in processes if p.exitcode != 0]
+        expected = workers * commits
+        committed = _current_version(table_dir)
+        result = read_table(table_dir)
+        groups = result.groupby(['worker', 'seq']).ngroups
+
+        print(f"프로세스 {workers:>2}개 x 커밋 {commits}회: "
+              f"버전 {committed}/{expected}, 배치 {groups}/{expected}, "
+              f"{elapsed:.2f}s ({expected / elapsed:.1f} commits/s)"
+              + (f", 실패한 프로세스 {len(failed)}개" if failed else ""))
+        return committed == expected and groups == expected and not failed
+
+def main():
+    """메인 함수"""
+    print("🚀 동시 커밋 스트레스 벤치마크 시작")
+    print("=" * 60)
+
+    ok = True
+    for workers in (1, 2, 4, 8, 16):
+        ok &= run_benchmark(workers, commits=20, rows=1000)
+
+    print("=" * 60)
+    print("✅ 모든 커밋이 유실 없이 반영되었습니다." if ok else "❌ 유실되거나 실패한 커밋이 있습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,8 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 import polars as pl
-from src.atio.core import write, write_snapshot
+from src.atio.core import write
+from src.atio.snapshot import write_snapshot
 
 def create_test_data(rows=100000, cols=10):
     """테스트용 데이터 생성"""
@@ -4,7 +4,12 @@ Atio: 안전한 원자적 파일 쓰기 라이브러리
 
 __version__ = "1.0.0"
 
-from .core import write, write_snapshot, read_table, expire_snapshots
+from .snapshot import write_snapshot, transaction, CommitConflictError
+from .read import read_table, lookup, read_changes, scan_table, iter_batches, table_info, table_history
+from .read import enable_read_cache, disable_read_cache, read_cache_info
+from .watch import watch_table
+from .optimize import optimize_table, delete_rows, upsert
+from .expire import expire_snapshots
 # Public API로 노출할 함수들을 명시적으로 가져옵니다.
 from .core import write
 
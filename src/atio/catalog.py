@@ -0,0 +1,254 @@
+"""
+스냅샷 테이블의 SQLite 카탈로그.
+
+기본 카탈로그는 커밋마다 vN.metadata.json, snapshot JSON, manifest JSON을 쓰고 읽지만,
+커밋이 수만 개 쌓이면 파일을 찾고 파싱하는 비용이 커집니다. SQLite 카탈로그는 버전, snapshot,
+데이터 파일 항목을 테이블 폴더의 _catalog.db 한 파일에 저장하고, 버전 확정은 포인터 파일 교체 대신
+하나의 트랜잭션으로 처리합니다. 버전/타임스탬프/manifest/파일 경로에 인덱스가 있어
+버전 조회, 시간 여행, 만료 대상 계산이 파일 개수와 무관하게 인덱스 조회로 끝납니다.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+CATALOG_FILENAME = '_catalog.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    version_id INTEGER PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    added_bytes INTEGER,
+    table_bytes INTEGER,
+    added_rows INTEGER,
+    table_rows INTEGER,
+    snapshot TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS versions_timestamp ON versions (timestamp);
+CREATE TABLE IF NOT EXISTS version_manifests (
+    version_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    manifest TEXT NOT NULL,
+    PRIMARY KEY (version_id, position)
+);
+CREATE INDEX IF NOT EXISTS version_manifests_manifest ON version_manifests (manifest);
+CREATE TABLE IF NOT EXISTS files (
+    manifest TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (manifest, position)
+);
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+"""
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+class SqliteCatalog:
+    """
+    table_path/_catalog.db에 저장된 스냅샷 테이블 메타데이터.
+
+    manifest 참조('metadata/manifest-*.json')와 snapshot 형식은 JSON 카탈로그와 같으므로,
+    core의 읽기/쓰기 로직은 메타데이터를 어디서 읽는지만 다르고 나머지는 그대로 사용합니다.
+    """
+
+    def __init__(self, table_path):
+        self.table_path = table_path
+        self.path = os.path.join(table_path, CATALOG_FILENAME)
+
+    @classmethod
+    def open(cls, table_path):
+        """table_path가 SQLite 카탈로그 테이블이면 SqliteCatalog를, 아니면 None을 반환합니다."""
+        if os.path.exists(os.path.join(table_path, CATALOG_FILENAME)):
+            return cls(table_path)
+        return None
+
+    @classmethod
+    def create(cls, table_path):
+        """카탈로그 DB와 스키마를 만듭니다 (이미 있으면 그대로 사용)."""
+        os.makedirs(table_path, exist_ok=True)
+        catalog = cls(table_path)
+        with closing(catalog._connect()) as conn:
+            # WAL 모드: 쓰기 트랜잭션 중에도 reader가 막히지 않습니다. (설정은 DB 파일에 유지됨)
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                conn.executescript(_SCHEMA)
+        return catalog
+
+    def _connect(self):
+        # 동시에 커밋하는 writer는 잠금이 풀릴 때까지 timeout 동안 기다립니다.
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    # --- 버전 조회 ---
+
+    def current_version(self):
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT MAX(version_id) FROM versions').fetchone()[0] or 0
+
+    def oldest_version(self):
+        """남아 있는 가장 오래된 버전 (만료되어 삭제된 버전은 제외). 버전이 없으면 0."""
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT MIN(version_id) FROM versions').fetchone()[0] or 0
+
+    def load_snapshot(self, version):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT snapshot_id, timestamp, snapshot FROM versions WHERE version_id = ?', (version,)
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"카탈로그에 v{version} 버전이 없습니다: {self.path}")
+        return {'snapshot_id': row[0], 'timestamp': row[1], **json.loads(row[2])}
+
+    def version_entries(self, versions):
+        """버전 로그 레코드와 같은 형식의 {version: {'version', 'timestamp', 'added_bytes', 'table_bytes', ...}}"""
+        versions = list(versions)
+        if not versions:
+            return {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT version_id, timestamp, added_bytes, table_bytes, added_rows, table_rows FROM versions '
+                'WHERE version_id BETWEEN ? AND ?', (min(versions), max(versions))
+            ).fetchall()
+        wanted = set(versions)
+        return {
+            row[0]: {'version': row[0], 'timestamp': row[1], 'added_bytes': row[2], 'table_bytes': row[3],
+                     'added_rows': row[4], 'table_rows': row[5]}
+            for row in rows if row[0] in wanted
+        }
+
+    def version_as_of(self, timestamp):
+        """timestamp 이전에 커밋된 가장 최신 버전 (timestamp 인덱스 조회). 없으면 None."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                'SELECT MAX(version_id) FROM versions WHERE timestamp <= ?', (timestamp,)
+            ).fetchone()[0]
+
+    def manifest_entries(self, manifest_refs):
+        """{manifest 참조: 데이터 파일 항목 목록}"""
+        entries = {ref: [] for ref in manifest_refs}
+        if not entries:
+            return entries
+        with closing(self._connect()) as conn:
+            placeholders = ','.join('?' * len(entries))
+            rows = conn.execute(
+                f'SELECT manifest, entry FROM files WHERE manifest IN ({placeholders}) ORDER BY manifest, position',
+                list(entries),
+            )
+            for manifest_ref, entry in rows:
+                entries[manifest_ref].append(json.loads(entry))
+        return entries
+
+    # --- 커밋 ---
+
+    def commit(self, manifests, build_snapshot):
+        """
+        새 manifest들과 build_snapshot(base_version)이 만든 snapshot을 하나의 트랜잭션으로 커밋합니다.
+
+        BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡으므로 트랜잭션 안에서 읽은 최신 버전이 곧 base가 되고,
+        동시에 커밋하는 writer는 잠금을 기다렸다가 새 최신 버전 위에 snapshot을 만듭니다.
+        커밋된 (버전, metadata)를 반환합니다.
+
+        Args:
+            manifests (dict): {manifest 참조: 데이터 파일 항목 목록}
+            build_snapshot (callable): core._commit_snapshot과 동일한 snapshot 구성 함수.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                base_version, base_timestamp = conn.execute(
+                    'SELECT version_id, timestamp FROM versions ORDER BY version_id DESC LIMIT 1'
+                ).fetchone() or (0, None)
+                snapshot_fields, sizes = build_snapshot(base_version)
+
+                new_version = base_version + 1
+                timestamp = time.time()
+                if base_timestamp is not None:
+                    timestamp = max(timestamp, base_timestamp)
+                snapshot_id = int(timestamp)
+
+                for manifest_ref, file_entries in manifests.items():
+                    conn.executemany(
+                        'INSERT INTO files (manifest, position, path, entry) VALUES (?, ?, ?, ?)',
+                        [(manifest_ref, i, entry['path'], _dumps(entry)) for i, entry in enumerate(file_entries)],
+                    )
+                conn.executemany(
+                    'INSERT INTO version_manifests (version_id, position, manifest) VALUES (?, ?, ?)',
+                    [(new_version, i, ref) for i, ref in enumerate(snapshot_fields['manifests'])],
+                )
+                conn.execute(
+                    'INSERT INTO versions (version_id, snapshot_id, timestamp, added_bytes, table_bytes, '
+                    'added_rows, table_rows, snapshot) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (new_version, snapshot_id, timestamp, sizes['added_bytes'], sizes['table_bytes'],
+                     sizes['added_rows'], sizes['table_rows'], _dumps(snapshot_fields)),
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+        return new_version, {
+            'version_id': new_version,
+            'snapshot_id': snapshot_id,
+            'timestamp': timestamp,
+            **sizes,
+        }
+
+    # --- 만료 ---
+
+    def expired_data_files(self, first_version, oldest_live):
+        """
+        first_version ~ oldest_live - 1 버전의 manifest 중 oldest_live가 참조하지 않는 manifest의 데이터 파일 항목.
+        (한 번 snapshot에서 빠진 manifest는 이후 버전에 다시 포함되지 않으므로 oldest_live만 비교하면 됩니다.)
+        여러 manifest가 함께 참조하는 파일(내용 주소 파일, 다시 쓴 manifest로 옮겨진 파일)은 살아있는 버전이 참조하면 제외합니다.
+        oldest_live는 커밋된 버전이어야 합니다. (중단된 트랜잭션 버전은 이후 버전이 쌓이는 기준이 아님)
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT f.path, MIN(f.entry) FROM files f '
+                'WHERE f.manifest IN ('
+                '    SELECT manifest FROM version_manifests WHERE version_id >= ? AND version_id < ?'
+                ') AND f.manifest NOT IN ('
+                '    SELECT manifest FROM version_manifests WHERE version_id = ?'
+                ') AND NOT EXISTS ('
+                '    SELECT 1 FROM files live JOIN version_manifests vm ON vm.manifest = live.manifest'
+                '    WHERE live.path = f.path AND vm.version_id >= ?'
+                ') GROUP BY f.path', (first_version, oldest_live, oldest_live, oldest_live)
+            ).fetchall()
+        return [json.loads(row[1]) for row in rows]
+
+    def live_data_files(self, oldest_live):
+        """oldest_live 이후 버전들이 참조하는 모든 데이터 파일 경로"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT DISTINCT f.path FROM files f JOIN version_manifests vm ON vm.manifest = f.manifest '
+                'WHERE vm.version_id >= ?', (oldest_live,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def delete_versions_before(self, oldest_live):
+        """
+        oldest_live 이전 버전과, 남은 버전이 참조하지 않는 manifest의 파일 항목을 삭제합니다.
+        oldest_live는 expired_data_files와 같이 커밋된 버전이어야 합니다.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    'DELETE FROM files WHERE manifest IN ('
+                    '    SELECT manifest FROM version_manifests WHERE version_id < ?'
+                    ') AND manifest NOT IN ('
+                    '    SELECT manifest FROM version_manifests WHERE version_id = ?'
+                    ')', (oldest_live, oldest_live)
+                )
+                conn.execute('DELETE FROM version_manifests WHERE version_id < ?', (oldest_live,))
+                conn.execute('DELETE FROM versions WHERE version_id < ?', (oldest_live,))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
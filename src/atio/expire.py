@@ -0,0 +1,315 @@
+"""
+스냅샷 테이블의 만료 정리.
+
+expire_snapshots는 보관 정책(기간, 최근 버전 수, 전체 크기)을 벗어난 버전과, 남은 버전 어디에서도
+참조되지 않는 데이터 파일, manifest, snapshot을 지웁니다. 이전 정리 위치를 기록해 두고 그 뒤에
+만료된 버전만 살펴보므로 버전이 많이 쌓여도 정리 비용이 새로 만료된 버전 수에 비례합니다.
+"""
+
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from .catalog import SqliteCatalog
+from .snapshot import (_CONTENT_REUSE_GRACE_SECONDS, _TXN_DECISION_PREFIX, _VERSION_LOG_FILENAME, _current_version,
+                       _ensure_version_log, _load_snapshot, _read_json_if_exists, _resolve_file_entries,
+                       _version_as_of, _version_log_entries, _version_log_reader)
+from .utils import read_json, setup_logger, write_json
+
+
+_EXPIRE_STATE_FILENAME = '_expire_state.json'
+
+
+def _expired_files(table_path, candidate_entries, oldest_live_entry, live_versions):
+    """
+    보관 기간이 지난 버전들(candidate_entries)에서만 참조되는 파일 목록을 계산합니다.
+
+    manifest는 한 번 snapshot에서 빠지면 이후 버전에 다시 포함되지 않으므로,
+    만료 대상 버전이 참조하는 manifest 중 가장 오래된 살아있는 버전이 참조하지 않는 것은
+    어떤 살아있는 버전에서도 참조되지 않습니다. 따라서 전체 메타데이터를 읽지 않고도
+    만료 대상 snapshot과 가장 오래된 살아있는 snapshot만으로 삭제 대상을 정할 수 있습니다.
+
+    단, 내용 주소 데이터 파일은 여러 manifest가 함께 참조할 수 있으므로, 삭제 대상에 포함되면
+    살아있는 버전들(live_versions)의 manifest를 모두 확인하여 참조되는 파일은 제외합니다.
+    optimize_table, delete_rows 등이 다시 쓴 manifest(snapshot의 rewritten_manifests)의 파일은
+    새 manifest로 옮겨졌을 수 있습니다. 이런 파일도 한 번 테이블에서 빠지면 다시 포함되지 않으므로
+    가장 오래된 살아있는 버전이 참조하는 파일만 제외하면 됩니다.
+    """
+    live_snapshot = read_json(os.path.join(table_path, oldest_live_entry['snapshot']))
+    live_manifests = set(live_snapshot['manifests'])
+    rewritten = set(live_snapshot.get('rewritten_manifests', []))
+
+    files = []
+    dead_manifests = set()
+    for version, entry in candidate_entries.items():
+        files.append(os.path.join(table_path, 'metadata', f"v{version}.metadata.json"))
+        files.append(os.path.join(table_path, entry['snapshot']))
+        snapshot = _read_json_if_exists(os.path.join(table_path, entry['snapshot']))
+        if snapshot is not None:
+            dead_manifests.update(m for m in snapshot['manifests'] if m not in live_manifests)
+            rewritten.update(snapshot.get('rewritten_manifests', []))
+
+    shared = []
+    carried = []
+    for manifest_ref in dead_manifests:
+        files.append(os.path.join(table_path, manifest_ref))
+        manifest = _read_json_if_exists(os.path.join(table_path, manifest_ref))
+        if manifest is None:
+            continue
+        for file_info in manifest['files']:
+            if 'content_hash' in file_info:
+                shared.append(file_info)
+            elif manifest_ref in rewritten:
+                carried.append(file_info['path'])
+            else:
+                files.append(os.path.join(table_path, file_info['path']))
+
+    if carried:
+        live_paths = {entry['path'] for entry in _resolve_file_entries(table_path, live_snapshot)}
+        files.extend(os.path.join(table_path, path) for path in dict.fromkeys(carried) if path not in live_paths)
+    if shared:
+        live = _live_metadata_files(table_path, _version_log_entries(table_path, live_versions))
+        files.extend(_deletable_shared_files(table_path, shared, live))
+    return files
+
+
+def _deletable_shared_files(table_path, file_entries, live_basenames):
+    """내용 주소 파일 중 살아있는 버전이 참조하지 않고 최근에 재사용되지 않은 파일의 경로"""
+    recent = time.time() - _CONTENT_REUSE_GRACE_SECONDS
+    paths = []
+    for file_info in file_entries:
+        path = os.path.join(table_path, file_info['path'])
+        if os.path.basename(path) in live_basenames:
+            continue
+        try:
+            if os.path.getmtime(path) >= recent:
+                continue
+        except FileNotFoundError:
+            continue
+        paths.append(path)
+    return paths
+
+
+def _unreferenced_files(table_path, live_entries, older_than):
+    """
+    살아있는 버전들이 참조하지 않는 data/metadata 파일을 디렉토리 전체를 훑어 찾습니다.
+    커밋 도중인 쓰기의 파일을 지우지 않도록 수정 시각이 older_than 이전인 파일만 대상으로 합니다.
+    SQLite 카탈로그 테이블은 메타데이터가 카탈로그에 있으므로 data 폴더만 훑습니다.
+    """
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        live = {os.path.basename(path) for path in catalog.live_data_files(min(live_entries))}
+        folders = ('data',)
+    else:
+        live = _live_metadata_files(table_path, live_entries)
+        folders = ('data', 'metadata')
+
+    files = []
+    for folder in folders:
+        folder_path = os.path.join(table_path, folder)
+        for filename in os.listdir(folder_path):
+            path = os.path.join(folder_path, filename)
+            if filename.startswith(_TXN_DECISION_PREFIX):
+                # 트랜잭션 결정 파일은 다른 테이블의 살아있는 버전이 참조할 수 있으므로 지우지 않습니다.
+                continue
+            if filename not in live and os.path.getmtime(path) < older_than:
+                files.append(path)
+    return files
+
+
+def _live_metadata_files(table_path, live_entries):
+    """살아있는 버전들이 참조하는 metadata/data 파일 이름 집합"""
+    live = {_VERSION_LOG_FILENAME, _EXPIRE_STATE_FILENAME}
+    for version, entry in live_entries.items():
+        live.add(f"v{version}.metadata.json")
+        live.add(os.path.basename(entry['snapshot']))
+        for manifest_ref in read_json(os.path.join(table_path, entry['snapshot']))['manifests']:
+            if os.path.basename(manifest_ref) in live:
+                continue
+            live.add(os.path.basename(manifest_ref))
+            for file_info in read_json(os.path.join(table_path, manifest_ref))['files']:
+                live.add(os.path.basename(file_info['path']))
+    return live
+
+
+def _delete_files(files, max_workers):
+    """스레드 풀에서 파일들을 삭제하고 삭제에 성공한 개수를 반환합니다."""
+    logger = setup_logger()
+
+    def remove(path):
+        try:
+            os.remove(path)
+            logger.debug(f"  - 삭제됨: {path}")
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.error(f"  - 삭제 실패: {path}, 오류: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(remove, files))
+
+
+def _oldest_live_version(table_path, latest_version, expired_through, keep_for, keep_last, max_total_bytes):
+    """
+    보관 정책들을 버전 로그만으로 평가하여 가장 오래된 "살아있는" 버전을 반환합니다.
+    여러 정책이 주어지면 어느 하나라도 벗어난 버전은 만료되며, latest_version(reader가 읽는 최신 버전)은
+    항상 보관됩니다.
+    """
+    boundaries = []
+    if keep_for is not None:
+        # cutoff 이전에 커밋된 가장 최신 버전 다음부터 보관
+        cutoff = time.time() - keep_for.total_seconds()
+        try:
+            boundaries.append(_version_as_of(table_path, cutoff) + 1)
+        except ValueError:
+            boundaries.append(1)
+
+    if keep_last is not None:
+        if keep_last < 1:
+            raise ValueError("keep_last는 1 이상이어야 합니다.")
+        boundaries.append(latest_version - keep_last + 1)
+
+    if max_total_bytes is not None:
+        # 버전 b부터 보관할 때의 용량 = b가 참조하는 데이터 + 이후 커밋들이 새로 쓴 데이터.
+        # 최신 버전부터 거꾸로 로그 레코드를 읽으며 한도를 넘기 직전까지 보관 범위를 넓힙니다.
+        boundary = latest_version
+        with _version_log_reader(table_path) as read_entry:
+            entry = read_entry(latest_version)
+            storage = entry.get('table_bytes') if entry else None
+            while storage is not None and boundary > expired_through + 1:
+                prev = read_entry(boundary - 1)
+                if prev is None or prev.get('table_bytes') is None or entry.get('added_bytes') is None:
+                    break
+                storage = storage - entry['table_bytes'] + prev['table_bytes'] + entry['added_bytes']
+                if storage > max_total_bytes:
+                    break
+                boundary -= 1
+                entry = prev
+        boundaries.append(boundary)
+
+    if not boundaries:
+        return 1
+    return max(1, min(max(boundaries), latest_version))
+
+
+def expire_snapshots(table_path, keep_for=timedelta(days=7), dry_run=True, max_workers=8, full_scan=False,
+                     keep_last=None, max_total_bytes=None):
+    """
+    보관 정책(keep_for, keep_last, max_total_bytes)을 벗어난 스냅샷과
+    더 이상 참조되지 않는 데이터 파일을 삭제합니다. 현재 버전은 항상 보관됩니다.
+
+    마지막 실행 이후 보관 기간을 벗어난 버전만 검사합니다. 보관 경계는 버전 로그를
+    이진 탐색해 찾고, 어디까지 정리했는지는 metadata/_expire_state.json에 기록합니다.
+    SQLite 카탈로그 테이블은 만료된 버전을 카탈로그에서 삭제하며, 반환 목록에는 데이터 파일만 포함됩니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        keep_for (timedelta, optional): 보관 기간. None이면 기간으로 만료하지 않습니다. Defaults to 7일.
+        dry_run (bool): True이면 삭제할 파일 목록만 출력합니다. Defaults to True.
+        max_workers (int): 동시에 삭제할 최대 파일 수. Defaults to 8.
+        full_scan (bool): True이면 data/metadata 폴더 전체를 훑어, 비정상 종료된 쓰기가 남긴
+            참조되지 않는 파일까지 정리합니다. 살아있는 모든 버전의 메타데이터를 읽습니다.
+            Defaults to False.
+        keep_last (int, optional): 최신 버전부터 보관할 버전 수. Defaults to None.
+        max_total_bytes (int, optional): 보관할 버전들이 참조하는 데이터 파일 크기 합의 상한.
+            최신 버전부터 거꾸로 한도 안에 들어오는 버전까지 보관합니다. Defaults to None.
+
+    Returns:
+        list: 삭제한 (dry_run이면 삭제할) 파일 경로 목록.
+    """
+    logger = setup_logger()
+    metadata_dir = os.path.join(table_path, 'metadata')
+    catalog = SqliteCatalog.open(table_path)
+
+    latest_version = _current_version(table_path) if catalog is not None or os.path.isdir(metadata_dir) else 0
+    if latest_version == 0:
+        logger.info("정리할 테이블이 없거나 메타데이터 폴더를 찾을 수 없습니다.")
+        return []
+    # 보관 정책은 reader가 읽는 최신 버전을 기준으로 평가합니다. 커밋 중이거나 중단된 트랜잭션 버전을
+    # 현재 버전으로 세면 실제로 읽히는 버전이 만료될 수 있습니다. (그 이후 버전의 파일은 계속 보관)
+    try:
+        visible_version = _load_snapshot(table_path, latest_version)[0]
+    except FileNotFoundError:
+        logger.info("커밋이 완료된 버전이 없어 정리하지 않습니다.")
+        return []
+
+    # --- 1. 보관 경계 찾기: 보관 정책을 버전 로그만으로 평가 ---
+    state_path = os.path.join(metadata_dir, _EXPIRE_STATE_FILENAME)
+    if catalog is not None:
+        # 만료된 버전은 카탈로그에서 삭제되므로 남은 가장 오래된 버전이 곧 정리 위치입니다.
+        expired_through = catalog.oldest_version() - 1
+    else:
+        _ensure_version_log(table_path, latest_version)
+        state = _read_json_if_exists(state_path) or {'expired_through': 0}
+        expired_through = state['expired_through']
+    oldest_live = _oldest_live_version(table_path, visible_version, expired_through,
+                                       keep_for, keep_last, max_total_bytes)
+    # 중단되었거나 결정되지 않은 트랜잭션 버전은 이후 커밋의 기준이 아닙니다 (이후 커밋은 그 이전에 커밋된
+    # 버전 위에 쌓임). 이런 버전이 경계이면 그 manifest만 살아있다고 보게 되므로, reader가 그 버전에서 실제로
+    # 읽는 커밋된 버전으로 경계를 옮깁니다.
+    try:
+        oldest_live = max(_load_snapshot(table_path, oldest_live)[0], expired_through + 1)
+    except FileNotFoundError:
+        pass
+
+    # --- 2. 지난 실행 이후 경계를 넘은 버전만 검사하여 삭제 대상 파일 식별 ---
+    candidates = _version_log_entries(table_path, range(expired_through + 1, oldest_live))
+    if catalog is not None:
+        expired = catalog.expired_data_files(expired_through + 1, oldest_live)
+        files_to_delete = [
+            os.path.join(table_path, entry['path']) for entry in expired if 'content_hash' not in entry
+        ]
+        files_to_delete.extend(_deletable_shared_files(
+            table_path, [entry for entry in expired if 'content_hash' in entry], live_basenames=set()
+        ))
+    else:
+        oldest_live_entry = _version_log_entries(table_path, [oldest_live])[oldest_live]
+        live_versions = range(oldest_live, latest_version + 1)
+        files_to_delete = _expired_files(table_path, candidates, oldest_live_entry, live_versions) if candidates else []
+
+    if full_scan:
+        live_entries = _version_log_entries(table_path, range(oldest_live, latest_version + 1))
+        # 커밋 도중인 쓰기의 파일을 보호하기 위해 보관 기간(지정하지 않았으면 1시간) 이전 파일만 대상
+        grace = keep_for if keep_for is not None else timedelta(hours=1)
+        older_than = time.time() - grace.total_seconds()
+        files_to_delete.extend(_unreferenced_files(table_path, live_entries, older_than=older_than))
+
+    # 중복 제거 (이미 지워진 파일은 제외)
+    files_to_delete = sorted(f for f in set(files_to_delete) if os.path.exists(f))
+    logger.info(f"v{expired_through + 1}~v{oldest_live - 1} 범위의 {len(candidates)}개 버전을 검사했습니다.")
+
+    # --- 3. 최종 삭제 실행 ---
+    if not files_to_delete:
+        logger.info("삭제할 오래된 파일이 없습니다.")
+    else:
+        logger.info(f"총 {len(files_to_delete)}개의 오래된 파일을 찾았습니다.")
+
+    if dry_run:
+        if files_to_delete:
+            logger.info("[Dry Run] 아래 파일들이 삭제될 예정입니다:")
+            for f in files_to_delete:
+                print(f"  - {f}")
+        return files_to_delete
+
+    if catalog is not None and oldest_live - 1 > expired_through:
+        # 카탈로그에서 먼저 지워 만료된 버전이 삭제 중인 파일을 가리키지 않게 합니다.
+        catalog.delete_versions_before(oldest_live)
+
+    if files_to_delete:
+        logger.info("오래된 파일들을 삭제합니다...")
+        t0 = time.perf_counter()
+        deleted = _delete_files(files_to_delete, max_workers)
+        elapsed = time.perf_counter() - t0
+        rate = deleted / elapsed if elapsed > 0 else float(deleted)
+        logger.info(f"삭제 작업이 완료되었습니다. ({deleted}/{len(files_to_delete)}개, {elapsed:.4f}s, {rate:.0f} files/s)")
+
+    # --- 4. 다음 실행이 이번 경계부터 시작하도록 상태 기록 ---
+    if catalog is None and oldest_live - 1 > expired_through:
+        tmp_state_path = f"{state_path}.{uuid.uuid4()}.tmp"
+        write_json({'expired_through': oldest_live - 1}, tmp_state_path)
+        os.replace(tmp_state_path, state_path)
+    return files_to_delete
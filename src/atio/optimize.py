@@ -0,0 +1,428 @@
+"""
+스냅샷 테이블의 데이터 파일 다시 쓰기.
+
+optimize_table은 작은 파일을 합치고 행을 정렬해 다시 나누어 쓰며, delete_rows와 upsert는
+행을 지우거나 교체한 결과를 새 버전으로 커밋합니다. 바뀌지 않은 파일은 그대로 두고
+지운 행은 가능하면 파일을 다시 쓰지 않고 삭제 벡터로 기록합니다.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .plugins import WRITER_MAPPING, get_reader
+from .read import _read_data_file
+from .schema import _conform_frame, _entries_schema, _needs_conform
+from .snapshot import (CommitConflictError, _apply_deletion_vector, _cluster_rows, _commit_snapshot,
+                       _current_version, _deleted_rows, _encode_deletion_vector, _entries_size, _load_snapshot,
+                       _manifest_file_entries, _manifest_summary, _prepare_catalog, _resolve_file_entries,
+                       _snapshot_fields, _snapshot_schema, _split_rows, _stage_manifest, _sum_rows, _table_size,
+                       _write_data_file, _write_frame_files)
+from .stats import _bloom_filters_from_columns, _file_may_match, _filter_predicate, _normalize_filters
+from .utils import setup_logger
+
+
+def _stored_index_columns(table_path, entry):
+    """
+    pandas로 쓴 parquet 파일의 메타데이터에 기록된 인덱스 컬럼 이름 (RangeIndex는 컬럼이 아니므로 제외).
+    polars로 다시 쓰면 인덱스가 일반 컬럼이 되므로, 합칠 때 인덱스로 되돌리기 위해 사용합니다.
+    """
+    if entry.get('format', 'parquet') != 'parquet':
+        return ()
+    import pyarrow.parquet as pq
+    metadata = pq.read_schema(os.path.join(table_path, entry['path'])).pandas_metadata or {}
+    return tuple(name for name in metadata.get('index_columns', []) if isinstance(name, str))
+
+
+def _restore_pandas_index(frame, index_columns):
+    """polars로 합친 frame을 index_columns를 인덱스로 하는 pandas DataFrame으로 되돌립니다."""
+    frame = frame.to_pandas().set_index(list(index_columns))
+    # 이름 없는 인덱스는 parquet에 '__index_level_N__' 컬럼으로 저장되므로 이름을 다시 비웁니다.
+    frame.index.names = [None if re.fullmatch(r'__index_level_\d+__', name) else name for name in frame.index.names]
+    return frame
+
+
+def _plan_compaction(table_path, entries, target_file_size):
+    """
+    target_file_size보다 작은 파일을 포맷, 파티션, pandas 인덱스 컬럼별로 테이블 순서대로 묶습니다 (next-fit bin packing).
+    각 묶음의 크기 합은 target_file_size를 넘지 않으며, 파일이 하나뿐인 묶음은 제외합니다.
+    삭제 벡터가 있는 파일은 크기와 관계없이 삭제된 행을 제외하고 다시 쓰도록 포함합니다.
+    """
+    import polars as pl
+
+    bins = []
+    open_bins = {}  # (format, 파티션) -> 현재 채우고 있는 묶음
+    for index, entry in enumerate(entries):
+        fmt = entry.get('format', 'parquet')
+        size = entry.get('size_bytes', 0)
+        compactable = get_reader('polars', fmt) is not None and fmt in WRITER_MAPPING.get(pl.DataFrame, {})
+        has_deletes = 'deletion_vector' in entry
+        if not compactable or (size >= target_file_size and not has_deletes):
+            continue
+        index_columns = _stored_index_columns(table_path, entry)
+        key = (fmt, json.dumps(entry.get('partition'), sort_keys=True), index_columns)
+        current = open_bins.get(key)
+        if current is None or current['size'] + size > target_file_size:
+            current = {'format': fmt, 'partition': entry.get('partition'), 'index_columns': index_columns,
+                       'size': 0, 'indices': [], 'has_deletes': False}
+            open_bins[key] = current
+            bins.append(current)
+        current['indices'].append(index)
+        current['size'] += size
+        current['has_deletes'] |= has_deletes
+    return [b for b in bins if len(b['indices']) > 1 or b['has_deletes']]
+
+
+def _plan_clustering(table_path, entries):
+    """클러스터링할 때는 다시 쓸 수 있는 모든 파일을 포맷, 파티션, pandas 인덱스 컬럼별로 묶습니다."""
+    import polars as pl
+
+    bins = {}
+    for index, entry in enumerate(entries):
+        fmt = entry.get('format', 'parquet')
+        if get_reader('polars', fmt) is None or fmt not in WRITER_MAPPING.get(pl.DataFrame, {}):
+            continue
+        index_columns = _stored_index_columns(table_path, entry)
+        key = (fmt, json.dumps(entry.get('partition'), sort_keys=True), index_columns)
+        bins.setdefault(key, {'format': fmt, 'partition': entry.get('partition'), 'index_columns': index_columns,
+                              'indices': []})
+        bins[key]['indices'].append(index)
+    return list(bins.values())
+
+
+def optimize_table(table_path, target_file_size=128 * 1024 * 1024, max_workers=None, sort_by=None, zorder_by=None,
+                   **kwargs):
+    """
+    append 모드로 쌓인 작은 데이터 파일들을 target_file_size 크기에 가깝게 합쳐 새 버전으로 커밋합니다.
+    delete_rows/upsert로 삭제 벡터가 붙은 파일은 삭제된 행을 제외하고 다시 씁니다.
+
+    sort_by 또는 zorder_by를 지정하면 작은 파일만이 아니라 포맷과 파티션이 같은 모든 파일을 읽어
+    정렬한 뒤 target_file_size 단위로 다시 나누어 씁니다 (클러스터링). 파일별 값 범위가 겹치지 않게 되어
+    통계 기반 pruning이 효과적이지만, 파티션 하나를 메모리에 올립니다.
+
+    합쳐진 묶음들은 스레드 풀에서 병렬로 다시 쓰이고, 결과는 하나의 manifest로 기록되어
+    일반 쓰기와 동일하게 포인터 교체로 커밋됩니다. 기존 파일은 삭제하지 않으므로 이전 버전의
+    시간 여행이 유지되며, 보관 기간이 지나면 expire_snapshots가 정리합니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        target_file_size (int): 합친 파일의 목표 최대 크기(바이트). Defaults to 128MB.
+        max_workers (int, optional): 동시에 다시 쓸 최대 묶음 수. Defaults to None.
+        sort_by (str | list, optional): write_snapshot과 같은 정렬 컬럼. Defaults to None.
+        zorder_by (list, optional): write_snapshot과 같은 Z-order 컬럼. Defaults to None.
+        **kwargs: 데이터 파일 writer(예: write_parquet, pandas 인덱스가 기록된 파일은 to_parquet)에 전달될
+            추가 키워드 인자.
+
+    Returns:
+        int | None: 새로 커밋된 버전. 합칠 파일이 없으면 None.
+    """
+    import polars as pl
+    logger = setup_logger(debug_level=False)
+
+    current_version = _current_version(table_path)
+    if current_version == 0:
+        logger.info(f"최적화할 테이블이 없습니다: {table_path}")
+        return None
+    current_version, snapshot = _load_snapshot(table_path, current_version, wait_for_txn=True)
+    entries = _resolve_file_entries(table_path, snapshot)
+    for entry in entries:
+        if 'size_bytes' not in entry:
+            entry['size_bytes'] = os.path.getsize(os.path.join(table_path, entry['path']))
+
+    schema = _snapshot_schema(table_path, snapshot)
+    clustering = sort_by is not None or zorder_by is not None
+    bins = _plan_clustering(table_path, entries) if clustering else _plan_compaction(table_path, entries, target_file_size)
+    if not bins:
+        logger.info("합칠 작은 파일이 없습니다.")
+        return None
+
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=table_path) as tmpdir:
+        # 1. 묶음별로 파일을 읽어 합친 뒤 새 데이터 파일로 쓰기 (병렬)
+        def rewrite(file_bin):
+            frames = []
+            for i in file_bin['indices']:
+                frame = _read_data_file(os.path.join(table_path, entries[i]['path']), file_bin['format'], 'polars')
+                frame = _apply_deletion_vector(frame, 'polars', entries[i])
+                # 스키마가 바뀌기 전에 쓴 파일은 테이블 스키마에 맞춰 합칩니다.
+                if _needs_conform(entries[i], schema):
+                    frame = _conform_frame(frame, 'polars', schema)
+                frames.append(frame)
+            merged = pl.concat(frames)
+            pieces = [merged]
+            if clustering:
+                pieces = _split_rows(_cluster_rows(merged, sort_by, zorder_by), target_file_size, None)
+            # 합친 파일 중 하나라도 블룸 필터가 있던 컬럼은 합친 파일에서도 다시 만듭니다.
+            blooms = {}
+            for i in file_bin['indices']:
+                for column, bloom in (entries[i].get('bloom_filters') or {}).items():
+                    blooms.setdefault(column, bloom['fpp'])
+
+            results = []
+            for piece in pieces:
+                # pandas로 쓴 파일의 인덱스는 인덱스로 되돌려 써서 읽는 결과가 바뀌지 않게 합니다.
+                data = _restore_pandas_index(piece, file_bin['index_columns']) if file_bin['index_columns'] else piece
+                tmp_path, new_entry = _write_data_file(data, tmpdir, file_bin['format'], **kwargs)
+                if file_bin['partition'] is not None:
+                    new_entry['partition'] = file_bin['partition']
+                if blooms:
+                    new_entry['bloom_filters'] = {}
+                    for column, fpp in blooms.items():
+                        new_entry['bloom_filters'].update(
+                            _bloom_filters_from_columns({column: [piece[column].to_arrow()]}, fpp)
+                        )
+                results.append((tmp_path, new_entry))
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            rewritten_bins = list(executor.map(rewrite, bins))
+        rewritten = [result for results in rewritten_bins for result in results]
+
+        # 2. 각 묶음의 첫 파일 자리에 새 파일을 두고 나머지는 제외한 manifest 생성
+        replaced = {}
+        removed = set()
+        for file_bin, results in zip(bins, rewritten_bins):
+            replaced[file_bin['indices'][0]] = [new_entry for _, new_entry in results]
+            removed.update(file_bin['indices'][1:])
+        new_entries = [
+            new_entry
+            for i, entry in enumerate(entries) if i not in removed
+            for new_entry in replaced.get(i, [entry])
+        ]
+        manifest_ref = _stage_manifest(tmpdir, new_entries)
+
+        # 3. 커밋: 계획 이후 다른 writer가 append만 했다면 그 manifest들을 유지한 채 rebase하고,
+        #    overwrite 등으로 합친 파일이 더 이상 테이블에 없으면 충돌로 처리합니다.
+        added_bytes, added_rows = _entries_size(table_path, [entry for _, entry in rewritten])
+        compacted_bytes, compacted_rows = _entries_size(table_path, new_entries)
+        planned_manifests = set(snapshot['manifests'])
+        planned_bytes = sum(entry['size_bytes'] for entry in entries)
+
+        summaries = {manifest_ref: _manifest_summary(new_entries)}
+
+        def build_snapshot(base_version):
+            if base_version != current_version:
+                base_version, base_snapshot = _load_snapshot(table_path, base_version, wait_for_txn=True)
+            if base_version == current_version:
+                sizes = {'added_bytes': added_bytes, 'table_bytes': compacted_bytes,
+                         'added_rows': added_rows, 'table_rows': compacted_rows}
+                return _snapshot_fields([manifest_ref], summaries, rewritten=snapshot['manifests'], schema=schema), sizes
+            if not planned_manifests.issubset(base_snapshot['manifests']):
+                raise CommitConflictError(
+                    f"최적화 중 v{base_version}이 합치려던 파일을 변경하여 커밋할 수 없습니다: {table_path}"
+                )
+            extra_manifests = [m for m in base_snapshot['manifests'] if m not in planned_manifests]
+            all_summaries = dict(base_snapshot.get('manifest_summaries', {}), **summaries)
+            # 파일을 합쳐도 행 수는 그대로이므로 base 버전의 행 수를 유지합니다.
+            base_bytes, base_rows = _table_size(table_path, base_version)
+            sizes = {'added_bytes': added_bytes, 'table_bytes': compacted_bytes + base_bytes - planned_bytes,
+                     'added_rows': added_rows, 'table_rows': base_rows}
+            return _snapshot_fields(extra_manifests + [manifest_ref], all_summaries, rewritten=snapshot['manifests'],
+                                    schema=_snapshot_schema(table_path, base_snapshot)), sizes
+
+        staged_paths = [(tmp_path, entry['path']) for tmp_path, entry in rewritten]
+        staged_paths.append((os.path.join(tmpdir, os.path.basename(manifest_ref)), manifest_ref))
+        new_version = _commit_snapshot(table_path, tmpdir, staged_paths, build_snapshot)
+
+    compacted = sum(len(b['indices']) for b in bins)
+    logger.info(
+        f"테이블 최적화 완료: 파일 {compacted}개를 {len(rewritten)}개로 다시 썼습니다 "
+        f"({len(entries)} -> {len(new_entries)}개, 버전 {new_version}, {time.perf_counter() - t0:.4f}s)"
+    )
+    return new_version
+
+
+def _plan_row_deletions(table_path, entries, filters, columns, match_rows, max_workers, schema=None):
+    """
+    파일 통계로 filters를 만족할 수 있는 데이터 파일만 columns를 읽어, match_rows(pandas DataFrame)가
+    True인 행을 기존 삭제 벡터에 더합니다. ({entries 인덱스: 새 항목 또는 모든 행이 삭제되면 None}, 새로 삭제된 행 수)를 반환합니다.
+    스키마가 테이블 스키마(schema)와 다른 파일은 read_table과 같이 읽은 뒤 테이블 스키마에 맞춥니다 (없는 컬럼은 null).
+    """
+    candidates = [index for index, entry in enumerate(entries) if _file_may_match(entry, filters)]
+
+    def plan(index):
+        entry = entries[index]
+        fmt = entry.get('format', 'parquet')
+        if fmt in ('npy', 'npz'):
+            raise ValueError(f"'{fmt}' 데이터 파일의 행은 삭제할 수 없습니다: {entry['path']}")
+        conform = _needs_conform(entry, schema, columns)
+        read_columns = columns
+        if conform and entry.get('schema') is not None:
+            read_columns = [name for name in columns if name in entry['schema']]
+        frame = _read_data_file(os.path.join(table_path, entry['path']), fmt, 'pandas', read_columns)
+        if conform:
+            frame = _conform_frame(frame, 'pandas', schema, columns)
+        deleted = _deleted_rows(entry, len(frame))
+        updated = deleted | np.asarray(match_rows(frame), dtype=bool)
+        newly_deleted = int(np.count_nonzero(updated)) - int(np.count_nonzero(deleted))
+        if newly_deleted == 0 or updated.all():
+            return index, None, newly_deleted
+        return index, dict(entry, num_rows=len(frame), deletion_vector=_encode_deletion_vector(updated)), newly_deleted
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(plan, candidates))
+    changes = {index: new_entry for index, new_entry, newly_deleted in results if newly_deleted}
+    return changes, sum(newly_deleted for _, _, newly_deleted in results)
+
+
+def _commit_row_changes(table_path, tmpdir, filters, columns, match_rows, written, max_workers):
+    """
+    최신 버전에서 match_rows에 해당하는 행을 삭제 벡터로 지우고, tmpdir에 쓴 새 데이터 파일(written)을
+    추가한 버전을 커밋합니다. 데이터 파일은 다시 쓰지 않고 삭제 벡터가 바뀐 파일이 속한 manifest만 새로 씁니다.
+    (커밋된 버전 또는 바뀐 것이 없으면 None, 삭제된 행 수)를 반환합니다.
+    """
+    current_version = _current_version(table_path)
+    snapshot = {'manifests': []}
+    if current_version > 0:
+        current_version, snapshot = _load_snapshot(table_path, current_version, wait_for_txn=True)
+    files_by_manifest = _manifest_file_entries(table_path, snapshot['manifests'])
+    located = [(ref, entry) for ref in snapshot['manifests'] for entry in files_by_manifest[ref]]
+    schema = _snapshot_schema(table_path, snapshot) if snapshot['manifests'] else None
+    changes, deleted_rows = _plan_row_deletions(
+        table_path, [entry for _, entry in located], filters, columns, match_rows, max_workers, schema
+    )
+    if not changes and not written:
+        return None, 0
+
+    # 1. 삭제 벡터가 바뀐 파일이 속한 manifest를 새로 쓰기 (모든 행이 삭제된 파일은 제외)
+    affected = {located[index][0] for index in changes}
+    rewritten_files = {ref: [] for ref in affected}
+    dropped_bytes = 0
+    for index, (ref, entry) in enumerate(located):
+        if ref not in affected:
+            continue
+        new_entry = changes.get(index, entry)
+        if new_entry is None:
+            dropped_bytes += _entries_size(table_path, [entry])[0]
+        else:
+            rewritten_files[ref].append(new_entry)
+
+    staged_paths = []
+    replacements = {}
+    summaries = {}
+    for ref, file_entries in rewritten_files.items():
+        replacements[ref] = _stage_manifest(tmpdir, file_entries) if file_entries else None
+        if file_entries:
+            summaries[replacements[ref]] = _manifest_summary(file_entries)
+            staged_paths.append((os.path.join(tmpdir, os.path.basename(replacements[ref])), replacements[ref]))
+
+    # 2. 새 데이터 파일의 manifest
+    added_refs = []
+    new_entries = [file_entry for _, file_entry in written]
+    if new_entries:
+        added_refs.append(_stage_manifest(tmpdir, new_entries))
+        summaries[added_refs[0]] = _manifest_summary(new_entries)
+        staged_paths.extend((tmp_path, file_entry['path']) for tmp_path, file_entry in written)
+        staged_paths.append((os.path.join(tmpdir, os.path.basename(added_refs[0])), added_refs[0]))
+    added_bytes, added_rows = _entries_size(table_path, new_entries)
+
+    # 3. 커밋: 다른 writer가 append만 했다면 rebase하고, 다시 쓴 manifest가 base에 없으면 충돌로 처리합니다.
+    def build_snapshot(base_version):
+        base_snapshot = snapshot
+        if base_version > 0 and base_version != current_version:
+            base_version, base_snapshot = _load_snapshot(table_path, base_version, wait_for_txn=True)
+        if not affected.issubset(base_snapshot['manifests']):
+            raise CommitConflictError(
+                f"행 삭제 중 v{base_version}이 같은 데이터 파일을 변경하여 커밋할 수 없습니다: {table_path}"
+            )
+        manifests = added_refs + [
+            replacements.get(ref, ref) for ref in base_snapshot['manifests'] if replacements.get(ref, ref) is not None
+        ]
+        all_summaries = dict(base_snapshot.get('manifest_summaries', {}), **summaries)
+        base_bytes, base_rows = _table_size(table_path, base_version) if base_version > 0 else (0, 0)
+        table_rows = _sum_rows(base_rows, added_rows)
+        sizes = {'added_bytes': added_bytes, 'table_bytes': base_bytes + added_bytes - dropped_bytes,
+                 'added_rows': added_rows, 'table_rows': None if table_rows is None else table_rows - deleted_rows}
+        schema = _entries_schema(new_entries, _snapshot_schema(table_path, base_snapshot))
+        return _snapshot_fields(manifests, all_summaries, rewritten=list(replacements), schema=schema), sizes
+
+    return _commit_snapshot(table_path, tmpdir, staged_paths, build_snapshot), deleted_rows
+
+
+def delete_rows(table_path, predicate, max_workers=None):
+    """
+    조건을 만족하는 행을 삭제한 새 버전을 커밋합니다 (merge-on-read).
+
+    데이터 파일을 다시 쓰지 않고, 삭제된 행 위치를 압축 비트맵(삭제 벡터)으로 manifest의 파일 항목에
+    기록합니다. read_table 등은 읽을 때 삭제 벡터가 표시한 행을 제외하며, 삭제 벡터가 쌓인 파일은
+    optimize_table이 삭제된 행을 빼고 다시 씁니다. 파일 통계로 조건을 만족할 수 없는 파일은 열지 않고,
+    나머지 파일도 조건 컬럼만 읽습니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        predicate (list): read_table의 filters와 같은 형식의 삭제 조건.
+        max_workers (int, optional): 동시에 읽을 최대 파일 수. Defaults to None.
+
+    Returns:
+        int | None: 새로 커밋된 버전. 삭제할 행이 없으면 None.
+    """
+    logger = setup_logger(debug_level=False)
+    filters = _normalize_filters(predicate)
+    if filters is None:
+        raise ValueError("삭제할 행의 조건(predicate)을 지정해야 합니다.")
+    columns = list(dict.fromkeys(column for conjunction in filters for column, _, _ in conjunction))
+
+    def match_rows(frame):
+        return _filter_predicate(filters, lambda name: frame[name])
+
+    with tempfile.TemporaryDirectory(dir=table_path) as tmpdir:
+        new_version, deleted_rows = _commit_row_changes(table_path, tmpdir, filters, columns, match_rows, [], max_workers)
+    if new_version is None:
+        logger.info(f"조건을 만족하는 행이 없어 커밋하지 않습니다: {table_path}")
+    else:
+        logger.info(f"행 {deleted_rows}개를 삭제했습니다. '{table_path}'가 버전 {new_version}으로 업데이트되었습니다.")
+    return new_version
+
+
+def upsert(obj, table_path, key, format='parquet', partition_by=None, target_file_size=128 * 1024 * 1024,
+           max_rows_per_file=None, max_workers=None, index_columns=None, index_fpp=0.01, **kwargs):
+    """
+    key 컬럼 값이 obj와 같은 기존 행을 삭제 벡터로 지우고 obj의 행을 추가한 버전을 하나의 커밋으로 만듭니다.
+
+    기존 데이터 파일은 다시 쓰지 않으며(delete_rows와 같은 merge-on-read), 파일 통계로 obj의 key 값을
+    포함할 수 없는 파일은 열지 않습니다. 테이블이 없으면 obj로 새 테이블을 만듭니다.
+
+    Args:
+        obj: 추가하거나 교체할 행 (pandas/polars DataFrame, pyarrow Table).
+        table_path (str): 스냅샷 테이블 경로.
+        key (str | list): 행을 식별하는 컬럼 (여러 개이면 값의 조합으로 식별).
+        format (str): 새 데이터 파일 포맷. Defaults to 'parquet'.
+        partition_by (str | list, optional): write_snapshot과 같은 파티션 컬럼. Defaults to None.
+        target_file_size (int): 새 데이터 파일 하나의 목표 최대 크기(바이트). Defaults to 128MB.
+        max_rows_per_file (int, optional): 새 데이터 파일 하나의 최대 행 수. Defaults to None.
+        max_workers (int, optional): 동시에 읽고 쓸 최대 파일 수. Defaults to None.
+        index_columns (list, optional): write_snapshot과 같은 블룸 필터 컬럼. Defaults to None.
+        index_fpp (float): 블룸 필터의 목표 오탐률. Defaults to 0.01.
+        **kwargs: 데이터 파일 writer에 전달될 추가 키워드 인자.
+
+    Returns:
+        int: 커밋된 버전.
+    """
+    import pandas as pd
+    logger = setup_logger(debug_level=False)
+    keys = [key] if isinstance(key, str) else list(key)
+
+    key_frame = obj.select(keys).to_pandas() if hasattr(obj, 'to_pandas') else obj[keys]
+    key_frame = key_frame.dropna().drop_duplicates()
+    targets = pd.MultiIndex.from_frame(key_frame)
+    filters = [[(column, 'in', key_frame[column].drop_duplicates().tolist()) for column in keys]]
+
+    def match_rows(frame):
+        return pd.MultiIndex.from_frame(frame[keys]).isin(targets)
+
+    _prepare_catalog(table_path, None)
+    os.makedirs(os.path.join(table_path, 'data'), exist_ok=True)
+    os.makedirs(os.path.join(table_path, 'metadata'), exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=table_path) as tmpdir:
+        written = _write_frame_files(obj, tmpdir, format, partition_by, target_file_size, max_rows_per_file,
+                                     max_workers, index_columns, index_fpp, **kwargs)
+        new_version, deleted_rows = _commit_row_changes(
+            table_path, tmpdir, filters, keys, match_rows, written, max_workers
+        )
+    logger.info(f"upsert 완료: 기존 행 {deleted_rows}개를 교체했습니다. '{table_path}'가 버전 {new_version}으로 업데이트되었습니다.")
+    return new_version
@@ -22,6 +22,22 @@ def get_writer(obj, fmt):
         logger.warning(f"No writer found for type {obj_type.__name__} and format '{fmt}'")
     return handler
 
+# { 출력 형식: { 포맷: 핸들러 } }
+# read_table 등에서 manifest에 기록된 포맷으로 데이터 파일을 읽을 때 사용합니다.
+# 핸들러는 '경로를 첫 인자로 받는 호출 가능한 함수'입니다. (예: pd.read_csv)
+READER_MAPPING = {}
+
+def register_reader(output_as, fmt, handler):
+    """(출력 형식, 포맷) 쌍으로 읽기 핸들러를 등록"""
+    if output_as not in READER_MAPPING:
+        READER_MAPPING[output_as] = {}
+    READER_MAPPING[output_as][fmt] = handler
+    logger.debug(f"Reader registered: output={output_as}, format={fmt}, handler={handler}")
+
+def get_reader(output_as, fmt):
+    """출력 형식과 포맷에 맞는 읽기 핸들러를 조회 (없으면 None)"""
+    return READER_MAPPING.get(output_as, {}).get(fmt)
+
 # ---------------------------------------------------------------------------
 # 1. Pandas 쓰기 방법 등록
 # ---------------------------------------------------------------------------
@@ -47,6 +63,15 @@ try:
     # 이 핸들러는 core.py에서 특별 처리됩니다 (파일 시스템을 사용하지 않음).
     # pip install sqlalchemy
     register_writer(PANDAS_DF_TYPE, "sql", "to_sql")
+
+    # 스냅샷 테이블 읽기용 핸들러 (read_table(output_as='pandas'))
+    # 'ipc'는 Arrow IPC 파일 포맷(= Feather v2)이므로 read_feather로 읽습니다.
+    register_reader("pandas", "parquet", pd.read_parquet)
+    register_reader("pandas", "csv", pd.read_csv)
+    register_reader("pandas", "json", pd.read_json)
+    register_reader("pandas", "pickle", pd.read_pickle)
+    register_reader("pandas", "excel", pd.read_excel)
+    register_reader("pandas", "ipc", pd.read_feather)
     
     logger.info("Pandas writers registered successfully.")
 
@@ -78,6 +103,14 @@ try:
     # 이 핸들러는 core.py에서 특별 처리됩니다.
     register_writer(POLARS_DF_TYPE, "database", "write_database")
 
+    # 스냅샷 테이블 읽기용 핸들러 (read_table(output_as='polars'))
+    register_reader("polars", "parquet", pl.read_parquet)
+    register_reader("polars", "csv", pl.read_csv)
+    register_reader("polars", "json", pl.read_json)
+    register_reader("polars", "ipc", pl.read_ipc)
+    register_reader("polars", "avro", pl.read_avro)
+    register_reader("polars", "excel", pl.read_excel)
+
     logger.info("Polars writers registered successfully.")
 
 except ImportError:
@@ -106,8 +139,37 @@ try:
     register_writer(dict, "npz", np.savez)
     register_writer(dict, "npz_compressed", np.savez_compressed)
 
+    # 스냅샷 테이블 읽기용 핸들러 (read_table(output_as='numpy'))
+    # npz는 지연 로딩되는 NpzFile 대신 {이름: 배열} dict로 읽습니다.
+    def _load_npz(path):
+        with np.load(path) as npz:
+            return {name: npz[name] for name in npz.files}
+
+    register_reader("numpy", "npy", np.load)
+    register_reader("numpy", "npz", _load_npz)
+
     logger.info("NumPy writers registered successfully.")
 
 except ImportError:
     logger.info("NumPy not found. Skipping numpy writer registration.")
     pass
+
+# ---------------------------------------------------------------------------
+# 4. PyArrow 읽기 방법 등록
+# ---------------------------------------------------------------------------
+try:
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pq
+
+    # 스냅샷 테이블 읽기용 핸들러 (디코딩된 Arrow Table 캐시 등)
+    # 'ipc'는 Arrow IPC 파일 포맷(= Feather v2)이므로 feather.read_table로 읽습니다.
+    register_reader("arrow", "parquet", pq.read_table)
+    register_reader("arrow", "csv", pa_csv.read_csv)
+    register_reader("arrow", "ipc", pa_feather.read_table)
+
+    logger.info("PyArrow readers registered successfully.")
+
+except ImportError:
+    logger.info("PyArrow not found. Skipping pyarrow reader registration.")
+    pass
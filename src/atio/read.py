@@ -0,0 +1,803 @@
+"""
+스냅샷 테이블 읽기.
+
+read_table, lookup, read_changes는 버전의 데이터 파일을 필요한 것만 골라 동시에 읽고,
+scan_table, iter_batches는 polars LazyFrame/pyarrow Dataset이나 배치 단위로 지연 읽기를 제공합니다.
+table_info, table_history는 데이터 파일을 열지 않고 메타데이터만으로 테이블 정보를 반환합니다.
+"""
+
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .catalog import SqliteCatalog
+from .expire import _EXPIRE_STATE_FILENAME
+from .plugins import get_reader
+from .schema import _arrow_schema, _conform_frame, _conform_lazy, _conform_table, _file_schema, _needs_conform
+from .snapshot import (_SIZE_FIELDS, _apply_deletion_vector, _current_version, _deleted_rows, _encode_deletion_vector,
+                       _ensure_version_log, _entries_size, _has_positional_index, _live_rows, _load_snapshot, _normalize_partitions,
+                       _read_json_if_exists, _resolve_file_entries, _sum_rows, _version_as_of, _version_log_entries)
+from .stats import _bloom_may_contain, _file_may_match, _filter_predicate, _normalize_filters
+from .utils import setup_logger
+
+
+def _select_file_entries(table_path, version, filters, as_of=None, partitions=None):
+    """
+    읽을 버전의 manifest를 읽어 데이터 파일 항목을 취합하고, 파티션 값과 파일 통계로
+    partitions/filters를 만족할 수 없는 파일을 제외한 (version_id, entries, 테이블 스키마)를 반환합니다.
+    """
+    logger = setup_logger(debug_level=False)
+    if as_of is not None:
+        if version is not None:
+            raise ValueError("version과 as_of는 함께 지정할 수 없습니다.")
+        version = _version_as_of(table_path, as_of)
+    version_id, snapshot = _load_snapshot(table_path, version)
+    entries = _resolve_file_entries(table_path, snapshot, _normalize_partitions(partitions))
+
+    selected = [entry for entry in entries if _file_may_match(entry, filters)]
+    if filters is not None:
+        logger.info(f"v{version_id}: 통계 기반 pruning으로 {len(entries)}개 중 {len(selected)}개 파일을 읽습니다.")
+    return version_id, selected, snapshot.get('schema')
+
+
+def _pandas_index_columns(table):
+    """Arrow Table의 pandas 메타데이터에 기록된 인덱스 컬럼 중 table에 있는 것 (RangeIndex는 컬럼이 아님)"""
+    metadata = table.schema.pandas_metadata or {}
+    return [name for name in metadata.get('index_columns', [])
+            if isinstance(name, str) and name in table.column_names]
+
+
+def _apply_projection_and_filters(frame, output_as, columns, filters):
+    """리더에서 pushdown하지 못한 행 조건과 컬럼 선택을 읽은 DataFrame(또는 Arrow Table)에 적용합니다."""
+    if output_as == 'arrow':
+        import pyarrow.parquet as pq
+        if filters is not None:
+            frame = frame.filter(pq.filters_to_expression(filters))
+        if columns is not None:
+            # pandas로 변환할 때 인덱스를 복원할 수 있도록 인덱스 컬럼은 남깁니다.
+            frame = frame.select(list(dict.fromkeys(list(columns) + _pandas_index_columns(frame))))
+    elif output_as == 'polars':
+        import polars as pl
+        if filters is not None:
+            frame = frame.filter(_filter_predicate(filters, pl.col))
+        if columns is not None:
+            frame = frame.select(columns)
+    else:
+        if filters is not None:
+            frame = frame[_filter_predicate(filters, lambda name: frame[name])]
+        if columns is not None:
+            frame = frame[columns]
+    return frame
+
+
+def _read_data_file(path, fmt, output_as, columns=None, filters=None):
+    """
+    manifest에 기록된 포맷에 맞는 리더로 데이터 파일 하나를 읽습니다.
+    parquet은 projection/filter를 리더에 전달하고, 그 외 포맷은 읽은 뒤에 적용합니다.
+    """
+    if fmt == 'parquet' and output_as == 'pandas':
+        import pandas as pd
+        return pd.read_parquet(path, columns=columns, filters=filters)
+    if fmt == 'parquet' and output_as == 'polars':
+        import polars as pl
+        if filters is None:
+            return pl.read_parquet(path, columns=columns)
+        lazy = pl.scan_parquet(path).filter(_filter_predicate(filters, pl.col))
+        return (lazy.select(columns) if columns is not None else lazy).collect()
+
+    reader = get_reader(output_as, fmt)
+    if reader is not None:
+        frame = reader(path)
+    else:
+        # 요청한 라이브러리에 리더가 없으면 다른 DataFrame 라이브러리로 읽은 뒤 변환합니다.
+        # (예: pandas로 쓴 pickle을 polars로, polars로 쓴 avro를 pandas로)
+        other = 'polars' if output_as == 'pandas' else 'pandas'
+        fallback = get_reader(other, fmt)
+        if fallback is None:
+            raise ValueError(f"'{fmt}' 포맷의 데이터 파일을 '{output_as}' 형식으로 읽을 수 있는 리더가 없습니다: {path}")
+        frame = fallback(path)
+        if output_as == 'polars':
+            import polars as pl
+            frame = pl.from_pandas(frame)
+        else:
+            frame = frame.to_pandas()
+    return _apply_projection_and_filters(frame, output_as, columns, filters)
+
+
+class _DecodedTableCache:
+    """
+    데이터 파일별로 디코딩된 Arrow Table을 보관하는 프로세스 내 LRU 캐시.
+    data/ 아래의 데이터 파일은 고유한 이름으로 한 번 쓰인 뒤 바뀌지 않으므로 경로를 키로 써도 안전합니다.
+    보관 중인 Table 크기의 합이 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, max_bytes):
+        from collections import OrderedDict
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self._tables.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, key, table):
+        size = table.nbytes
+        if size > self.max_bytes:
+            # 예산보다 큰 Table은 다른 항목을 모두 밀어내므로 보관하지 않습니다.
+            return
+        with self._lock:
+            if key in self._tables:
+                return
+            self._tables[key] = table
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._tables.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def info(self):
+        with self._lock:
+            return {
+                'max_bytes': self.max_bytes,
+                'current_bytes': self.current_bytes,
+                'entries': len(self._tables),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_READ_CACHE = None
+
+
+def enable_read_cache(max_bytes=1024 * 1024 * 1024):
+    """
+    read_table/read_changes가 읽은 데이터 파일을 디코딩된 Arrow Table로 캐시합니다 (프로세스 내, LRU).
+
+    같은 버전을 반복해서 읽으면 파일을 다시 읽고 디코딩하지 않고 캐시에서 DataFrame으로 변환만 합니다.
+    캐시를 사용하는 동안 parquet 행 조건은 리더에 전달되지 않고 캐시된 Table을 읽은 뒤 적용됩니다.
+    다시 호출하면 기존 캐시를 비우고 새 예산으로 시작합니다.
+
+    Args:
+        max_bytes (int): 캐시할 Arrow Table 크기 합의 상한(바이트). Defaults to 1GB.
+    """
+    global _READ_CACHE
+    _READ_CACHE = _DecodedTableCache(max_bytes)
+
+
+def disable_read_cache():
+    """읽기 캐시를 끄고 캐시된 Table을 모두 해제합니다."""
+    global _READ_CACHE
+    _READ_CACHE = None
+
+
+def read_cache_info():
+    """읽기 캐시 상태 {'max_bytes', 'current_bytes', 'entries', 'hits', 'misses'}. 꺼져 있으면 None."""
+    cache = _READ_CACHE
+    return cache.info() if cache is not None else None
+
+
+def _read_arrow_table(path, fmt, columns=None, memory_map=False):
+    """
+    데이터 파일 하나를 Arrow Table로 읽습니다. Arrow 리더가 없는 포맷은 DataFrame 리더로 읽어 변환합니다.
+    memory_map이면 ipc 파일을 메모리 매핑하여, 압축되지 않은 파일은 복사 없이 페이지 캐시를 직접 참조합니다.
+    """
+    import pyarrow as pa
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        # pd.read_parquet과 같이 columns를 지정해도 pandas 메타데이터에 기록된 인덱스 컬럼을 함께 읽습니다.
+        return pq.read_table(path, columns=columns, memory_map=memory_map, use_pandas_metadata=True)
+
+    if fmt == 'ipc' and memory_map:
+        # 반환된 Table의 버퍼가 매핑을 참조하므로 매핑은 Table이 해제될 때 함께 닫힙니다.
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.select(columns) if columns is not None else table
+
+    reader = get_reader('arrow', fmt)
+    if reader is not None:
+        table = reader(path)
+    elif get_reader('polars', fmt) is not None:
+        table = get_reader('polars', fmt)(path).to_arrow()
+    elif get_reader('pandas', fmt) is not None:
+        table = pa.Table.from_pandas(get_reader('pandas', fmt)(path), preserve_index=False)
+    else:
+        raise ValueError(f"'{fmt}' 포맷의 데이터 파일을 읽을 수 있는 리더가 없습니다: {path}")
+    return table.select(columns) if columns is not None else table
+
+
+def _columns_with_filters(columns, filters):
+    """행 조건을 읽은 뒤에 적용할 때 함께 읽어야 하는 컬럼 (columns + 조건 컬럼)"""
+    if columns is None or filters is None:
+        return columns
+    return list(dict.fromkeys(list(columns) + [col for conj in filters for col, _, _ in conj]))
+
+
+def _arrow_to_output(table, output_as):
+    """Arrow Table을 요청한 출력 형식으로 변환합니다. ('arrow'는 그대로)"""
+    if output_as == 'arrow':
+        return table
+    if output_as == 'polars':
+        import polars as pl
+        return pl.from_arrow(table)
+    return table.to_pandas()
+
+
+def _read_data_file_arrow(path, fmt, output_as, columns=None, filters=None, memory_map=False, cache=None):
+    """
+    데이터 파일 하나를 Arrow Table로 읽어(캐시가 있으면 캐시를 거쳐) 요청한 출력 형식으로 반환합니다.
+    행 조건은 읽은 Table에 적용합니다.
+    """
+    read_columns = _columns_with_filters(columns, filters)
+    key = (os.path.abspath(path), tuple(read_columns) if read_columns is not None else None)
+
+    table = cache.get(key) if cache is not None else None
+    if table is None:
+        table = _read_arrow_table(path, fmt, read_columns, memory_map)
+        if cache is not None:
+            cache.put(key, table)
+    return _apply_projection_and_filters(_arrow_to_output(table, output_as), output_as, columns, filters)
+
+
+def _unify_categories(frames):
+    """
+    파일마다 범주가 다른 pandas 범주형 컬럼의 범주를 합칩니다.
+    범주가 다르면 pd.concat이 범주형을 일반 컬럼으로 풀어 버리기 때문입니다.
+    """
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    dtypes = {}
+    for name in frames[0].columns:
+        columns = [frame[name] for frame in frames if name in frame.columns]
+        if (all(isinstance(column.dtype, pd.CategoricalDtype) for column in columns)
+                and len({column.dtype for column in columns}) > 1):
+            dtypes[name] = pd.CategoricalDtype(union_categoricals(columns, ignore_order=True).categories)
+    if not dtypes:
+        return frames
+    return [frame.astype({name: dtype for name, dtype in dtypes.items() if name in frame.columns}) for frame in frames]
+
+
+def _concat_frames(frames, output_as):
+    """
+    파일별로 읽은 결과를 이어 붙입니다. pandas는 파일 수와 관계없이 같은 규칙으로 인덱스를 정합니다.
+    parquet에 저장된 인덱스(이름 있는 인덱스 등)는 유지하고, 행 번호 인덱스는 0부터 다시 매깁니다.
+    """
+    if output_as == 'pandas':
+        import pandas as pd
+        positional = all(_has_positional_index(frame) for frame in frames)
+        if len(frames) == 1:
+            frame = frames[0]
+            if positional and not frame.index.equals(pd.RangeIndex(len(frame))):
+                frame = frame.reset_index(drop=True)
+            return frame
+        return pd.concat(_unify_categories(frames), ignore_index=positional)
+    if len(frames) == 1:
+        return frames[0]
+    if output_as == 'arrow':
+        # 각 파일의 Table을 chunk로 이어 붙이므로 데이터는 복사되지 않습니다.
+        import pyarrow as pa
+        return pa.concat_tables(frames)
+    import polars as pl
+    return pl.concat(frames)
+
+
+def read_table(table_path, version=None, output_as='pandas', columns=None, filters=None, max_workers=None, as_of=None,
+               partitions=None, memory_map=False):
+    """
+    스냅샷 테이블의 특정 버전(기본값: 최신)을 읽어옵니다.
+
+    각 데이터 파일은 manifest에 기록된 포맷(parquet, csv, json, ipc 등)에 맞는 리더로 읽으며,
+    파일이 여러 개이면 스레드 풀에서 동시에 읽은 뒤 manifest 순서대로 이어 붙입니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        version (int, optional): 읽을 버전. None이면 최신 버전. Defaults to None.
+        output_as (str): 반환 형식 ('pandas', 'polars', 'arrow', 'numpy'). 'arrow'는 pyarrow.Table을 반환하며,
+            파일별 Table을 복사 없이 chunk로 이어 붙입니다. 'numpy'는 npy/npz로 쓴 테이블이면 배열
+            (npz는 {이름: 배열})을, 그 외 포맷이면 컬럼을 나란히 쌓은 2차원 배열을 pandas를 거치지 않고
+            반환합니다. Defaults to 'pandas'.
+        columns (list, optional): 읽을 컬럼 목록. 지정하지 않은 컬럼 chunk는 디코딩하지 않습니다.
+            Defaults to None (모든 컬럼).
+        filters (list, optional): [(컬럼, 연산자, 값), ...] 형태의 행 조건 (리스트의 리스트는 OR).
+            manifest에 기록된 파일별 min/max, null 개수로 조건을 만족할 수 없는 데이터 파일은
+            열지 않고 건너뛰며, 남은 파일에서는 parquet 리더에 조건을 전달해 row group 단위로
+            건너뜁니다. Defaults to None.
+        max_workers (int, optional): 동시에 읽을 최대 파일 수. None이면 ThreadPoolExecutor 기본값.
+        as_of (datetime | float, optional): 이 시각에 유효했던 버전을 읽습니다 (시간 여행).
+            version과 함께 지정할 수 없습니다. Defaults to None.
+        partitions (dict, optional): {파티션 컬럼: 값 또는 값 목록}. partition_by로 쓴 테이블에서
+            해당 파티션의 파일만 읽으며, 다른 파티션만 담은 manifest는 열지 않습니다. 그 컬럼으로 나누어
+            쓰지 않은 데이터 파일을 읽어야 하면 ValueError가 발생합니다. Defaults to None.
+        memory_map (bool): True이면 데이터 파일을 메모리 매핑하여 읽습니다. 압축되지 않은 ipc 파일을
+            output_as='arrow'로 읽으면 복사 없이 페이지 캐시를 직접 참조하므로, 같은 호스트의 여러
+            프로세스가 메모리를 공유합니다. Defaults to False.
+    """
+    if output_as not in ('pandas', 'polars', 'arrow', 'numpy'):
+        raise ValueError(f"지원하지 않는 출력 형식: {output_as}")
+    filters = _normalize_filters(filters)
+
+    # 1~2. 읽을 버전의 데이터 파일 목록을 취합하고 파일 통계로 조건을 만족할 수 없는 파일 제외
+    _, selected, schema = _select_file_entries(table_path, version, filters, as_of, partitions)
+    if not selected:
+        # 데이터가 없는 경우 처리
+        return None # 또는 빈 DataFrame
+
+    # 3. 파일별 포맷에 맞게 (여러 파일이면 병렬로) 읽은 뒤 하나로 합치기
+    #    스키마가 바뀌기 전에 쓴 파일은 snapshot의 테이블 스키마에 맞춥니다.
+    if output_as == 'numpy':
+        return _read_numpy(table_path, selected, columns, filters, max_workers, memory_map, schema)
+    return _read_file_entries(table_path, selected, output_as, columns, filters, max_workers, memory_map, schema)
+
+
+def lookup(table_path, column, values, version=None, output_as='pandas', columns=None, max_workers=None, as_of=None):
+    """
+    column 값이 values 중 하나인 행을 읽습니다 (키 조회).
+
+    파일 통계의 min/max로 키 범위를 벗어난 파일을 먼저 제외하고, write_snapshot(index_columns=...)으로
+    블룸 필터가 기록된 파일은 필터에 키가 없으면 열지 않습니다. 블룸 필터가 없는 파일은 그대로 읽습니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        column (str): 조회할 키 컬럼.
+        values: 찾을 키 값 또는 값 목록.
+        version (int, optional): 읽을 버전. None이면 최신 버전. Defaults to None.
+        output_as (str): 반환 형식 ('pandas', 'polars', 'arrow'). Defaults to 'pandas'.
+        columns (list, optional): 읽을 컬럼 목록. Defaults to None (모든 컬럼).
+        max_workers (int, optional): 동시에 읽을 최대 파일 수. Defaults to None.
+        as_of (datetime | float, optional): 이 시각에 유효했던 버전을 읽습니다. Defaults to None.
+
+    Returns:
+        조회된 행. 키를 포함할 수 있는 파일이 없으면 None.
+    """
+    if output_as not in ('pandas', 'polars', 'arrow'):
+        raise ValueError(f"지원하지 않는 출력 형식: {output_as}")
+    logger = setup_logger(debug_level=False)
+    if not isinstance(values, (list, tuple, set, frozenset, np.ndarray)):
+        values = [values]
+    values = list(values)
+    filters = [[(column, 'in', values)]]
+
+    version_id, candidates, schema = _select_file_entries(table_path, version, filters, as_of)
+    hash_cache = {}
+    selected = [
+        entry for entry in candidates
+        if column not in (entry.get('bloom_filters') or {})
+        or _bloom_may_contain(entry['bloom_filters'][column], values, hash_cache)
+    ]
+    logger.info(f"v{version_id}: 블룸 필터로 {len(candidates)}개 중 {len(selected)}개 파일을 읽습니다.")
+    if not selected:
+        return None
+    return _read_file_entries(table_path, selected, output_as, columns, filters, max_workers, schema=schema)
+
+
+def _arrow_to_numpy(table):
+    """
+    Arrow Table의 컬럼을 나란히 쌓은 (행 수, 컬럼 수) 배열로 변환합니다.
+    chunk를 numpy 뷰로 받아 결과 배열에 한 번만 복사합니다. (null이 있는 정수 컬럼은 float이 됩니다)
+    """
+    parts = [[chunk.to_numpy(zero_copy_only=False) for chunk in column.chunks] for column in table.columns]
+    dtypes = [part.dtype for column_parts in parts for part in column_parts]
+    result = np.empty((table.num_rows, table.num_columns), dtype=np.result_type(*dtypes) if dtypes else np.float64)
+    for j, column_parts in enumerate(parts):
+        offset = 0
+        for part in column_parts:
+            result[offset:offset + len(part), j] = part
+            offset += len(part)
+    return result
+
+
+def _read_numpy(table_path, entries, columns, filters, max_workers, memory_map, schema=None):
+    """read_table(output_as='numpy'): npy/npz 데이터 파일은 배열로, 그 외 포맷은 Arrow를 거쳐 2차원 배열로 읽습니다."""
+    formats = {entry.get('format', 'parquet') for entry in entries}
+    array_formats = formats & {'npy', 'npz'}
+    if not array_formats:
+        return _arrow_to_numpy(
+            _read_file_entries(table_path, entries, 'arrow', columns, filters, max_workers, memory_map, schema)
+        )
+    if len(formats) > 1:
+        raise ValueError(f"npy/npz 데이터 파일과 다른 포맷이 섞인 테이블은 numpy로 읽을 수 없습니다: {sorted(formats)}")
+    if filters is not None:
+        raise ValueError("npy/npz 데이터 파일에는 filters를 적용할 수 없습니다.")
+
+    fmt = formats.pop()
+    if fmt == 'npy' and columns is not None:
+        raise ValueError("npy 데이터 파일에는 columns를 적용할 수 없습니다.")
+    reader = get_reader('numpy', fmt)
+
+    def read_one(entry):
+        path = os.path.join(table_path, entry['path'])
+        if fmt == 'npy' and memory_map:
+            return reader(path, mmap_mode='r')
+        return reader(path)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        arrays = list(executor.map(read_one, entries))
+    if fmt == 'npy':
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+    names = columns if columns is not None else list(arrays[0])
+    return {
+        name: arrays[0][name] if len(arrays) == 1 else np.concatenate([npz[name] for npz in arrays])
+        for name in names
+    }
+
+
+def _read_file_entries(table_path, entries, output_as, columns, filters, max_workers, memory_map=False, schema=None):
+    """
+    데이터 파일 항목들을 (여러 개이면 스레드 풀에서 병렬로) 읽어 순서대로 이어 붙입니다.
+    schema(테이블 스키마)를 주면 manifest에 기록된 스키마가 다른 파일만 읽은 뒤 테이블 스키마에 맞춥니다.
+    """
+    cache = _READ_CACHE
+    via_arrow = cache is not None or output_as == 'arrow' or memory_map
+
+    def read_one(entry):
+        path = os.path.join(table_path, entry['path'])
+        fmt = entry.get('format', 'parquet')
+        wanted = _columns_with_filters(columns, filters)
+        conform = _needs_conform(entry, schema, wanted)
+        if 'deletion_vector' in entry or conform:
+            # 삭제 벡터는 파일 안의 행 위치 기준이고, 스키마가 다른 파일에는 조건 컬럼이 없을 수 있으므로
+            # 행 조건을 리더에 전달하지 않고 읽은 뒤에 적용합니다.
+            read_columns = wanted
+            if conform and read_columns is not None and entry.get('schema') is not None:
+                read_columns = [name for name in read_columns if name in entry['schema']]
+            if via_arrow:
+                frame = _read_data_file_arrow(path, fmt, output_as, read_columns, None, memory_map, cache)
+            else:
+                frame = _read_data_file(path, fmt, output_as, read_columns)
+            if 'deletion_vector' in entry:
+                frame = _apply_deletion_vector(frame, output_as, entry)
+            if conform:
+                frame = _conform_frame(frame, output_as, schema, wanted)
+            return _apply_projection_and_filters(frame, output_as, columns, filters)
+        if via_arrow:
+            return _read_data_file_arrow(path, fmt, output_as, columns, filters, memory_map, cache)
+        return _read_data_file(path, fmt, output_as, columns, filters)
+
+    if len(entries) == 1:
+        frames = [read_one(entries[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(read_one, entries))
+    return _concat_frames(frames, output_as)
+
+
+def read_changes(table_path, from_version, to_version=None, output_as='pandas', columns=None, filters=None,
+                 max_workers=None, files_only=False):
+    """
+    두 버전 사이에 추가되거나 삭제된 데이터만 읽어옵니다 (증분 변경 피드).
+
+    두 snapshot의 manifest 목록을 비교하여 한쪽에만 있는 manifest만 열기 때문에,
+    비용이 테이블 전체 크기가 아니라 변경된 양에 비례합니다. 양쪽 manifest에 모두 있는
+    파일(예: manifest만 다시 쓴 경우)은 변경으로 보지 않습니다. optimize_table로 파일을 합친
+    버전은 합쳐진 파일의 행이 삭제된 뒤 다시 추가된 것으로 나타납니다. delete_rows/upsert가
+    삭제 벡터로 지운 행은 그 행만 삭제된 쪽에 나타납니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        from_version (int): 기준 버전. 0이면 빈 테이블을 기준으로 합니다.
+        to_version (int, optional): 비교할 버전. None이면 최신 버전. Defaults to None.
+        output_as (str): 반환 형식 ('pandas', 'polars', 'arrow'). Defaults to 'pandas'.
+        columns (list, optional): 읽을 컬럼 목록. Defaults to None (모든 컬럼).
+        filters (list, optional): read_table과 동일한 형식의 행 조건. Defaults to None.
+        max_workers (int, optional): 동시에 읽을 최대 파일 수. Defaults to None.
+        files_only (bool): True이면 데이터를 읽지 않고 (추가된 파일 항목, 삭제된 파일 항목)을 반환합니다.
+            Defaults to False.
+
+    Returns:
+        tuple: (추가된 행, 삭제된 행). 변경이 없는 쪽은 None입니다.
+    """
+    if output_as not in ('pandas', 'polars', 'arrow'):
+        raise ValueError(f"지원하지 않는 출력 형식: {output_as}")
+    filters = _normalize_filters(filters)
+
+    to_version, to_snapshot = _load_snapshot(table_path, to_version)
+    if from_version > to_version:
+        raise ValueError(f"from_version(v{from_version})이 to_version(v{to_version})보다 큽니다.")
+    from_snapshot = _load_snapshot(table_path, from_version)[1] if from_version > 0 else {'manifests': []}
+
+    from_manifests = set(from_snapshot['manifests'])
+    to_manifests = set(to_snapshot['manifests'])
+    added = _resolve_file_entries(table_path, {'manifests': [m for m in to_snapshot['manifests'] if m not in from_manifests]})
+    removed = _resolve_file_entries(table_path, {'manifests': [m for m in from_snapshot['manifests'] if m not in to_manifests]})
+
+    # 다른 manifest로 옮겨졌을 뿐인 파일은 변경이 아님. 삭제 벡터가 늘어난 파일은 새로 삭제된 행만
+    # 남기는 삭제 벡터를 붙여 삭제된 쪽에 포함합니다.
+    added_by_path = {entry['path']: entry for entry in added}
+    removed_by_path = {entry['path']: entry for entry in removed}
+    deleted = []
+    for path in added_by_path.keys() & removed_by_path.keys():
+        new_entry, old_entry = added_by_path[path], removed_by_path[path]
+        if new_entry.get('deletion_vector') == old_entry.get('deletion_vector'):
+            continue
+        num_rows = new_entry['num_rows']
+        newly_deleted = _deleted_rows(new_entry, num_rows) & ~_deleted_rows(old_entry, num_rows)
+        if newly_deleted.any():
+            deleted.append(dict(new_entry, deletion_vector=_encode_deletion_vector(~newly_deleted)))
+    added = [e for e in added if e['path'] not in removed_by_path and _file_may_match(e, filters)]
+    removed = [e for e in removed if e['path'] not in added_by_path] + deleted
+    removed = [e for e in removed if _file_may_match(e, filters)]
+    if files_only:
+        return added, removed
+
+    def read(entries, schema):
+        if not entries:
+            return None
+        return _read_file_entries(table_path, entries, output_as, columns, filters, max_workers, schema=schema)
+
+    return read(added, to_snapshot.get('schema')), read(removed, from_snapshot.get('schema'))
+
+
+# 지연 스캔을 지원하는 포맷: polars scan 함수 이름 / pyarrow.dataset 포맷 이름
+_POLARS_SCANNERS = {'parquet': 'scan_parquet', 'csv': 'scan_csv', 'ipc': 'scan_ipc'}
+_ARROW_DATASET_FORMATS = {'parquet': 'parquet', 'csv': 'csv', 'ipc': 'ipc'}
+
+
+def _group_paths_by_format(table_path, entries):
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry.get('format', 'parquet'), []).append(os.path.join(table_path, entry['path']))
+    return groups
+
+
+_ROW_INDEX_COLUMN = '__atio_row_index'
+
+
+def _polars_scan(table_path, entries, schema=None):
+    """
+    데이터 파일들을 포맷별로 묶어 polars 지연 스캔으로 엽니다. 삭제 벡터가 있는 파일은 따로 열어
+    행 번호 컬럼으로 삭제된 행을 제외하므로, 뒤에 붙는 조건이 스캔으로 pushdown되어도 위치가 어긋나지 않습니다.
+    스키마가 테이블 스키마와 다른 파일도 따로 열어 테이블 스키마에 맞추는 projection을 붙입니다.
+    """
+    import polars as pl
+    plain = [entry for entry in entries if 'deletion_vector' not in entry and not _needs_conform(entry, schema)]
+    lazies = []
+    for fmt, paths in _group_paths_by_format(table_path, plain).items():
+        if fmt not in _POLARS_SCANNERS:
+            raise ValueError(f"'{fmt}' 포맷은 지연 스캔을 지원하지 않습니다. (지원: {', '.join(_POLARS_SCANNERS)})")
+        lazies.append(getattr(pl, _POLARS_SCANNERS[fmt])(paths))
+    for entry in entries:
+        conform = _needs_conform(entry, schema)
+        if 'deletion_vector' not in entry and not conform:
+            continue
+        fmt = entry.get('format', 'parquet')
+        if fmt not in _POLARS_SCANNERS:
+            raise ValueError(f"'{fmt}' 포맷은 지연 스캔을 지원하지 않습니다. (지원: {', '.join(_POLARS_SCANNERS)})")
+        lazy = getattr(pl, _POLARS_SCANNERS[fmt])(os.path.join(table_path, entry['path']))
+        if 'deletion_vector' in entry:
+            deleted = pl.Series(np.flatnonzero(_deleted_rows(entry, entry['num_rows'])), dtype=pl.Int64)
+            row_index = pl.col(_ROW_INDEX_COLUMN).cast(pl.Int64)
+            lazy = (
+                lazy.with_row_index(_ROW_INDEX_COLUMN)
+                .filter(~row_index.is_in(deleted.implode()))
+                .drop(_ROW_INDEX_COLUMN)
+            )
+        if conform:
+            lazy = _conform_lazy(lazy, entry.get('schema'), schema)
+        lazies.append(lazy)
+    return lazies[0] if len(lazies) == 1 else pl.concat(lazies)
+
+
+def _arrow_dataset(table_path, entries, schema=None):
+    """
+    데이터 파일들을 포맷별로 묶어 pyarrow Dataset으로 엽니다. Dataset에는 행 위치 조건을 표현할 수 없으므로
+    삭제 벡터가 있는 파일은 읽어서 삭제된 행을 제외한 인메모리 Dataset으로 포함합니다.
+    schema(테이블 스키마)를 주면 Dataset 스키마로 지정하므로 첫 파일의 footer로 스키마를 추론하지 않고,
+    스키마가 바뀌기 전에 쓴 파일의 없는 컬럼은 null로, 좁은 타입은 넓어진 타입으로 읽힙니다.
+    """
+    import pyarrow.dataset as ds
+    arrow_schema = _arrow_schema(schema) if schema is not None else None
+    datasets = []
+    for fmt, paths in _group_paths_by_format(table_path, [e for e in entries if 'deletion_vector' not in e]).items():
+        if fmt not in _ARROW_DATASET_FORMATS:
+            raise ValueError(f"'{fmt}' 포맷은 지연 스캔을 지원하지 않습니다. (지원: {', '.join(_ARROW_DATASET_FORMATS)})")
+        datasets.append(ds.dataset(paths, format=_ARROW_DATASET_FORMATS[fmt], schema=arrow_schema))
+    for entry in entries:
+        if 'deletion_vector' in entry:
+            path = os.path.join(table_path, entry['path'])
+            table = _apply_deletion_vector(_read_arrow_table(path, entry.get('format', 'parquet')), 'arrow', entry)
+            if arrow_schema is not None:
+                table = _conform_table(table, schema)
+            datasets.append(ds.dataset(table))
+    return datasets[0] if len(datasets) == 1 else ds.dataset(datasets)
+
+
+def _deleted_rows_batches(table_path, entry, batch_size, columns, filters, schema=None):
+    """삭제 벡터가 있는 데이터 파일을 배치 단위로 읽으며 배치 위치에 해당하는 삭제된 행을 제외합니다."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    fmt = entry.get('format', 'parquet')
+    if fmt not in _ARROW_DATASET_FORMATS:
+        raise ValueError(f"'{fmt}' 포맷은 지연 스캔을 지원하지 않습니다. (지원: {', '.join(_ARROW_DATASET_FORMATS)})")
+    keep = ~_deleted_rows(entry, entry['num_rows'])
+    dataset = ds.dataset(os.path.join(table_path, entry['path']), format=_ARROW_DATASET_FORMATS[fmt],
+                         schema=_arrow_schema(schema) if schema is not None else None)
+    offset = 0
+    for batch in dataset.to_batches(columns=_columns_with_filters(columns, filters), batch_size=batch_size):
+        table = pa.Table.from_batches([batch]).filter(pa.array(keep[offset:offset + batch.num_rows]))
+        offset += batch.num_rows
+        yield from _apply_projection_and_filters(table, 'arrow', columns, filters).to_batches()
+
+
+def scan_table(table_path, version=None, output_as='polars', filters=None, as_of=None, partitions=None):
+    """
+    스냅샷 테이블을 메모리에 올리지 않고 지연(lazy) 스캔 객체로 반환합니다.
+
+    - 'polars': polars.LazyFrame. filters는 조건식으로 추가되어 쿼리 최적화기가
+      projection/predicate pushdown을 수행합니다.
+    - 'arrow': pyarrow.dataset.Dataset. filters는 파일 단위 pruning에만 사용되며,
+      행 조건은 dataset.to_table(filter=...) 등 호출 측에서 지정합니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        version (int, optional): 읽을 버전. None이면 최신 버전. Defaults to None.
+        output_as (str): 반환 형식 ('polars', 'arrow'). Defaults to 'polars'.
+        filters (list, optional): read_table과 동일한 형식의 조건. Defaults to None.
+        as_of (datetime | float, optional): 이 시각에 유효했던 버전을 스캔합니다. Defaults to None.
+        partitions (dict, optional): read_table과 동일한 형식의 파티션 조건. Defaults to None.
+    """
+    filters = _normalize_filters(filters)
+    _, selected, schema = _select_file_entries(table_path, version, filters, as_of, partitions)
+    if not selected:
+        return None
+
+    if output_as == 'polars':
+        import polars as pl
+        lazy = _polars_scan(table_path, selected, schema)
+        if filters is not None:
+            lazy = lazy.filter(_filter_predicate(filters, pl.col))
+        return lazy
+    elif output_as == 'arrow':
+        return _arrow_dataset(table_path, selected, schema)
+
+    raise ValueError(f"지원하지 않는 출력 형식: {output_as}")
+
+
+def iter_batches(table_path, version=None, batch_size=65536, columns=None, filters=None, output_as='arrow', as_of=None,
+                 partitions=None):
+    """
+    스냅샷 테이블을 최대 batch_size 행 단위로 스트리밍하는 제너레이터.
+    한 번에 하나의 배치만 메모리에 올리므로 테이블 크기와 무관하게 메모리 사용량이 제한됩니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        version (int, optional): 읽을 버전. None이면 최신 버전. Defaults to None.
+        batch_size (int): 배치당 최대 행 수. Defaults to 65536.
+        columns (list, optional): 읽을 컬럼 목록. Defaults to None.
+        filters (list, optional): read_table과 동일한 형식의 조건. Defaults to None.
+        output_as (str): 배치 형식 ('arrow', 'pandas', 'polars'). Defaults to 'arrow'.
+        as_of (datetime | float, optional): 이 시각에 유효했던 버전을 읽습니다. Defaults to None.
+        partitions (dict, optional): read_table과 동일한 형식의 파티션 조건. Defaults to None.
+
+    Yields:
+        pyarrow.RecordBatch 또는 output_as에 해당하는 DataFrame.
+    """
+    if output_as not in ('arrow', 'pandas', 'polars'):
+        raise ValueError(f"지원하지 않는 출력 형식: {output_as}")
+
+    import pyarrow.parquet as pq
+
+    filters = _normalize_filters(filters)
+    _, selected, schema = _select_file_entries(table_path, version, filters, as_of, partitions)
+    if not selected:
+        return
+
+    # 삭제 벡터가 있는 파일은 행 위치를 맞추기 위해 조건 없이 파일별로 스트리밍한 뒤 조건을 적용합니다.
+    plain = [entry for entry in selected if 'deletion_vector' not in entry]
+    batches = itertools.chain.from_iterable(
+        _deleted_rows_batches(table_path, entry, batch_size, columns, filters, schema)
+        for entry in selected if 'deletion_vector' in entry
+    )
+    if plain:
+        expression = pq.filters_to_expression(filters) if filters is not None else None
+        batches = itertools.chain(
+            _arrow_dataset(table_path, plain, schema).to_batches(columns=columns, filter=expression, batch_size=batch_size),
+            batches,
+        )
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        if output_as == 'pandas':
+            yield batch.to_pandas()
+        elif output_as == 'polars':
+            import polars as pl
+            yield pl.from_arrow(batch)
+        else:
+            yield batch
+
+
+def table_info(table_path, version=None, as_of=None):
+    """
+    데이터 파일을 읽지 않고 메타데이터만으로 테이블 요약(행 수, 컬럼과 타입, 크기)을 반환합니다.
+
+    write_snapshot이 manifest에 기록한 파일별 행 수, 크기, 스키마를 합산합니다. 행 수가 기록되지 않은
+    이전 parquet 파일은 footer만 읽어 보완하며, 그 외 포맷이면 num_rows는 None입니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        version (int, optional): 조회할 버전. None이면 최신 버전. Defaults to None.
+        as_of (datetime | float, optional): 이 시각에 유효했던 버전을 조회합니다. Defaults to None.
+
+    Returns:
+        dict: {'version', 'timestamp', 'num_rows', 'num_files', 'size_bytes', 'columns', 'partition_columns'}.
+            columns는 {컬럼: Arrow 타입 문자열}로, snapshot에 기록된 테이블 스키마입니다.
+            (스키마를 기록하기 전에 커밋된 버전이면 파일별 스키마에서 처음 기록된 타입을 따릅니다.)
+    """
+    import pyarrow.parquet as pq
+
+    if as_of is not None:
+        if version is not None:
+            raise ValueError("version과 as_of는 함께 지정할 수 없습니다.")
+        version = _version_as_of(table_path, as_of)
+    version_id, snapshot = _load_snapshot(table_path, version)
+    entries = _resolve_file_entries(table_path, snapshot)
+
+    num_rows = 0
+    table_schema = snapshot.get('schema')
+    columns = dict(table_schema or {})
+    partition_columns = []
+    for entry in entries:
+        rows = _live_rows(entry)
+        schema = table_schema or entry.get('schema')
+        if (rows is None or schema is None) and entry.get('format', 'parquet') == 'parquet':
+            path = os.path.join(table_path, entry['path'])
+            rows = pq.read_metadata(path).num_rows if rows is None else rows
+            schema = schema or _file_schema(None, path, 'parquet')
+        num_rows = _sum_rows(num_rows, rows)
+        for name, type_name in (schema or {}).items():
+            columns.setdefault(name, type_name)
+        for name in entry.get('partition') or {}:
+            if name not in partition_columns:
+                partition_columns.append(name)
+
+    return {
+        'version': version_id,
+        'timestamp': snapshot['timestamp'],
+        'num_rows': num_rows,
+        'num_files': len(entries),
+        'size_bytes': _entries_size(table_path, entries)[0],
+        'columns': columns,
+        'partition_columns': partition_columns,
+    }
+
+
+def table_history(table_path):
+    """
+    보관 중인 버전별 커밋 이력을 버전 로그에서 읽어 반환합니다 (용량 모니터링용).
+
+    Returns:
+        list: 버전 순서대로 {'version', 'timestamp', 'added_bytes', 'table_bytes', 'added_rows', 'table_rows'}.
+            added_*는 해당 커밋이 새로 쓴 데이터, table_*는 해당 버전이 참조하는 데이터입니다.
+            기록되지 않은 값(이전 형식의 버전)은 None입니다.
+    """
+    latest_version = _current_version(table_path)
+    if latest_version == 0:
+        return []
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        first_version = catalog.oldest_version()
+    else:
+        _ensure_version_log(table_path, latest_version)
+        state = _read_json_if_exists(os.path.join(table_path, 'metadata', _EXPIRE_STATE_FILENAME))
+        first_version = state['expired_through'] + 1 if state else 1
+
+    entries = _version_log_entries(table_path, range(first_version, latest_version + 1))
+    return [
+        {
+            'version': version,
+            'timestamp': entry['timestamp'],
+            **{field: entry.get(field) for field in _SIZE_FIELDS},
+        }
+        for version, entry in sorted(entries.items())
+    ]
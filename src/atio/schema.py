@@ -0,0 +1,223 @@
+"""
+스냅샷 테이블의 스키마 기록과 스키마 진화.
+
+데이터 파일마다 manifest에 {컬럼: 타입 문자열} 형태의 스키마를 기록하고, append로 스키마가 바뀌면
+허용된 변경(컬럼 추가, 타입 넓히기)만 테이블 스키마에 합칩니다. 읽을 때는 스키마가 바뀌기 전에 쓴 파일을
+테이블 스키마에 맞춰 없는 컬럼은 null로 채우고 좁은 타입은 넓어진 타입으로 변환합니다.
+"""
+
+import re
+
+
+def _schema_dict(schema):
+    """Arrow 스키마를 manifest에 기록할 {컬럼: 타입 문자열}로 변환합니다."""
+    return {field.name: str(field.type) for field in schema if not field.name.startswith('__index_level_')}
+
+
+def _file_schema(obj, path, format):
+    """데이터 파일의 {컬럼: Arrow 타입 문자열}. parquet은 footer에서, 그 외 포맷은 DataFrame에서 구합니다."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if format == 'parquet':
+        schema = pq.read_schema(path)
+    elif hasattr(obj, 'to_arrow'):
+        # polars.DataFrame: 빈 프레임으로 변환해 스키마만 얻습니다.
+        schema = obj.head(0).to_arrow().schema
+    else:
+        schema = pa.Schema.from_pandas(obj, preserve_index=False)
+    return _schema_dict(schema)
+
+
+# 스키마 진화: 기존 타입의 값을 잃지 않고 넓힐 수 있는 타입만 허용합니다.
+_INTEGER_BITS = {'int8': 8, 'int16': 16, 'int32': 32, 'int64': 64,
+                 'uint8': 8, 'uint16': 16, 'uint32': 32, 'uint64': 64}
+_FLOAT_TYPES = ('halffloat', 'float', 'double')
+_LARGE_TYPES = {'string': 'large_string', 'binary': 'large_binary'}
+_TIMESTAMP_UNITS = ('s', 'ms', 'us', 'ns')
+_TIMESTAMP_PATTERN = re.compile(r'timestamp\[(\w+)(?:, tz=(.+))?\]')
+_DICTIONARY_PATTERN = re.compile(r'dictionary<values=(.+), indices=(\w+), ordered=([01])>')
+
+
+def _widened_integer(a, b):
+    """두 정수 타입의 값을 모두 표현할 수 있는 가장 좁은 정수 타입. 없으면 None."""
+    a_signed, b_signed = a.startswith('int'), b.startswith('int')
+    a_bits, b_bits = _INTEGER_BITS[a], _INTEGER_BITS[b]
+    if a_signed == b_signed:
+        return a if a_bits >= b_bits else b
+    # 부호가 다르면 부호 없는 쪽 범위를 담을 수 있는 부호 있는 타입이 필요합니다.
+    bits = max(a_bits if a_signed else 2 * a_bits, b_bits if b_signed else 2 * b_bits)
+    return f'int{bits}' if bits <= 64 else None
+
+
+def _widened_type(current, new):
+    """
+    테이블 컬럼 타입 current에 타입 new인 데이터를 더할 때 테이블이 가질 타입 (타입 문자열, _schema_dict 표기).
+    정수는 더 넓은 정수로, 정수와 실수는 double로, string/binary는 large_*로, timestamp는
+    같은 시간대에서 더 정밀한 단위로 넓힙니다. 64비트 정수를 double로 넓히면 2**53을 넘는 값은 정밀도를 잃지만,
+    NaN이 섞인 pandas 정수 컬럼(float64)을 추가할 수 있도록 허용합니다.
+    범주형(dictionary) 컬럼끼리는 인덱스와 값 타입을 각각 넓혀 범주형으로 두고, 한쪽만 범주형이면 값 타입으로 넓힙니다.
+    그 외 타입 변경이면 None을 반환합니다.
+    """
+    if current == new or new == 'null':
+        return current
+    if current == 'null':
+        return new
+    current_dict, new_dict = _DICTIONARY_PATTERN.fullmatch(current), _DICTIONARY_PATTERN.fullmatch(new)
+    if current_dict and new_dict:
+        values = _widened_type(current_dict.group(1), new_dict.group(1))
+        indices = _widened_integer(current_dict.group(2), new_dict.group(2))
+        if values is None or indices is None:
+            return None
+        ordered = current_dict.group(3) if current_dict.group(3) == new_dict.group(3) else '0'
+        return f'dictionary<values={values}, indices={indices}, ordered={ordered}>'
+    if current_dict or new_dict:
+        # 한쪽만 범주형이면 범주를 풀어 값 타입끼리 비교합니다.
+        current = _DICTIONARY_PATTERN.sub(r'\1', current)
+        new = _DICTIONARY_PATTERN.sub(r'\1', new)
+        return _widened_type(current, new)
+    if current in _INTEGER_BITS and new in _INTEGER_BITS:
+        return _widened_integer(current, new)
+    numbers = {current, new}
+    if numbers <= set(_FLOAT_TYPES) | set(_INTEGER_BITS) and numbers & set(_FLOAT_TYPES):
+        # 64비트 정수는 double로 정확히 표현되지 않는 값이 있지만 명시적으로 허용하는 손실 넓히기입니다.
+        return 'double'
+    for small, large in _LARGE_TYPES.items():
+        if numbers == {small, large}:
+            return large
+    current_ts, new_ts = _TIMESTAMP_PATTERN.fullmatch(current), _TIMESTAMP_PATTERN.fullmatch(new)
+    if current_ts and new_ts and current_ts.group(2) == new_ts.group(2):
+        return max(current, new, key=lambda name: _TIMESTAMP_UNITS.index(_TIMESTAMP_PATTERN.fullmatch(name).group(1)))
+    return None
+
+
+def _evolve_schema(schema, new_schema):
+    """
+    테이블 스키마에 새 데이터의 스키마를 합친 스키마를 반환합니다. 새 컬럼은 뒤에 추가되고(기존 행은 null),
+    타입은 _widened_type이 허용할 때만 넓어집니다. 허용되지 않는 타입 변경은 ValueError를 발생시킵니다.
+    """
+    merged = dict(schema)
+    for name, type_name in new_schema.items():
+        if name not in merged:
+            merged[name] = type_name
+            continue
+        widened = _widened_type(merged[name], type_name)
+        if widened is None:
+            raise ValueError(
+                f"컬럼 '{name}'의 타입을 {merged[name]}에서 {type_name}(으)로 바꿀 수 없습니다. "
+                f"(허용되는 변경: 컬럼 추가, 정수/실수 타입 넓히기)"
+            )
+        merged[name] = widened
+    return merged
+
+
+def _entries_schema(file_entries, schema=None):
+    """데이터 파일 항목들에 기록된 스키마를 schema에 차례로 합칩니다. 스키마가 기록된 파일이 없으면 schema 그대로."""
+    for entry in file_entries:
+        if entry.get('schema'):
+            schema = _evolve_schema(schema or {}, entry['schema'])
+    return schema
+
+
+def _arrow_type(type_name):
+    """_schema_dict의 타입 문자열을 Arrow 타입으로 되돌립니다. 해석할 수 없는 타입(중첩 타입 등)이면 None."""
+    import pyarrow as pa
+
+    timestamp = _TIMESTAMP_PATTERN.fullmatch(type_name)
+    if timestamp:
+        return pa.timestamp(timestamp.group(1), tz=timestamp.group(2))
+    dictionary = _DICTIONARY_PATTERN.fullmatch(type_name)
+    if dictionary:
+        value_type, index_type = _arrow_type(dictionary.group(1)), _arrow_type(dictionary.group(2))
+        if value_type is None or index_type is None:
+            return None
+        return pa.dictionary(index_type, value_type, ordered=dictionary.group(3) == '1')
+    decimal = re.fullmatch(r'decimal(128|256)\((\d+), (\d+)\)', type_name)
+    if decimal:
+        factory = pa.decimal128 if decimal.group(1) == '128' else pa.decimal256
+        return factory(int(decimal.group(2)), int(decimal.group(3)))
+    try:
+        return pa.type_for_alias(type_name)
+    except ValueError:
+        return None
+
+
+def _arrow_schema(schema):
+    """테이블 스키마를 pyarrow.Schema로 변환합니다. 해석할 수 없는 타입이 있으면 None."""
+    import pyarrow as pa
+
+    types = [_arrow_type(type_name) for type_name in schema.values()]
+    if any(type_ is None for type_ in types):
+        return None
+    return pa.schema(list(zip(schema, types)))
+
+
+def _needs_conform(entry, schema, columns=None):
+    """
+    데이터 파일 항목에 기록된 스키마가 (columns에 대해) 테이블 스키마와 달라 읽은 뒤 맞춰야 하는지.
+    manifest에 기록된 스키마만 비교하므로 데이터 파일을 열지 않습니다.
+    """
+    if schema is None:
+        return False
+    file_schema = entry.get('schema') or {}
+    if columns is None:
+        return list(file_schema.items()) != list(schema.items())
+    return any(file_schema.get(name) != schema[name] for name in columns if name in schema)
+
+
+def _conform_table(table, schema, columns=None, num_rows=None):
+    """
+    Arrow Table을 테이블 스키마(columns만)에 맞춥니다. 파일에 없는 컬럼은 null로 채우고,
+    넓어진 타입으로 변환하며, 컬럼 순서를 테이블 스키마 순서로 맞춥니다. (스키마에 없는 컬럼은 제외)
+    num_rows는 컬럼이 없는 table의 행 수입니다 (pandas에서 변환한 컬럼 없는 Table은 행 수를 잃음).
+    """
+    import pyarrow as pa
+
+    names = [name for name in schema if columns is None or name in columns]
+    arrays = []
+    for name in names:
+        type_ = _arrow_type(schema[name])
+        if name in table.column_names:
+            column = table.column(name)
+            if type_ is not None and column.type != type_:
+                # 64비트 정수 -> double은 손실을 허용한 넓히기이므로 정밀도 검사 없이 변환합니다.
+                lossy = pa.types.is_integer(column.type) and pa.types.is_floating(type_)
+                column = column.cast(type_, safe=not lossy)
+        else:
+            rows = table.num_rows if num_rows is None else num_rows
+            column = pa.chunked_array([pa.nulls(rows, type_ or pa.null())])
+        arrays.append(column)
+    return pa.table(arrays, names=names)
+
+
+def _conform_frame(frame, output_as, schema, columns=None):
+    """읽은 DataFrame(또는 Arrow Table)을 _conform_table로 테이블 스키마에 맞춥니다."""
+    import pyarrow as pa
+
+    if output_as == 'arrow':
+        return _conform_table(frame, schema, columns)
+    if output_as == 'polars':
+        import polars as pl
+        return pl.from_arrow(_conform_table(frame.to_arrow(), schema, columns))
+    # parquet에 저장된 pandas 인덱스는 컬럼이 아니라 인덱스로 읽히므로 그대로 유지합니다.
+    schema = {name: type_name for name, type_name in schema.items() if name not in frame.index.names}
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    conformed = _conform_table(table, schema, columns, num_rows=len(frame)).to_pandas()
+    conformed.index = frame.index
+    return conformed
+
+
+def _conform_lazy(lazy, file_schema, schema):
+    """polars LazyFrame을 테이블 스키마에 맞추는 projection을 추가합니다 (없는 컬럼은 null, 넓어진 타입은 cast)."""
+    import polars as pl
+
+    arrow_schema = _arrow_schema(schema)
+    if arrow_schema is None:
+        return lazy
+    if file_schema is None:
+        file_schema = dict(lazy.collect_schema())
+    dtypes = pl.from_arrow(arrow_schema.empty_table()).schema
+    return lazy.select([
+        pl.col(name).cast(dtype) if name in file_schema else pl.lit(None, dtype=dtype).alias(name)
+        for name, dtype in dtypes.items()
+    ])
@@ -0,0 +1,1215 @@
+"""
+스냅샷 테이블의 버전 관리와 쓰기.
+
+테이블은 데이터 파일, 데이터 파일 목록을 담은 manifest, 버전마다 manifest 목록을 가리키는 snapshot,
+그리고 버전 번호를 소유하는 vN.metadata.json으로 이루어집니다. write_snapshot은 새 파일을 준비한 뒤
+vN.metadata.json을 배타적으로 생성해 버전을 확정하며(낙관적 동시성 제어), transaction은 여러 테이블의
+커밋을 하나의 결정 파일로 묶습니다. 버전 로그는 타임스탬프와 크기 통계를 고정 길이 레코드로 기록합니다.
+"""
+
+import base64
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from .catalog import SqliteCatalog
+from .core import _execute_write
+from .plugins import get_writer
+from .schema import _entries_schema, _evolve_schema, _schema_dict
+from .stats import (_add_stats, _bloom_filters_from_columns, _collect_file_stats, _column_to_arrow,
+                    _merge_column_stats, _stats_from_arrow, _stats_from_parquet_footer)
+from .utils import read_json, setup_logger, write_json
+
+
+# 하드 링크 없이 커밋된 vN.metadata.json은 생성과 내용 기록 사이에 비어 있거나 일부만 기록되어 있을 수 있습니다.
+# 그런 파일을 읽으면 이 시간(초) 동안 다시 읽습니다.
+_METADATA_WAIT_SECONDS = 5.0
+
+
+def _read_version_metadata(table_path, version):
+    """vN.metadata.json을 읽습니다. 다른 writer가 내용을 채우는 중이면 완성될 때까지 잠시 기다립니다."""
+    path = os.path.join(table_path, 'metadata', f'v{version}.metadata.json')
+    deadline = time.monotonic() + _METADATA_WAIT_SECONDS
+    while True:
+        try:
+            return read_json(path)
+        except json.JSONDecodeError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
+
+def _current_version(table_path):
+    """
+    테이블의 최신 버전 (테이블이 없으면 0).
+
+    버전은 vN.metadata.json을 배타적으로 생성한 쪽이 소유하므로, 포인터 파일은 힌트로만 사용하고
+    그 다음 버전의 metadata가 이미 존재하는지 앞으로 확인합니다. 동시 커밋 중에 포인터 갱신이
+    뒤처지더라도 항상 실제 최신 버전을 반환합니다.
+    """
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        return catalog.current_version()
+    pointer_path = os.path.join(table_path, '_current_version.json')
+    version = 0
+    if os.path.exists(pointer_path):
+        version = read_json(pointer_path)['version_id']
+    while os.path.exists(os.path.join(table_path, 'metadata', f'v{version + 1}.metadata.json')):
+        version += 1
+    return version
+
+
+# 버전 로그: 버전 v의 레코드는 (v - 1) * _VERSION_LOG_RECORD_SIZE 위치에 고정 길이 JSON으로 기록됩니다.
+# 버전 순서대로 정렬된 배열이므로 파일 전체를 읽지 않고도 타임스탬프로 이진 탐색할 수 있습니다.
+_VERSION_LOG_FILENAME = '_version_log'
+_VERSION_LOG_RECORD_SIZE = 256
+
+
+def _version_log_path(table_path):
+    return os.path.join(table_path, 'metadata', _VERSION_LOG_FILENAME)
+
+
+def _encode_log_record(entry):
+    record = json.dumps(entry, separators=(',', ':')).encode('utf-8')
+    if len(record) >= _VERSION_LOG_RECORD_SIZE:
+        raise ValueError(f"버전 로그 레코드가 너무 깁니다 ({len(record)} bytes): {entry}")
+    return record.ljust(_VERSION_LOG_RECORD_SIZE - 1) + b'\n'
+
+
+def _write_version_log_entry(table_path, entry):
+    """버전 로그의 entry['version'] 위치에 레코드를 기록합니다."""
+    path = _version_log_path(table_path)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, 'r+b') as f:
+        f.seek((entry['version'] - 1) * _VERSION_LOG_RECORD_SIZE)
+        f.write(_encode_log_record(entry))
+
+
+def _read_version_log_entry(f, version):
+    """열린 버전 로그에서 version의 레코드를 읽습니다. 기록되지 않은 자리이면 None."""
+    f.seek((version - 1) * _VERSION_LOG_RECORD_SIZE)
+    raw = f.read(_VERSION_LOG_RECORD_SIZE)
+    if len(raw) < _VERSION_LOG_RECORD_SIZE or not raw.strip(b'\0 \n'):
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        # 동시에 기록 중인 레코드를 읽은 경우: 호출 측에서 메타데이터로 대신합니다.
+        return None
+
+
+def _version_log_entry_from_metadata(table_path, version):
+    """version metadata(와 snapshot)에서 버전 로그 레코드를 만듭니다. 메타데이터가 없으면 None."""
+    metadata_path = os.path.join(table_path, 'metadata', f'v{version}.metadata.json')
+    if not os.path.exists(metadata_path):
+        return None
+    metadata = _read_version_metadata(table_path, version)
+    timestamp = metadata.get('timestamp')
+    if timestamp is None:
+        timestamp = read_json(os.path.join(table_path, metadata['snapshot_filename']))['timestamp']
+    return {
+        'version': version,
+        'timestamp': timestamp,
+        'snapshot': metadata['snapshot_filename'],
+        'added_bytes': metadata.get('added_bytes'),
+        'table_bytes': metadata.get('table_bytes'),
+        'added_rows': metadata.get('added_rows'),
+        'table_rows': metadata.get('table_rows'),
+    }
+
+
+def _ensure_version_log(table_path, latest_version):
+    """
+    버전 로그가 latest_version까지 채워져 있는지 확인하고, 비어 있는 레코드를 메타데이터에서 복구합니다.
+    버전 로그가 도입되기 전에 만들어진 테이블은 첫 조회 시 한 번만 복구됩니다.
+    """
+    path = _version_log_path(table_path)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size >= latest_version * _VERSION_LOG_RECORD_SIZE:
+        return
+    if size:
+        with open(path, 'rb') as f:
+            missing = [v for v in range(1, latest_version + 1) if _read_version_log_entry(f, v) is None]
+    else:
+        missing = range(1, latest_version + 1)
+    for version in missing:
+        entry = _version_log_entry_from_metadata(table_path, version)
+        if entry is not None:
+            _write_version_log_entry(table_path, entry)
+
+
+def _version_as_of(table_path, as_of):
+    """
+    as_of 시점에 유효했던(그 시점 이전에 커밋된 가장 최신) 버전을 버전 로그 이진 탐색으로 찾습니다.
+
+    Args:
+        as_of (datetime | float): 기준 시각. naive datetime은 로컬 시각으로 해석합니다.
+    """
+    timestamp = as_of.timestamp() if isinstance(as_of, datetime) else float(as_of)
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        found = catalog.version_as_of(timestamp)
+        if found is None:
+            raise ValueError(f"{as_of} 시점 이전에 커밋된 버전이 없습니다: {table_path}")
+        return found
+
+    latest_version = _current_version(table_path)
+    _ensure_version_log(table_path, latest_version)
+
+    found = None
+    with open(_version_log_path(table_path), 'rb') as f:
+        lo, hi = 1, latest_version
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            entry = _read_version_log_entry(f, mid) or _version_log_entry_from_metadata(table_path, mid)
+            # 메타데이터까지 정리되어 복구할 수 없는 버전은 가장 오래된 것으로 취급합니다.
+            entry_ts = entry['timestamp'] if entry is not None else float('-inf')
+            if entry_ts <= timestamp:
+                found = mid
+                lo = mid + 1
+            else:
+                hi = mid - 1
+
+    if found is None:
+        raise ValueError(f"{as_of} 시점 이전에 커밋된 버전이 없습니다: {table_path}")
+    return found
+
+
+def _version_log_entries(table_path, versions):
+    """버전 로그에서 여러 버전의 레코드를 읽습니다. 로그에 없으면 메타데이터에서 복구하며, 둘 다 없으면 제외합니다."""
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        return catalog.version_entries(versions)
+    entries = {}
+    path = _version_log_path(table_path)
+    with open(path, 'rb') as f:
+        for version in versions:
+            entry = _read_version_log_entry(f, version) or _version_log_entry_from_metadata(table_path, version)
+            if entry is not None:
+                entries[version] = entry
+    return entries
+
+
+@contextmanager
+def _version_log_reader(table_path):
+    """버전 번호로 버전 로그 레코드를 읽는 함수를 제공합니다. (SQLite 카탈로그는 versions 테이블 조회)"""
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        yield lambda version: catalog.version_entries([version]).get(version)
+        return
+    with open(_version_log_path(table_path), 'rb') as f:
+        yield lambda version: _read_version_log_entry(f, version)
+
+
+def _read_json_if_exists(path):
+    try:
+        return read_json(path)
+    except FileNotFoundError:
+        return None
+
+
+# transaction()이 결정을 기록하지 않고 멈춘 경우, 그 위에 쓰려는 writer가 기다린 뒤 중단으로 확정하기까지의 시간
+_TXN_WAIT_SECONDS = 30
+
+# transaction()이 커밋 중인 스레드의 결정 파일 경로 (write_snapshot이 snapshot에 기록)
+_TXN_CONTEXT = threading.local()
+_TXN_DECISION_PREFIX = '_txn-'
+
+
+def _active_txn_ref(table_path):
+    """현재 스레드에서 커밋 중인 트랜잭션 결정 파일의 table_path 기준 상대 경로. 트랜잭션이 아니면 None."""
+    decision_path = getattr(_TXN_CONTEXT, 'decision_path', None)
+    return os.path.relpath(decision_path, table_path) if decision_path is not None else None
+
+
+def _decide_txn(decision_path, status):
+    """
+    트랜잭션의 결과('committed' 또는 'aborted')를 결정 파일에 배타적으로 기록하고 확정된 결과를 반환합니다.
+    커밋하는 쪽과 기다리다 중단시키는 쪽이 경쟁하면 먼저 파일을 만든 쪽의 결과로 확정됩니다.
+    """
+    tmp_path = f"{decision_path}.{uuid.uuid4()}.tmp"
+    write_json({'status': status, 'timestamp': time.time()}, tmp_path)
+    try:
+        _claim_version(tmp_path, decision_path)
+    finally:
+        os.remove(tmp_path)
+    return read_json(decision_path)['status']
+
+
+def _txn_status(table_path, snapshot, wait=False):
+    """
+    transaction()으로 커밋된 snapshot의 트랜잭션 결과 ('committed', 'aborted', 아직 결정되지 않았으면 'pending').
+    트랜잭션 밖에서 커밋된 snapshot이면 None. wait=True이면 결정될 때까지 기다리고,
+    _TXN_WAIT_SECONDS가 지나도 결정되지 않으면 트랜잭션을 중단으로 확정합니다.
+    """
+    txn_ref = snapshot.get('txn')
+    if txn_ref is None:
+        return None
+    decision_path = os.path.join(table_path, txn_ref)
+    deadline = time.time() + _TXN_WAIT_SECONDS
+    delay = 0.001
+    while True:
+        decision = _read_json_if_exists(decision_path)
+        if decision is not None:
+            return decision['status']
+        if not wait:
+            return 'pending'
+        if time.time() >= deadline:
+            return _decide_txn(decision_path, 'aborted')
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+
+
+def _load_snapshot(table_path, version=None, wait_for_txn=False):
+    """
+    읽을 버전의 metadata를 따라가 (version_id, snapshot)을 반환합니다.
+
+    transaction()으로 커밋 중이거나 중단된 버전은 아직 보이지 않아야 하므로 그 이전 버전으로 거슬러
+    올라가며, 반환되는 version_id는 실제로 읽은 버전입니다. 새 버전을 그 위에 쌓을 writer는
+    wait_for_txn=True로 진행 중인 트랜잭션이 결정될 때까지 기다립니다.
+    """
+    version_id = _current_version(table_path) if version is None else version
+    catalog = SqliteCatalog.open(table_path)
+    while True:
+        if catalog is not None:
+            snapshot = catalog.load_snapshot(version_id)
+        else:
+            metadata = _read_version_metadata(table_path, version_id)
+            snapshot = read_json(os.path.join(table_path, metadata['snapshot_filename']))
+        if _txn_status(table_path, snapshot, wait_for_txn) in (None, 'committed'):
+            return version_id, snapshot
+        if version_id <= 1:
+            raise FileNotFoundError(f"커밋이 완료된 버전이 없습니다: {table_path}")
+        version_id -= 1
+
+
+def _snapshot_schema(table_path, snapshot):
+    """
+    snapshot에 기록된 테이블 스키마. 스키마를 기록하기 전에 커밋된 버전이면 데이터 파일 항목의 스키마로
+    구합니다 (manifest만 읽음). 알 수 없으면 None.
+    """
+    if 'schema' in snapshot:
+        return snapshot['schema']
+    if not snapshot.get('manifests'):
+        return None
+    return _entries_schema(_resolve_file_entries(table_path, snapshot))
+
+
+def _partition_value(value):
+    """파티션 값을 manifest에 저장할 JSON 기본 타입으로 변환합니다. (날짜 등은 문자열, 결측값은 None)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _normalize_partitions(partitions):
+    """{컬럼: 값 또는 값 목록}을 {컬럼: 허용 값 목록}으로 정규화합니다."""
+    if not partitions:
+        return None
+    normalized = {}
+    for column, values in partitions.items():
+        if isinstance(values, (list, tuple, set, frozenset)):
+            normalized[column] = [_partition_value(v) for v in values]
+        else:
+            normalized[column] = [_partition_value(values)]
+    return normalized
+
+
+def _manifest_summary(file_entries):
+    """manifest의 파티션 컬럼별 값 목록. snapshot에 기록되어 manifest를 열지 않고 pruning하는 데 쓰입니다."""
+    values = {}
+    for entry in file_entries:
+        for column, value in (entry.get('partition') or {}).items():
+            column_values = values.setdefault(column, [])
+            if value not in column_values:
+                column_values.append(value)
+    return {'partition_values': values} if values else None
+
+
+def _snapshot_fields(manifests, summaries, rewritten=None, schema=None):
+    """
+    snapshot JSON에 기록할 manifest 목록과 (있다면) manifest별 파티션 요약.
+    rewritten은 이 버전에서 다른 manifest로 다시 쓰여 빠진 manifest 목록으로, 그 파일들은
+    새 manifest가 계속 참조할 수 있으므로 expire_snapshots가 바로 삭제하지 않습니다.
+    schema는 이 버전의 테이블 스키마({컬럼: 타입 문자열})로, reader가 데이터 파일을 열지 않고 사용합니다.
+    """
+    fields = {'manifests': manifests}
+    summaries = {m: summaries[m] for m in manifests if summaries.get(m)}
+    if summaries:
+        fields['manifest_summaries'] = summaries
+    if rewritten:
+        fields['rewritten_manifests'] = list(rewritten)
+    if schema:
+        fields['schema'] = schema
+    return fields
+
+
+def _partition_may_match(partition_values, partitions):
+    """파티션 값(또는 값 목록)이 요청한 partitions 조건과 겹칠 수 있는지 판단합니다."""
+    for column, allowed in partitions.items():
+        if column not in partition_values:
+            continue
+        values = partition_values[column]
+        if not isinstance(values, list):
+            values = [values]
+        if not any(v in allowed for v in values):
+            return False
+    return True
+
+
+def _manifest_file_entries(table_path, manifest_refs):
+    """{manifest 참조: 데이터 파일 항목 목록} (SQLite 카탈로그 테이블은 카탈로그에서 한 번에 조회)"""
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        return catalog.manifest_entries(manifest_refs)
+    return {ref: read_json(os.path.join(table_path, ref))['files'] for ref in manifest_refs}
+
+
+def _resolve_file_entries(table_path, snapshot, partitions=None):
+    """
+    snapshot이 참조하는 모든 manifest를 읽어 데이터 파일 항목 목록을 반환합니다.
+    partitions가 주어지면 snapshot의 manifest 요약으로 겹치지 않는 manifest는 열지 않고 건너뛰고,
+    남은 manifest에서도 파티션 값이 맞지 않는 파일을 제외합니다. 남은 파일 중 요청한 파티션 컬럼이
+    기록되지 않은 파일(파티션 없이 쓴 파일, 잘못된 컬럼 이름)이 있으면 그 파일의 행을 거를 수 없으므로
+    ValueError를 발생시킵니다.
+    """
+    summaries = snapshot.get('manifest_summaries', {})
+    manifest_refs = [
+        manifest_ref for manifest_ref in snapshot['manifests']
+        if not (partitions and summaries.get(manifest_ref)
+                and not _partition_may_match(summaries[manifest_ref]['partition_values'], partitions))
+    ]
+    files_by_manifest = _manifest_file_entries(table_path, manifest_refs)
+
+    entries = []
+    for manifest_ref in manifest_refs:
+        if partitions:
+            for entry in files_by_manifest[manifest_ref]:
+                partition_values = entry.get('partition') or {}
+                missing = [column for column in partitions if column not in partition_values]
+                if missing:
+                    raise ValueError(
+                        f"파티션 컬럼 {missing}로 나누어 쓰지 않은 데이터 파일이 있어 partitions로 거를 수 없습니다: "
+                        f"{entry['path']} (파티션 없이 쓴 데이터는 filters로 조회하세요)"
+                    )
+                if _partition_may_match(partition_values, partitions):
+                    entries.append(entry)
+        else:
+            entries.extend(files_by_manifest[manifest_ref])
+    return entries
+
+
+def _has_positional_index(frame):
+    """pandas DataFrame의 인덱스가 이름 없는 정수 인덱스(RangeIndex 또는 행 조건으로 걸러진 행 번호)인지"""
+    index = frame.index
+    return all(name is None for name in index.names) and index.nlevels == 1 and index.dtype.kind in 'iu'
+
+
+def _readable_text_frame(obj, format, kwargs):
+    """
+    pandas DataFrame을 csv/json 데이터 파일로 쓸 때 read_table이 쓴 그대로 읽을 수 있도록 (obj, kwargs)를 맞춥니다.
+    행 번호 인덱스는 쓰지 않고 이름 있는 인덱스는 컬럼으로 기록하며, json은 레코드 배열로 씁니다.
+    (pandas 기본값으로 쓰면 csv에는 'Unnamed: 0' 컬럼이 생기고, json은 polars가 컬럼별 struct로 읽습니다.)
+    """
+    if format not in ('csv', 'json') or not (hasattr(obj, 'to_csv') and hasattr(obj, 'index')):
+        return obj, kwargs
+    if 'index' in kwargs or 'orient' in kwargs:
+        return obj, kwargs
+    if not _has_positional_index(obj):
+        obj = obj.reset_index()
+    if format == 'csv':
+        return obj, dict(kwargs, index=False)
+    return obj, dict(kwargs, orient='records')
+
+
+def _write_data_file(obj, tmpdir, format, **kwargs):
+    """
+    obj를 tmpdir 안의 새 데이터 파일로 쓰고 (임시 경로, manifest 항목)을 반환합니다.
+    manifest 항목에는 read_table의 파일 단위 pruning을 위한 통계가 포함됩니다.
+    """
+    writer = get_writer(obj, format)
+    if writer is None:
+        raise ValueError(f"지원하지 않는 format: {format} for object type {type(obj)}")
+    obj, kwargs = _readable_text_frame(obj, format, kwargs)
+
+    data_filename = f"{uuid.uuid4()}.{format}"
+    tmp_data_path = os.path.join(tmpdir, data_filename)
+    _execute_write(writer, obj, tmp_data_path, **kwargs)
+
+    file_entry = {'path': os.path.join('data', data_filename), 'format': format}
+    file_entry.update(_collect_file_stats(obj, tmp_data_path, format))
+    return tmp_data_path, file_entry
+
+
+def _open_stream_writer(path, format, schema, **kwargs):
+    """배치를 이어 쓸 수 있는 pyarrow 스트리밍 writer를 엽니다 (parquet, ipc, csv)."""
+    import pyarrow as pa
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema, **kwargs)
+    if format == 'ipc':
+        return pa.ipc.new_file(path, schema, **kwargs)
+    if format == 'csv':
+        import pyarrow.csv as pa_csv
+        return pa_csv.CSVWriter(path, schema, **kwargs)
+    raise ValueError(f"배치 스트림은 '{format}' 포맷으로 쓸 수 없습니다. (지원: parquet, ipc, csv)")
+
+
+def _is_batch_stream(obj):
+    """obj가 여러 배치(DataFrame, Arrow RecordBatch/Table)의 iterable인지 판단합니다."""
+    import types
+    return (
+        isinstance(obj, (list, tuple, types.GeneratorType))
+        or hasattr(obj, 'read_next_batch')  # pyarrow.RecordBatchReader
+        or (hasattr(obj, '__next__') and hasattr(obj, '__iter__'))
+    )
+
+
+def _to_arrow_table(batch):
+    """pandas/polars DataFrame 또는 Arrow RecordBatch/Table 배치를 메타데이터 없는 Arrow Table로 변환합니다."""
+    import pyarrow as pa
+    if isinstance(batch, pa.RecordBatch):
+        table = pa.Table.from_batches([batch])
+    elif isinstance(batch, pa.Table):
+        table = batch
+    elif hasattr(batch, 'to_arrow'):
+        table = batch.to_arrow()
+    elif hasattr(batch, 'columns') and hasattr(batch, 'dtypes'):
+        table = pa.Table.from_pandas(batch, preserve_index=False)
+    else:
+        raise ValueError(f"배치 스트림의 항목으로 지원하지 않는 타입: {type(batch).__name__}")
+    return table.replace_schema_metadata(None)
+
+
+def _write_batch_stream(batches, tmpdir, format, target_file_size, max_rows_per_file=None, index_columns=None,
+                        index_fpp=0.01, **kwargs):
+    """
+    배치 iterable을 순서대로 데이터 파일에 이어 쓰되, 파일이 target_file_size 또는 max_rows_per_file에
+    도달하면 새 파일로 넘어갑니다.
+    한 번에 한 배치만 메모리에 올리며, [(임시 경로, manifest 항목), ...]을 반환합니다.
+    배치의 스키마가 첫 배치와 다르면 첫 배치의 스키마로 변환합니다.
+    """
+    written = []
+    schema = None
+    current = None
+
+    def close_current():
+        current['writer'].close()
+        path = current['path']
+        file_entry = {
+            'path': os.path.join('data', os.path.basename(path)),
+            'format': format,
+            'size_bytes': os.path.getsize(path),
+        }
+        if format == 'parquet':
+            num_rows, column_stats = _stats_from_parquet_footer(path)
+        else:
+            num_rows, column_stats = current['num_rows'], current['stats']
+        _add_stats(file_entry, num_rows, column_stats)
+        file_entry['schema'] = _schema_dict(schema)
+        if index_columns:
+            file_entry['bloom_filters'] = _bloom_filters_from_columns(current['index_arrays'], index_fpp)
+        written.append((path, file_entry))
+
+    try:
+        for batch in batches:
+            table = _to_arrow_table(batch)
+            if schema is None:
+                schema = table.schema
+            elif not table.schema.equals(schema):
+                table = table.cast(schema)
+            offset = 0
+            while offset < table.num_rows:
+                if current is None:
+                    path = os.path.join(tmpdir, f"{uuid.uuid4()}.{format}")
+                    current = {'path': path, 'writer': _open_stream_writer(path, format, schema, **kwargs),
+                               'num_rows': 0, 'stats': {}, 'index_arrays': {c: [] for c in index_columns or ()}}
+                # max_rows_per_file을 넘지 않도록 배치를 현재 파일에 남은 행 수만큼 잘라 씁니다.
+                room = max_rows_per_file - current['num_rows'] if max_rows_per_file else table.num_rows
+                piece = table.slice(offset, room)
+                current['writer'].write_table(piece)
+                current['num_rows'] += piece.num_rows
+                offset += piece.num_rows
+                for column, arrays in current['index_arrays'].items():
+                    arrays.append(piece.column(column))
+                if format != 'parquet':
+                    # parquet은 닫을 때 footer에서 통계를 읽고, 그 외 포맷은 배치별 통계를 합산합니다.
+                    _merge_column_stats(current['stats'], _stats_from_arrow(piece)[1])
+
+                if (os.path.getsize(current['path']) >= target_file_size
+                        or (max_rows_per_file and current['num_rows'] >= max_rows_per_file)):
+                    close_current()
+                    current = None
+        if current is not None:
+            close_current()
+    except BaseException:
+        if current is not None:
+            current['writer'].close()
+        raise
+    return written
+
+
+def _estimated_size(obj):
+    """DataFrame의 메모리 상 크기 추정치(바이트)"""
+    if hasattr(obj, 'estimated_size'):
+        # polars.DataFrame
+        return obj.estimated_size()
+    return int(obj.memory_usage(index=False, deep=True).sum())
+
+
+def _zorder_key(rank_columns):
+    """
+    컬럼별 순위(0부터 시작하는 정수 배열)의 비트를 번갈아 끼워 넣은 Z-order 값(uint64)을 만듭니다.
+    Z-order로 정렬하면 여러 컬럼의 값이 가까운 행끼리 모이므로, 어느 컬럼으로 거르더라도 파일별 min/max 범위가 좁아집니다.
+    """
+    if len(rank_columns) > 64:
+        raise ValueError(f"zorder_by에는 컬럼을 64개까지 지정할 수 있습니다: {len(rank_columns)}개")
+    bits = 64 // len(rank_columns)
+    key = np.zeros(len(rank_columns[0]), dtype=np.uint64)
+    for c, ranks in enumerate(rank_columns):
+        # 순위를 bits 비트 범위로 펼쳐 값의 개수가 다른 컬럼도 같은 비중을 갖게 합니다.
+        # 부동소수점으로 곱하면 64비트 근처에서 반올림·오버플로가 나므로 정수 시프트로만 옮깁니다.
+        ranks = ranks.astype(np.uint64)
+        top = int(ranks.max()) if len(ranks) else 0
+        shift = bits - max(top.bit_length(), 1)
+        scaled = ranks << np.uint64(shift) if shift >= 0 else ranks >> np.uint64(-shift)
+        for b in range(bits):
+            key |= ((scaled >> np.uint64(b)) & np.uint64(1)) << np.uint64(b * len(rank_columns) + c)
+    return key
+
+
+def _cluster_rows(obj, sort_by=None, zorder_by=None):
+    """
+    데이터 파일로 나누기 전에 DataFrame의 행을 sort_by 순서 또는 zorder_by 컬럼들의 Z-order로 정렬합니다.
+    비슷한 값이 같은 파일에 모여 파일별 통계 범위가 겹치지 않게 됩니다.
+    pandas의 행 번호 인덱스는 0부터 다시 매기고, 이름 있는 인덱스는 행과 함께 옮깁니다.
+    """
+    if not (hasattr(obj, 'columns') and hasattr(obj, 'dtypes')):
+        raise ValueError(f"sort_by/zorder_by는 DataFrame에만 적용할 수 있습니다: {type(obj).__name__}")
+    if sort_by is not None and zorder_by is not None:
+        raise ValueError("sort_by와 zorder_by는 함께 지정할 수 없습니다.")
+    if sort_by is not None:
+        columns = [sort_by] if isinstance(sort_by, str) else list(sort_by)
+        if hasattr(obj, 'to_arrow'):
+            # polars.DataFrame
+            return obj.sort(columns, maintain_order=True)
+        return obj.sort_values(columns, kind='stable', ignore_index=_has_positional_index(obj))
+
+    columns = [zorder_by] if isinstance(zorder_by, str) else list(zorder_by)
+    key_frame = obj.select(columns).to_pandas() if hasattr(obj, 'to_arrow') else obj[columns]
+    # null은 가장 큰 순위로 둡니다.
+    ranks = [
+        key_frame[column].rank(method='dense').fillna(key_frame[column].nunique() + 1).to_numpy() - 1
+        for column in columns
+    ]
+    order = np.argsort(_zorder_key(ranks), kind='stable')
+    if hasattr(obj, 'to_arrow'):
+        return obj[order]
+    clustered = obj.iloc[order]
+    return clustered.reset_index(drop=True) if _has_positional_index(obj) else clustered
+
+
+def _split_rows(obj, target_file_size, max_rows_per_file):
+    """
+    DataFrame을 데이터 파일 하나에 쓸 행 범위로 나눕니다.
+    파일 하나의 행 수는 max_rows_per_file 이하이며, 메모리 상 크기로 추정한 파일 크기가
+    target_file_size를 넘지 않도록 정합니다. (압축되는 포맷은 실제 파일이 더 작습니다.)
+    """
+    if not (hasattr(obj, 'columns') and hasattr(obj, 'dtypes')):
+        return [obj]
+    num_rows = len(obj)
+    rows_per_file = num_rows
+    if max_rows_per_file:
+        rows_per_file = min(rows_per_file, max_rows_per_file)
+    if target_file_size and num_rows:
+        size = _estimated_size(obj)
+        if size > target_file_size:
+            rows_per_file = min(rows_per_file, max(1, num_rows * target_file_size // size))
+    if rows_per_file >= num_rows:
+        return [obj]
+    if hasattr(obj, 'slice'):
+        # polars.DataFrame
+        return [obj.slice(start, rows_per_file) for start in range(0, num_rows, rows_per_file)]
+    return [obj.iloc[start:start + rows_per_file] for start in range(0, num_rows, rows_per_file)]
+
+
+# 내용 주소 파일을 재사용하면 mtime을 갱신하며, expire_snapshots는 이 시간 안에 재사용된 파일을 지우지 않습니다.
+# (재사용을 결정한 뒤 커밋하기 전에 만료 작업이 같은 파일을 지우는 경쟁을 막기 위함)
+_CONTENT_REUSE_GRACE_SECONDS = 3600
+
+
+def _file_digest(path):
+    """파일 내용의 SHA-256 해시 (hex)"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _place_content_addressed(table_path, tmp_data_path, file_entry):
+    """
+    임시 데이터 파일을 내용 해시 이름(data/<sha256>.<format>)으로 테이블에 둡니다.
+    같은 내용의 파일이 이미 있으면 새 파일을 버리고 기존 파일을 재사용하며 True를 반환합니다.
+    """
+    content_hash = _file_digest(tmp_data_path)
+    relative_path = os.path.join('data', f"{content_hash}.{file_entry['format']}")
+    final_path = os.path.join(table_path, relative_path)
+    file_entry['path'] = relative_path
+    file_entry['content_hash'] = content_hash
+
+    if os.path.exists(final_path):
+        try:
+            os.utime(final_path)
+            os.remove(tmp_data_path)
+            return True
+        except FileNotFoundError:
+            # 확인한 직후 만료 작업이 지운 경우: 새 파일로 다시 둡니다.
+            pass
+    # 같은 내용을 동시에 쓴 writer가 있어도 내용이 같으므로 덮어써도 안전합니다.
+    os.replace(tmp_data_path, final_path)
+    return False
+
+
+def _stage_manifest(tmpdir, file_entries):
+    """새 manifest를 tmpdir에 쓰고 테이블 기준 상대 경로를 반환합니다."""
+    manifest_filename = f"manifest-{uuid.uuid4()}.json"
+    write_json({'files': file_entries}, os.path.join(tmpdir, manifest_filename))
+    return os.path.join('metadata', manifest_filename)
+
+
+def _encode_deletion_vector(deleted):
+    """
+    삭제된 행 위치(파일 안의 행 순서)를 표시한 bool 배열을 manifest에 기록할 삭제 벡터로 변환합니다.
+    비트맵(행당 1비트)을 zlib으로 압축하므로 삭제가 드물거나 몰려 있으면 수 바이트에 불과합니다.
+    """
+    return {
+        'cardinality': int(np.count_nonzero(deleted)),
+        'bitmap': base64.b64encode(zlib.compress(np.packbits(deleted).tobytes())).decode('ascii'),
+    }
+
+
+def _deleted_rows(file_info, num_rows):
+    """데이터 파일 항목의 삭제 벡터를 길이 num_rows의 bool 배열(삭제된 행이 True)로 복원합니다."""
+    deletion_vector = file_info.get('deletion_vector')
+    if deletion_vector is None:
+        return np.zeros(num_rows, dtype=bool)
+    bits = np.frombuffer(zlib.decompress(base64.b64decode(deletion_vector['bitmap'])), dtype=np.uint8)
+    return np.unpackbits(bits, count=num_rows).astype(bool)
+
+
+def _live_rows(file_info):
+    """데이터 파일에서 삭제되지 않은 행 수. 행 수가 기록되지 않았으면 None."""
+    num_rows = file_info.get('num_rows')
+    if num_rows is None:
+        return None
+    return num_rows - (file_info.get('deletion_vector') or {}).get('cardinality', 0)
+
+
+def _apply_deletion_vector(frame, output_as, file_info):
+    """읽은 데이터 파일 전체(DataFrame 또는 Arrow Table)에서 삭제 벡터가 표시한 행을 제외합니다."""
+    keep = ~_deleted_rows(file_info, len(frame))
+    if output_as == 'arrow':
+        import pyarrow as pa
+        return frame.filter(pa.array(keep))
+    if output_as == 'polars':
+        import polars as pl
+        return frame.filter(pl.Series(keep))
+    return frame[keep]
+
+
+def _sum_rows(*counts):
+    """행 수의 합. 하나라도 알 수 없으면(None) None."""
+    return None if any(count is None for count in counts) else sum(counts)
+
+
+def _entries_size(table_path, file_entries):
+    """
+    데이터 파일 항목들의 (크기 합, 행 수 합). 행 수는 삭제 벡터로 삭제된 행을 제외하며,
+    행 수가 기록되지 않은 파일이 있으면 None.
+    """
+    size_bytes = sum(
+        entry.get('size_bytes') or os.path.getsize(os.path.join(table_path, entry['path']))
+        for entry in file_entries
+    )
+    return size_bytes, _sum_rows(*(_live_rows(entry) for entry in file_entries))
+
+
+def _table_size(table_path, version):
+    """version이 참조하는 데이터의 (크기 합, 행 수). 버전 로그에 없으면 manifest에서 계산합니다."""
+    has_log = SqliteCatalog.open(table_path) is not None or os.path.exists(_version_log_path(table_path))
+    entry = _version_log_entries(table_path, [version]).get(version) if has_log else None
+    if entry is not None and entry.get('table_bytes') is not None and entry.get('table_rows') is not None:
+        return entry['table_bytes'], entry['table_rows']
+    _, snapshot = _load_snapshot(table_path, version)
+    return _entries_size(table_path, _resolve_file_entries(table_path, snapshot))
+
+
+class CommitConflictError(RuntimeError):
+    """동시에 커밋된 다른 버전과 충돌하여 커밋을 완료할 수 없을 때 발생합니다."""
+
+
+# build_snapshot이 반환하는 크기 통계 (version metadata와 버전 로그에 기록됨)
+_SIZE_FIELDS = ('added_bytes', 'table_bytes', 'added_rows', 'table_rows')
+
+
+def _claim_version(tmp_metadata_path, metadata_path):
+    """
+    준비된 metadata 파일을 metadata_path에 배타적으로 생성합니다 (compare-and-swap).
+    이미 다른 writer가 같은 버전을 만들었으면 False를 반환합니다.
+
+    os.link는 대상이 존재하면 실패하고, 성공하면 완성된 내용의 파일이 한 번에 나타납니다.
+    하드 링크를 지원하지 않는 파일시스템에서는 O_EXCL 생성으로 대신하는데, 이 경우 파일이 생긴 뒤에
+    내용이 채워지므로 reader는 _read_version_metadata로 완성될 때까지 다시 읽습니다.
+    """
+    try:
+        os.link(tmp_metadata_path, metadata_path)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        pass
+
+    try:
+        fd = os.open(metadata_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    with open(tmp_metadata_path, 'rb') as src:
+        content = src.read()
+    with os.fdopen(fd, 'wb') as dst:
+        dst.write(content)
+    return True
+
+
+def _commit_snapshot(table_path, tmpdir, staged_paths, build_snapshot, max_retries=100):
+    """
+    tmpdir에 준비된 파일들을 테이블로 옮기고 새 버전을 커밋한 뒤 커밋된 버전 번호를 반환합니다.
+
+    staged_paths는 (tmpdir 안의 경로, 테이블 기준 상대 경로) 목록으로, 이름이 고유한 데이터 파일과
+    manifest는 먼저 옮겨도 어떤 버전에서도 참조되지 않으므로 reader에게 보이지 않습니다.
+
+    버전 번호는 전역 잠금 없이 낙관적 동시성 제어로 정합니다. 최신 버전을 base로
+    build_snapshot(base_version)을 호출해 (snapshot 필드, 크기 통계)를 만든 뒤
+    v{base+1}.metadata.json을 배타적으로 생성하고, 다른 writer가 먼저 만들었으면 새 최신 버전을
+    base로 다시 build_snapshot을 호출해 (append 모드라면 상대 커밋 위에 rebase) 재시도합니다.
+    build_snapshot은 rebase할 수 없는 충돌이면 CommitConflictError를 발생시킵니다.
+
+    크기 통계 {added_bytes, table_bytes, added_rows, table_rows}(이번 커밋에서 새로 쓴 데이터와
+    새 버전이 참조하는 데이터의 크기/행 수)는 버전 로그에 함께 기록되어 expire_snapshots의
+    용량 기반 보관 정책과 table_history에 사용됩니다.
+
+    SQLite 카탈로그 테이블은 manifest를 파일 대신 카탈로그에 기록하고, 버전 확정과 포인터 갱신을
+    하나의 트랜잭션으로 처리합니다.
+    """
+    catalog = SqliteCatalog.open(table_path)
+    if catalog is not None:
+        return _commit_to_catalog(catalog, table_path, staged_paths, build_snapshot)
+
+    for tmp_path, relative_path in staged_paths:
+        os.rename(tmp_path, os.path.join(table_path, relative_path))
+
+    try:
+        new_version, new_metadata = _claim_next_version(table_path, tmpdir, build_snapshot, max_retries)
+    except BaseException:
+        # 커밋되지 못한 파일은 어떤 버전에서도 참조되지 않으므로 정리합니다.
+        for _, relative_path in staged_paths:
+            try:
+                os.remove(os.path.join(table_path, relative_path))
+            except OSError:
+                pass
+        raise
+
+    # 4. 버전 로그 기록 후 포인터 갱신 (포인터는 힌트이므로 더 최신 값일 때만 교체)
+    _write_version_log_entry(table_path, {
+        'version': new_version,
+        'timestamp': new_metadata['timestamp'],
+        'snapshot': new_metadata['snapshot_filename'],
+        **{field: new_metadata[field] for field in _SIZE_FIELDS},
+    })
+    pointer_path = os.path.join(table_path, '_current_version.json')
+    pointer = _read_json_if_exists(pointer_path)
+    if pointer is None or pointer['version_id'] < new_version:
+        tmp_pointer_path = os.path.join(tmpdir, '_current_version.json')
+        write_json({'version_id': new_version}, tmp_pointer_path)
+        os.replace(tmp_pointer_path, pointer_path)
+    return new_version
+
+
+def _commit_to_catalog(catalog, table_path, staged_paths, build_snapshot):
+    """데이터 파일은 테이블로 옮기고, 준비된 manifest와 새 버전은 카탈로그 트랜잭션으로 커밋합니다."""
+    manifests = {}
+    data_paths = []
+    for tmp_path, relative_path in staged_paths:
+        if os.path.dirname(relative_path) == 'metadata':
+            manifests[relative_path] = read_json(tmp_path)['files']
+        else:
+            os.rename(tmp_path, os.path.join(table_path, relative_path))
+            data_paths.append(relative_path)
+
+    try:
+        new_version, _ = catalog.commit(manifests, build_snapshot)
+    except BaseException:
+        for relative_path in data_paths:
+            try:
+                os.remove(os.path.join(table_path, relative_path))
+            except OSError:
+                pass
+        raise
+    return new_version
+
+
+def _claim_next_version(table_path, tmpdir, build_snapshot, max_retries):
+    """최신 버전 위에 snapshot을 만들어 다음 버전을 확보할 때까지 재시도하고 (버전, metadata)를 반환합니다."""
+    logger = setup_logger(debug_level=False)
+    metadata_dir = os.path.join(table_path, 'metadata')
+    for attempt in range(max_retries):
+        base_version = _current_version(table_path)
+        new_version = base_version + 1
+        snapshot_fields, sizes = build_snapshot(base_version)
+
+        # 1. 커밋 시각 결정: 버전 로그를 타임스탬프로 이진 탐색할 수 있도록 이전 버전보다 작아지지 않게 합니다.
+        timestamp = time.time()
+        if base_version > 0:
+            prev_entry = _version_log_entry_from_metadata(table_path, base_version)
+            if prev_entry is not None:
+                timestamp = max(timestamp, prev_entry['timestamp'])
+
+        # 2. 최종 manifest 목록으로 새 snapshot 생성 (고유한 이름이므로 바로 metadata 폴더에 씁니다)
+        snapshot_id = int(timestamp)
+        snapshot_filename = f"snapshot-{snapshot_id}-{uuid.uuid4()}.json"
+        new_snapshot = {
+            'snapshot_id': snapshot_id,
+            'timestamp': timestamp,
+            **snapshot_fields
+        }
+        write_json(new_snapshot, os.path.join(metadata_dir, snapshot_filename))
+
+        # 3. 새 version metadata 생성 후 배타적 생성으로 버전 확보
+        new_metadata = {
+            'version_id': new_version,
+            'snapshot_id': snapshot_id,
+            'timestamp': timestamp,
+            'snapshot_filename': os.path.join('metadata', snapshot_filename),
+            **sizes
+        }
+        tmp_metadata_path = os.path.join(tmpdir, f"v{new_version}.metadata.json")
+        write_json(new_metadata, tmp_metadata_path)
+        claimed = _claim_version(tmp_metadata_path, os.path.join(metadata_dir, f"v{new_version}.metadata.json"))
+        os.remove(tmp_metadata_path)
+        if claimed:
+            return new_version, new_metadata
+
+        # 충돌: 다른 writer가 먼저 v{new_version}을 커밋했으므로 버린 snapshot을 지우고 재시도
+        os.remove(os.path.join(metadata_dir, snapshot_filename))
+        logger.debug(f"v{new_version} 커밋 충돌, 재시도합니다 ({attempt + 1}/{max_retries})")
+        time.sleep(random.uniform(0, 0.001 * min(2 ** attempt, 64)))
+
+    raise CommitConflictError(f"{max_retries}번 재시도 후에도 커밋 충돌이 계속되었습니다: {table_path}")
+
+
+def _split_partitions(obj, partition_by):
+    """obj를 파티션 컬럼 값별로 나누어 [(파티션 값 dict, 부분 DataFrame), ...]을 반환합니다."""
+    columns = [partition_by] if isinstance(partition_by, str) else list(partition_by)
+    if hasattr(obj, 'partition_by'):
+        # polars.DataFrame
+        groups = obj.partition_by(columns, as_dict=True, maintain_order=True).items()
+    elif hasattr(obj, 'groupby'):
+        # pandas.DataFrame
+        # 행 번호 인덱스만 파티션마다 다시 매기고, 이름 있는 인덱스는 데이터와 함께 기록되도록 유지합니다.
+        groups = ((key, group.reset_index(drop=True) if _has_positional_index(group) else group)
+                  for key, group in obj.groupby(columns, dropna=False, sort=False))
+    else:
+        raise ValueError(f"partition_by는 DataFrame에만 지원됩니다. (현재: {type(obj).__name__})")
+
+    parts = []
+    for key, group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        parts.append(({column: _partition_value(value) for column, value in zip(columns, key)}, group))
+    return parts
+
+
+def _write_frame_files(obj, tmpdir, format, partition_by, target_file_size, max_rows_per_file, max_workers,
+                       index_columns=None, index_fpp=0.01, **kwargs):
+    """
+    DataFrame을 파티션 값별, 크기 단위로 나누어 tmpdir에 (여러 개이면 병렬로) 쓰고
+    [(임시 경로, 파일 항목), ...]을 반환합니다. index_columns가 주어지면 파일마다 블룸 필터를 기록합니다.
+    """
+    parts = _split_partitions(obj, partition_by) if partition_by is not None else [(None, obj)]
+    pieces = [
+        (partition, piece)
+        for partition, part in parts
+        for piece in _split_rows(part, target_file_size, max_rows_per_file)
+    ]
+
+    def write_piece(job):
+        partition, piece = job
+        tmp_data_path, file_entry = _write_data_file(piece, tmpdir, format, **kwargs)
+        if partition is not None:
+            file_entry['partition'] = partition
+        if index_columns:
+            file_entry['bloom_filters'] = _bloom_filters_from_columns(
+                {column: [_column_to_arrow(piece, column)] for column in index_columns}, index_fpp
+            )
+        return tmp_data_path, file_entry
+
+    if len(pieces) == 1:
+        return [write_piece(pieces[0])]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(write_piece, pieces))
+
+
+def _prepare_catalog(table_path, catalog):
+    """write_snapshot(catalog=...)을 검사하고, 새 SQLite 카탈로그 테이블이면 카탈로그를 만듭니다."""
+    if catalog is None:
+        return
+    if catalog not in ('json', 'sqlite'):
+        raise ValueError(f"지원하지 않는 카탈로그: {catalog} (지원: 'json', 'sqlite')")
+    existing = 'sqlite' if SqliteCatalog.open(table_path) is not None else 'json'
+    if catalog == existing:
+        return
+    if existing == 'sqlite' or _current_version(table_path) > 0:
+        raise ValueError(f"기존 테이블의 카탈로그({existing})는 변경할 수 없습니다: {table_path}")
+    SqliteCatalog.create(table_path)
+
+
+def write_snapshot(obj, table_path, mode='overwrite', format='parquet', partition_by=None, catalog=None,
+                   target_file_size=128 * 1024 * 1024, max_rows_per_file=None, max_workers=None,
+                   content_addressed=False, index_columns=None, index_fpp=0.01, sort_by=None, zorder_by=None,
+                   **kwargs):
+    """
+    데이터 객체를 스냅샷 테이블의 새 버전으로 커밋하고 커밋된 버전 번호를 반환합니다.
+
+    여러 프로세스가 같은 테이블에 동시에 커밋해도 안전합니다. 버전 번호가 충돌하면
+    최신 버전을 기준으로 다시 시도하며, append 모드는 먼저 커밋된 데이터 위에 이어 붙습니다.
+
+    obj로 DataFrame이나 Arrow RecordBatch의 iterable(리스트, 제너레이터, RecordBatchReader)을 주면
+    배치를 하나씩 데이터 파일에 이어 쓰고(parquet, ipc, csv), 모든 배치를 하나의 버전으로 커밋합니다.
+    메모리에는 한 번에 한 배치만 올라갑니다.
+
+    Args:
+        obj: 저장할 데이터 객체 또는 배치의 iterable.
+        table_path (str): 스냅샷 테이블 경로.
+        mode (str): 'overwrite' 또는 'append'. Defaults to 'overwrite'.
+        format (str): 데이터 파일 포맷. Defaults to 'parquet'.
+        partition_by (str | list, optional): 파티션 컬럼. 지정하면 파티션 값마다 별도의 데이터 파일을 쓰고,
+            manifest와 snapshot에 파티션 값을 기록하여 read_table(partitions=...)이 나머지 파일과
+            manifest를 열지 않고 건너뛸 수 있게 합니다. Defaults to None.
+        catalog (str, optional): 메타데이터 저장 방식. 'json'은 버전마다 JSON 파일을, 'sqlite'는
+            테이블 폴더의 _catalog.db를 사용합니다. 테이블을 처음 만들 때만 정할 수 있으며,
+            None이면 기존 테이블의 방식(새 테이블이면 'json')을 따릅니다. Defaults to None.
+        target_file_size (int): 데이터 파일 하나의 목표 최대 크기(바이트). 큰 DataFrame은 메모리 상 크기로
+            추정해 여러 파일로 나누어 병렬로 쓰고, 배치 스트림은 파일이 이 크기에 도달하면 다음 배치부터
+            새 파일에 씁니다. 모든 파일은 하나의 manifest에 기록됩니다. Defaults to 128MB.
+        max_rows_per_file (int, optional): 데이터 파일 하나의 최대 행 수. Defaults to None.
+        max_workers (int, optional): 나누어진 데이터 파일을 동시에 쓸 최대 스레드 수.
+            None이면 ThreadPoolExecutor 기본값. Defaults to None.
+        content_addressed (bool): True이면 데이터 파일 이름을 uuid 대신 내용의 SHA-256 해시로 정하고,
+            같은 내용의 파일이 data/에 이미 있으면 새로 저장하지 않고 재사용합니다. 내용이 거의 바뀌지 않는
+            테이블을 주기적으로 덮어쓸 때 저장 공간이 늘어나지 않습니다. Defaults to False.
+        index_columns (list, optional): 데이터 파일마다 값의 블룸 필터를 만들어 manifest에 기록할 컬럼.
+            lookup이 찾는 키가 없는 파일을 열지 않고 건너뛰는 데 사용됩니다. Defaults to None.
+        index_fpp (float): 블룸 필터의 목표 오탐률. 낮을수록 필터가 커집니다. Defaults to 0.01.
+        sort_by (str | list, optional): 데이터 파일로 나누기 전에 행을 정렬할 컬럼. 파일마다 값 범위가 겹치지
+            않아 해당 컬럼 조건의 통계 기반 pruning이 효과적입니다. Defaults to None.
+        zorder_by (list, optional): 행을 Z-order로 정렬할 컬럼들. 여러 컬럼 중 어느 것으로 거르더라도
+            파일별 범위가 좁아지도록 값이 가까운 행을 모읍니다. sort_by와 함께 쓸 수 없습니다. Defaults to None.
+        **kwargs: 데이터 파일 writer에 전달될 추가 키워드 인자.
+            (배치 스트림은 pyarrow의 ParquetWriter, ipc.new_file, csv.CSVWriter에 전달됩니다.)
+    """
+    logger = setup_logger(debug_level=False)
+    append = mode.lower() == 'append'
+    txn_ref = _active_txn_ref(table_path)
+
+    # 1. 경로 설정 및 폴더 생성
+    _prepare_catalog(table_path, catalog)
+    os.makedirs(os.path.join(table_path, 'data'), exist_ok=True)
+    os.makedirs(os.path.join(table_path, 'metadata'), exist_ok=True)
+
+    # 2. 임시 디렉토리 내에서 모든 작업 수행
+    #    최종 커밋의 rename이 같은 파일시스템 안에서 일어나도록 테이블 폴더 안에 만듭니다.
+    with tempfile.TemporaryDirectory(dir=table_path) as tmpdir:
+        # 2a. 새 데이터 파일 쓰기 (파티션을 지정하면 파티션 값마다 하나씩, 배치 스트림이면 크기 단위로 나누어)
+        if _is_batch_stream(obj):
+            if partition_by is not None or sort_by is not None or zorder_by is not None:
+                raise ValueError("partition_by, sort_by, zorder_by는 배치 스트림과 함께 사용할 수 없습니다.")
+            written = _write_batch_stream(obj, tmpdir, format, target_file_size, max_rows_per_file,
+                                          index_columns, index_fpp, **kwargs)
+        else:
+            if sort_by is not None or zorder_by is not None:
+                obj = _cluster_rows(obj, sort_by, zorder_by)
+            written = _write_frame_files(obj, tmpdir, format, partition_by, target_file_size, max_rows_per_file,
+                                         max_workers, index_columns, index_fpp, **kwargs)
+        file_entries = [file_entry for _, file_entry in written]
+        if content_addressed:
+            # 내용 주소 파일은 바로 테이블에 둡니다. 다른 writer가 재사용했을 수 있으므로
+            # 커밋이 실패해도 지우지 않고 expire_snapshots(full_scan=True)에 맡깁니다.
+            staged_paths = []
+            reused = [_place_content_addressed(table_path, tmp_path, entry) for tmp_path, entry in written]
+            new_entries = [entry for entry, is_reused in zip(file_entries, reused) if not is_reused]
+            logger.info(f"내용 주소 데이터 파일 {len(written)}개 중 {sum(reused)}개를 재사용합니다.")
+        else:
+            staged_paths = [(tmp_data_path, file_entry['path']) for tmp_data_path, file_entry in written]
+            new_entries = file_entries
+        # added_bytes는 새로 저장한 파일 크기만, added_rows는 이번 커밋이 쓴 전체 행 수를 기록합니다.
+        added_bytes = _entries_size(table_path, new_entries)[0]
+        added_rows = _entries_size(table_path, file_entries)[1]
+
+        # 2b. 새 manifest 생성 (read_table의 파일 단위 pruning을 위한 통계 포함)
+        manifest_ref = _stage_manifest(tmpdir, file_entries)
+        staged_paths.append((os.path.join(tmpdir, os.path.basename(manifest_ref)), manifest_ref))
+        summaries = {manifest_ref: _manifest_summary(file_entries)}
+        new_schema = _entries_schema(file_entries)
+
+        # 2c. base 버전 위에 새 snapshot의 manifest 목록 구성 (충돌 시 새 base로 다시 호출됨)
+        #     append는 base 버전의 스키마에 새 데이터의 스키마를 합치며, 허용되지 않는 타입 변경이면 커밋하지 않습니다.
+        def build_snapshot(base_version):
+            all_manifests = [manifest_ref]
+            all_summaries = dict(summaries)
+            table_bytes, table_rows = added_bytes, added_rows
+            schema = new_schema
+            if append and base_version > 0:
+                try:
+                    prev_version, prev_snapshot = _load_snapshot(table_path, base_version, wait_for_txn=True)
+                    all_manifests.extend(prev_snapshot['manifests'])
+                    all_summaries.update(prev_snapshot.get('manifest_summaries', {}))
+                    base_bytes, base_rows = _table_size(table_path, prev_version)
+                    table_bytes += base_bytes
+                    table_rows = _sum_rows(added_rows, base_rows)
+                    base_schema = _snapshot_schema(table_path, prev_snapshot)
+                    if base_schema is not None:
+                        schema = _evolve_schema(base_schema, new_schema) if new_schema else base_schema
+                except (FileNotFoundError, KeyError):
+                    logger.warning(f"Append mode: 이전 버전(v{base_version})의 메타데이터를 찾을 수 없거나 형식이 올바르지 않습니다. Overwrite 모드로 동작합니다.")
+            sizes = {'added_bytes': added_bytes, 'table_bytes': table_bytes,
+                     'added_rows': added_rows, 'table_rows': table_rows}
+            fields = _snapshot_fields(all_manifests, all_summaries, schema=schema)
+            if txn_ref is not None:
+                fields['txn'] = txn_ref
+            return fields, sizes
+
+        # 3. 최종 커밋 (트랜잭션이면 모든 테이블의 스테이징이 끝날 때까지 기다린 뒤 버전을 확보)
+        if txn_ref is not None:
+            _TXN_CONTEXT.staged()
+        new_version = _commit_snapshot(table_path, tmpdir, staged_paths, build_snapshot)
+        logger.info(f"스냅샷 쓰기 완료! '{table_path}'가 버전 {new_version}으로 업데이트되었습니다.")
+    return new_version
+
+
+class Transaction:
+    """
+    transaction() 블록에서 여러 테이블에 대한 write_snapshot을 모아 두었다가 블록이 끝날 때 함께 커밋합니다.
+    커밋 후 versions에 {table_path: 커밋된 버전}이 기록됩니다.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self.versions = None
+        self._writes = []
+
+    def write_snapshot(self, obj, table_path, mode='overwrite', **kwargs):
+        """write_snapshot과 같은 인자로 쓰기를 예약합니다. 실제 쓰기는 블록이 끝날 때 수행됩니다."""
+        if any(os.path.abspath(path) == os.path.abspath(table_path) for _, path, _ in self._writes):
+            raise ValueError(f"한 트랜잭션에서 같은 테이블에 두 번 쓸 수 없습니다: {table_path}")
+        self._writes.append((obj, table_path, dict(kwargs, mode=mode)))
+
+    def commit(self):
+        """
+        예약된 쓰기를 테이블별로 병렬 커밋한 뒤 결정 파일 하나를 배타적으로 생성해 한 번에 공개합니다.
+        결정 파일이 생기기 전까지 새 버전들은 reader에게 보이지 않으며, 하나라도 실패하면 모두 중단됩니다.
+
+        모든 테이블의 데이터 파일과 manifest를 먼저 스테이징한 뒤에 버전을 연달아 확보하므로,
+        다른 writer가 결정되지 않은 버전을 기다리는 시간은 메타데이터 커밋 동안으로 한정됩니다.
+        스테이징 중 하나라도 실패하면 어떤 테이블에도 버전을 만들지 않습니다.
+        """
+        logger = setup_logger(debug_level=False)
+        if not self._writes:
+            self.versions = {}
+            return self.versions
+
+        # 결정 파일은 첫 테이블의 metadata 폴더에 두고, 각 테이블의 snapshot이 상대 경로로 참조합니다.
+        first_table = self._writes[0][1]
+        os.makedirs(os.path.join(first_table, 'metadata'), exist_ok=True)
+        decision_path = os.path.abspath(
+            os.path.join(first_table, 'metadata', f"{_TXN_DECISION_PREFIX}{uuid.uuid4()}.json")
+        )
+
+        # 스테이징은 max_workers개씩 수행하고, 모두 끝나면 barrier를 통과해 함께 커밋합니다.
+        barrier = threading.Barrier(len(self._writes))
+        slots = threading.Semaphore(self.max_workers or len(self._writes))
+
+        def write(job):
+            obj, table_path, kwargs = job
+            holding = [True]
+
+            def staged():
+                holding[0] = False
+                slots.release()
+                barrier.wait()
+
+            slots.acquire()
+            _TXN_CONTEXT.decision_path = decision_path
+            _TXN_CONTEXT.staged = staged
+            try:
+                return write_snapshot(obj, table_path, **kwargs)
+            except BaseException:
+                # 기다리는 다른 테이블이 커밋하지 않고 BrokenBarrierError로 끝나게 합니다.
+                barrier.abort()
+                raise
+            finally:
+                _TXN_CONTEXT.decision_path = None
+                _TXN_CONTEXT.staged = None
+                if holding[0]:
+                    slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(self._writes)) as executor:
+                futures = [executor.submit(write, job) for job in self._writes]
+            errors = [f.exception() for f in futures if f.exception() is not None]
+            # barrier가 깨져 끝난 테이블이 아니라 처음 실패한 테이블의 예외를 전달합니다.
+            errors.sort(key=lambda e: isinstance(e, threading.BrokenBarrierError))
+            if errors:
+                raise errors[0]
+            versions = [f.result() for f in futures]
+        except BaseException:
+            _decide_txn(decision_path, 'aborted')
+            raise
+        if _decide_txn(decision_path, 'committed') != 'committed':
+            raise CommitConflictError(f"트랜잭션이 커밋되기 전에 중단되었습니다: {decision_path}")
+
+        self.versions = {table_path: version for (_, table_path, _), version in zip(self._writes, versions)}
+        logger.info(f"트랜잭션 커밋 완료: {len(self.versions)}개 테이블 {self.versions}")
+        return self.versions
+
+
+@contextmanager
+def transaction(max_workers=None):
+    """
+    여러 스냅샷 테이블의 쓰기를 원자적으로 커밋하는 컨텍스트 매니저.
+
+    블록 안에서 txn.write_snapshot(...)으로 예약한 쓰기는 블록이 끝날 때 테이블별로 병렬로 스테이징되고,
+    모든 테이블의 스테이징이 끝난 뒤 각 테이블에 새 버전으로 커밋됩니다. 이 버전들은 트랜잭션의 결정 파일이 생성되는 순간 함께 보이게 되므로,
+    reader는 모든 테이블의 새 버전을 보거나 모든 테이블의 이전 버전을 봅니다. 블록에서 예외가 발생하면
+    아무것도 쓰지 않습니다.
+
+    Args:
+        max_workers (int, optional): 동시에 스테이징할 최대 테이블 수. None이면 모든 테이블을 동시에
+            스테이징합니다. Defaults to None.
+    """
+    txn = Transaction(max_workers)
+    yield txn
+    txn.commit()
@@ -0,0 +1,451 @@
+"""
+스냅샷 테이블의 파일별 통계, 블룸 필터, 행 필터.
+
+데이터 파일을 쓸 때 컬럼별 null 개수와 min/max, 선택한 컬럼의 블룸 필터를 manifest에 기록합니다.
+읽을 때는 filters 조건을 이 통계와 비교해 조건을 만족하는 행이 있을 수 없는 파일을 열지 않고 건너뛰며,
+남은 파일에는 같은 조건을 행 단위로 적용합니다.
+"""
+
+import base64
+import math
+import os
+from datetime import date, datetime
+
+import numpy as np
+
+from .schema import _file_schema
+from .utils import setup_logger
+
+
+# read_table(filters=...)에서 지원하는 비교 연산자 (pyarrow의 DNF 필터 표기법과 동일)
+_FILTER_OPS = ('==', '=', '!=', '<', '<=', '>', '>=', 'in', 'not in')
+
+
+def _temporal_stat_value(value, kind):
+    """
+    날짜/시각 값을 kind('timestamp': UTC epoch 나노초, 'date': epoch 일수)의 비교 가능한 숫자로 변환합니다.
+    시간대가 없는 시각은 그대로(UTC로 간주) 변환합니다. 변환할 수 없으면 None.
+    """
+    import pandas as pd
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if ts is pd.NaT:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    if kind == 'timestamp':
+        return int(ts.value)
+    days = (ts - pd.Timestamp(0)) / pd.Timedelta(days=1)
+    return int(days) if days == int(days) else days
+
+
+def _to_stat_value(value):
+    """
+    통계 값을 JSON으로 저장 가능한 (값, 종류)로 변환합니다. 변환할 수 없으면 (None, None).
+    날짜/시각은 _temporal_stat_value의 숫자로 저장하고 종류('timestamp', 'date')를 함께 반환하며,
+    그 외 기본 타입의 종류는 None입니다.
+    """
+    if isinstance(value, np.datetime64):
+        kind = 'date' if np.datetime_data(value.dtype)[0] in ('D', 'W', 'M', 'Y') else 'timestamp'
+        converted = _temporal_stat_value(value, kind)
+        return (converted, kind) if converted is not None else (None, None)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        # NaN은 비교가 불가능하므로 통계로 사용하지 않습니다.
+        return None, None
+    if isinstance(value, (bool, int, float, str)):
+        return value, None
+    if isinstance(value, (datetime, date)):
+        kind = 'timestamp' if isinstance(value, datetime) else 'date'
+        converted = _temporal_stat_value(value, kind)
+        return (converted, kind) if converted is not None else (None, None)
+    return None, None
+
+
+def _update_stat_range(stats, lo, hi):
+    """min/max 값(lo, hi)을 컬럼 통계 stats의 범위에 합칩니다. 비교할 수 없는 값이면 범위를 알 수 없음으로 표시합니다."""
+    (lo, kind), (hi, hi_kind) = _to_stat_value(lo), _to_stat_value(hi)
+    if lo is None or hi is None or kind != hi_kind or stats.get('kind', kind) != kind:
+        stats['known'] = False
+        return
+    if kind is not None:
+        stats['kind'] = kind
+    try:
+        stats['min'] = lo if stats['min'] is None else min(stats['min'], lo)
+        stats['max'] = hi if stats['max'] is None else max(stats['max'], hi)
+    except TypeError:
+        stats['known'] = False
+
+
+def _stats_from_parquet_footer(path):
+    """parquet footer의 row group 통계를 파일 단위로 합산합니다."""
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_metadata(path)
+    column_stats = {}
+    for rg_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg_index)
+        for col_index in range(row_group.num_columns):
+            chunk = row_group.column(col_index)
+            name = chunk.path_in_schema
+            if name.startswith('__index_level_'):
+                continue
+            stats = column_stats.setdefault(name, {'null_count': 0, 'min': None, 'max': None, 'known': True})
+            chunk_stats = chunk.statistics
+            if chunk_stats is None:
+                stats['known'] = False
+                stats['null_count'] = None
+                continue
+            if chunk_stats.has_null_count and stats['null_count'] is not None:
+                stats['null_count'] += chunk_stats.null_count
+            else:
+                stats['null_count'] = None
+            if not chunk_stats.has_min_max:
+                # 모든 값이 null인 row group은 min/max가 없어도 범위에 영향을 주지 않습니다.
+                if not (chunk_stats.has_null_count and chunk_stats.null_count == row_group.num_rows):
+                    stats['known'] = False
+                continue
+            _update_stat_range(stats, chunk_stats.min, chunk_stats.max)
+    return metadata.num_rows, column_stats
+
+
+def _stats_from_frame(obj):
+    """메모리 상의 pandas/polars DataFrame에서 컬럼 통계를 계산합니다."""
+    column_stats = {}
+    for name in obj.columns:
+        series = obj[name]
+        null_count = int(series.null_count() if hasattr(series, 'null_count') else series.isna().sum())
+        stats = {'null_count': null_count, 'min': None, 'max': None, 'known': True}
+        if null_count < len(series):
+            try:
+                _update_stat_range(stats, series.min(), series.max())
+            except (TypeError, ValueError):
+                pass
+            stats['known'] = stats['known'] and stats['min'] is not None and stats['max'] is not None
+        column_stats[str(name)] = stats
+    return len(obj), column_stats
+
+
+def _stats_from_arrow(table):
+    """Arrow Table/RecordBatch에서 컬럼 통계를 계산합니다."""
+    import pyarrow.compute as pc
+
+    column_stats = {}
+    for name, column in zip(table.column_names, table.columns):
+        stats = {'null_count': column.null_count, 'min': None, 'max': None, 'known': True}
+        if column.null_count < len(column):
+            try:
+                min_max = pc.min_max(column)
+                _update_stat_range(stats, min_max['min'].as_py(), min_max['max'].as_py())
+            except (NotImplementedError, TypeError, ValueError):
+                pass
+            stats['known'] = stats['known'] and stats['min'] is not None and stats['max'] is not None
+        column_stats[name] = stats
+    return table.num_rows, column_stats
+
+
+def _merge_column_stats(total, column_stats):
+    """배치별 컬럼 통계(column_stats)를 파일 단위 통계(total)에 합칩니다."""
+    for name, stats in column_stats.items():
+        merged = total.get(name)
+        if merged is None:
+            total[name] = dict(stats)
+            continue
+        if merged['null_count'] is None or stats['null_count'] is None:
+            merged['null_count'] = None
+        else:
+            merged['null_count'] += stats['null_count']
+        merged['known'] = merged['known'] and stats['known'] and merged.get('kind') == stats.get('kind')
+        if merged['known'] and stats['min'] is not None:
+            try:
+                merged['min'] = stats['min'] if merged['min'] is None else min(merged['min'], stats['min'])
+                merged['max'] = stats['max'] if merged['max'] is None else max(merged['max'], stats['max'])
+            except TypeError:
+                merged['known'] = False
+    return total
+
+
+def _collect_file_stats(obj, path, format):
+    """
+    데이터 파일 하나에 대한 통계(행 수, 파일 크기, 스키마, 컬럼별 null 개수와 min/max)를 수집합니다.
+    parquet은 방금 쓴 파일의 footer에서, 그 외 포맷은 메모리 상의 DataFrame에서 계산합니다.
+    """
+    info = {'size_bytes': os.path.getsize(path)}
+    try:
+        if format == 'parquet':
+            num_rows, column_stats = _stats_from_parquet_footer(path)
+            info['schema'] = _file_schema(obj, path, format)
+        elif hasattr(obj, 'columns') and hasattr(obj, 'dtypes'):
+            num_rows, column_stats = _stats_from_frame(obj)
+            info['schema'] = _file_schema(obj, path, format)
+        elif isinstance(obj, np.ndarray) and obj.ndim > 0:
+            return dict(info, num_rows=int(obj.shape[0]))
+        else:
+            return info
+    except Exception as e:
+        # 통계 수집 실패는 쓰기를 막지 않습니다. 통계가 없는 파일은 항상 읽기 대상이 됩니다.
+        setup_logger().warning(f"데이터 파일 통계 수집 실패 ({path}): {e}")
+        return info
+    return _add_stats(info, num_rows, column_stats)
+
+
+def _add_stats(info, num_rows, column_stats):
+    """
+    행 수와 컬럼 통계를 manifest 항목(info)에 기록합니다. 범위를 알 수 없는 컬럼은 min/max를 생략합니다.
+    날짜/시각 컬럼의 min/max는 숫자로 저장되며 kind에 종류('timestamp', 'date')가 기록됩니다.
+    """
+    info['num_rows'] = int(num_rows)
+    info['column_stats'] = {}
+    for name, stats in column_stats.items():
+        entry = {'null_count': stats['null_count']}
+        if stats['known'] and stats['min'] is not None:
+            entry['min'] = stats['min']
+            entry['max'] = stats['max']
+            if stats.get('kind') is not None:
+                entry['kind'] = stats['kind']
+        info['column_stats'][name] = entry
+    return info
+
+
+def _bloom_kind(arrow_type):
+    """블룸 필터에 넣을 때 값을 정규화할 종류. 지원하지 않는 타입이면 None."""
+    import pyarrow as pa
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_integer(arrow_type):
+        return 'int'
+    if pa.types.is_floating(arrow_type):
+        return 'float'
+    if pa.types.is_timestamp(arrow_type):
+        return 'timestamp'
+    if pa.types.is_date(arrow_type):
+        return 'date'
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return 'string'
+    return None
+
+
+def _bloom_hashes(array, kind):
+    """
+    Arrow 배열의 null이 아닌 값을 kind에 맞게 정규화한 뒤 64비트 해시 배열로 변환합니다.
+    (정수 폭, 타임스탬프 단위가 달라도 같은 값이면 같은 해시가 되며, 프로세스와 무관하게 결정적입니다)
+    """
+    import pandas as pd
+    import pyarrow as pa
+    array = array.drop_null()
+    if pa.types.is_dictionary(array.type):
+        array = array.cast(array.type.value_type)
+    if kind == 'int':
+        values = array.cast(pa.int64()).to_numpy()
+    elif kind == 'float':
+        values = array.cast(pa.float64()).to_numpy()
+    elif kind == 'timestamp':
+        values = array.cast(pa.timestamp('ns')).cast(pa.int64()).to_numpy()
+    elif kind == 'date':
+        values = array.cast(pa.date32()).cast(pa.int32()).cast(pa.int64()).to_numpy()
+    else:
+        values = array.cast(pa.string()).to_numpy(zero_copy_only=False)
+    return pd.util.hash_array(np.asarray(values))
+
+
+def _bloom_bit_positions(hashes, num_bits, num_hashes):
+    """double hashing으로 해시마다 num_hashes개의 비트 위치를 만듭니다. (i번째 위치 배열을 차례로 반환)"""
+    h1 = hashes & np.uint64(0xFFFFFFFF)
+    h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+    for i in range(num_hashes):
+        yield (h1 + np.uint64(i) * h2) % np.uint64(num_bits)
+
+
+def _build_bloom_filter(hashes, kind, fpp):
+    """서로 다른 값의 해시로 오탐률이 fpp가 되도록 크기를 정한 블룸 필터를 manifest 항목 형식으로 만듭니다."""
+    hashes = np.unique(hashes)
+    n = max(len(hashes), 1)
+    num_bits = max(64, int(math.ceil(-n * math.log(fpp) / math.log(2) ** 2 / 8)) * 8)
+    num_hashes = max(1, round(num_bits / n * math.log(2)))
+    bits = np.zeros(num_bits, dtype=bool)
+    for positions in _bloom_bit_positions(hashes, num_bits, num_hashes):
+        bits[positions] = True
+    return {
+        'kind': kind,
+        'fpp': fpp,
+        'num_bits': num_bits,
+        'num_hashes': num_hashes,
+        'bitmap': base64.b64encode(np.packbits(bits).tobytes()).decode('ascii'),
+    }
+
+
+def _column_to_arrow(obj, column):
+    """DataFrame 또는 Arrow Table의 컬럼 하나를 Arrow 배열로 변환합니다."""
+    import pyarrow as pa
+    if isinstance(obj, (pa.Table, pa.RecordBatch)):
+        return obj.column(column)
+    if hasattr(obj, 'to_arrow'):
+        # polars.DataFrame
+        return obj[column].to_arrow()
+    return pa.array(obj[column])
+
+
+def _bloom_filters_from_columns(arrays, fpp):
+    """{컬럼: Arrow 배열 목록}으로 컬럼별 블룸 필터를 만듭니다. 지원하지 않는 타입의 컬럼은 건너뜁니다."""
+    filters = {}
+    for column, chunks in arrays.items():
+        kind = _bloom_kind(chunks[0].type)
+        if kind is None:
+            setup_logger().warning(f"'{column}' 컬럼의 타입({chunks[0].type})은 블룸 필터를 지원하지 않습니다.")
+            continue
+        filters[column] = _build_bloom_filter(np.concatenate([_bloom_hashes(a, kind) for a in chunks]), kind, fpp)
+    return filters
+
+
+def _bloom_may_contain(bloom, values, hash_cache):
+    """
+    블룸 필터에 values 중 하나라도 들어 있을 수 있는지 판단합니다. 값을 필터의 타입으로 변환할 수 없으면
+    안전하게 True를 반환합니다. hash_cache는 같은 kind의 필터끼리 values의 해시를 재사용하기 위한 dict입니다.
+    """
+    import pyarrow as pa
+    kind = bloom['kind']
+    if kind not in hash_cache:
+        try:
+            hash_cache[kind] = _bloom_hashes(pa.array(values), kind)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            hash_cache[kind] = None
+    hashes = hash_cache[kind]
+    if hashes is None:
+        return True
+    bits = np.unpackbits(np.frombuffer(base64.b64decode(bloom['bitmap']), dtype=np.uint8), count=bloom['num_bits'])
+    found = np.ones(len(hashes), dtype=bool)
+    for positions in _bloom_bit_positions(hashes, bloom['num_bits'], bloom['num_hashes']):
+        found &= bits[positions].astype(bool)
+    return bool(found.any())
+
+
+def _normalize_filters(filters):
+    """
+    filters를 DNF(OR로 묶인 AND 조건 목록) 형태인 [[(col, op, value), ...], ...]로 정규화합니다.
+    [(col, op, value), ...] 형태는 하나의 AND 조건으로 취급합니다.
+    """
+    if not filters:
+        return None
+    if isinstance(filters[0], tuple) or (len(filters[0]) == 3 and isinstance(filters[0][0], str)):
+        filters = [filters]
+    normalized = []
+    for conjunction in filters:
+        terms = []
+        for term in conjunction:
+            if len(term) != 3:
+                raise ValueError(f"필터는 (컬럼, 연산자, 값) 형태여야 합니다: {term}")
+            column, op, value = term
+            op = op.lower() if isinstance(op, str) else op
+            if op not in _FILTER_OPS:
+                raise ValueError(f"지원하지 않는 필터 연산자: {op} (지원: {', '.join(_FILTER_OPS)})")
+            if op in ('in', 'not in'):
+                value = list(value)
+            terms.append((column, op, value))
+        normalized.append(terms)
+    return normalized
+
+
+def _term_may_match(stats, num_rows, op, value):
+    """컬럼 통계만 보고 (op, value) 조건을 만족하는 행이 있을 수 있는지 판단합니다."""
+    if stats is None:
+        return True
+    if op == 'not in' and stats.get('null_count') != 0:
+        # pyarrow와 같이 not in은 null 행을 포함하므로 null이 있을 수 있는 파일은 건너뛰지 않습니다.
+        return True
+    if num_rows is not None and stats.get('null_count') == num_rows:
+        # 모든 값이 null이면 (not in 외의) 어떤 비교 조건도 참이 될 수 없습니다.
+        return False
+    if 'min' not in stats:
+        return True
+
+    lo, hi = stats['min'], stats['max']
+    kind = stats.get('kind')
+    if kind is not None:
+        # 날짜/시각 통계는 숫자로 저장되어 있으므로 필터 값도 같은 방식으로 변환합니다.
+        if op in ('in', 'not in'):
+            value = [_temporal_stat_value(v, kind) for v in value]
+            if any(v is None for v in value):
+                return True
+        else:
+            value = _temporal_stat_value(value, kind)
+            if value is None:
+                return True
+    try:
+        if op in ('==', '='):
+            return lo <= value <= hi
+        if op == '!=':
+            return not (lo == hi == value)
+        if op == '<':
+            return lo < value
+        if op == '<=':
+            return lo <= value
+        if op == '>':
+            return hi > value
+        if op == '>=':
+            return hi >= value
+        if op == 'in':
+            return any(lo <= v <= hi for v in value)
+        if op == 'not in':
+            return not (lo == hi and lo in value)
+    except TypeError:
+        # 통계와 필터 값의 타입이 비교 불가능하면 안전하게 읽기 대상으로 둡니다.
+        return True
+    return True
+
+
+def _file_may_match(file_info, filters):
+    """manifest의 파일 통계로 filters(DNF)를 만족하는 행이 있을 수 있는지 판단합니다."""
+    if filters is None:
+        return True
+    num_rows = file_info.get('num_rows')
+    if num_rows == 0:
+        return False
+    column_stats = file_info.get('column_stats')
+    if column_stats is None:
+        return True
+    return any(
+        all(_term_may_match(column_stats.get(column), num_rows, op, value) for column, op, value in conjunction)
+        for conjunction in filters
+    )
+
+
+def _filter_predicate(filters, col):
+    """
+    DNF filters를 컬럼 객체(pandas Series, polars Expr 등)에 대한 불리언 조건식으로 변환합니다.
+    col(name)은 컬럼 이름을 받아 비교 연산을 지원하는 객체를 반환해야 합니다.
+    null(pandas에서는 NaN/None) 처리는 parquet 리더에 전달되는 pyarrow 필터와 같습니다.
+    비교 연산은 null에 대해 거짓이고, 'not in'은 null을 포함합니다.
+    """
+    result = None
+    for conjunction in filters:
+        combined = None
+        for column, op, value in conjunction:
+            c = col(column)
+            if op in ('==', '='):
+                term = c == value
+            elif op == '!=':
+                term = c != value
+                if hasattr(c, 'notna'):
+                    # pandas는 NaN != x를 참으로 계산합니다.
+                    term = term & c.notna()
+            elif op == '<':
+                term = c < value
+            elif op == '<=':
+                term = c <= value
+            elif op == '>':
+                term = c > value
+            elif op == '>=':
+                term = c >= value
+            else:
+                term = c.is_in(value) if hasattr(c, 'is_in') else c.isin(value)
+                if op == 'not in':
+                    term = ~term
+                    if hasattr(c, 'is_null'):
+                        # polars의 is_in은 null에 대해 null을 반환하므로 pyarrow와 같이 null을 포함시킵니다.
+                        term = term | c.is_null()
+            combined = term if combined is None else combined & term
+        result = combined if result is None else result | combined
+    return result
@@ -0,0 +1,146 @@
+"""
+스냅샷 테이블의 새 버전 감시.
+
+watch_table은 커밋될 때마다 새 버전을 알려 줍니다. Linux에서는 inotify로 메타데이터 폴더의 변경을
+기다리고, 그 외 플랫폼에서는 점점 간격을 늘려 가며 최신 버전을 확인합니다.
+"""
+
+import os
+import sys
+import time
+
+from .snapshot import _current_version, _load_snapshot
+
+
+# inotify 이벤트: 파일 생성/교체(JSON 카탈로그의 vN.metadata.json, 포인터), 수정(SQLite 카탈로그의 WAL)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+
+
+class _DirectoryWatcher:
+    """
+    Linux inotify로 디렉토리들의 파일 변경을 기다립니다 (ctypes로 libc를 직접 호출하므로 추가 의존성이 없습니다).
+    inotify를 사용할 수 없는 환경이면 open()이 None을 반환하고 호출 측은 stat 폴링으로 대신합니다.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    @classmethod
+    def open(cls, paths):
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        for path in paths:
+            if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+                os.close(fd)
+                return None
+        return cls(fd)
+
+    def wait(self, timeout):
+        """이벤트가 오거나 timeout(초)이 지날 때까지 기다립니다. 쌓인 이벤트는 모두 비웁니다."""
+        import select
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+        return bool(readable)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _visible_version(table_path):
+    """reader에게 보이는 최신 버전 (커밋 중인 트랜잭션 버전 제외, 테이블이 없으면 0)과 실제 최신 버전"""
+    latest = _current_version(table_path)
+    if latest == 0:
+        return 0, 0
+    try:
+        return _load_snapshot(table_path, latest)[0], latest
+    except FileNotFoundError:
+        return 0, latest
+
+
+def _watch_versions(table_path, since, timeout, poll_interval, max_poll_interval):
+    watcher = None
+    use_inotify = True
+    last = None
+    interval = poll_interval
+    deadline = time.time() + timeout if timeout is not None else None
+    try:
+        while True:
+            if watcher is None and use_inotify:
+                # 버전을 확인하기 전에 감시를 시작해야 그 사이의 커밋을 놓치지 않습니다.
+                # 테이블이 아직 없으면 감시할 폴더가 없으므로 폴더가 생길 때까지 폴링합니다.
+                watched = [path for path in (table_path, os.path.join(table_path, 'metadata')) if os.path.isdir(path)]
+                if len(watched) == 2:
+                    watcher = _DirectoryWatcher.open(watched)
+                    use_inotify = watcher is not None
+            visible, latest = _visible_version(table_path)
+            if last is None:
+                last = visible if since is None else since
+            if visible > last:
+                last = visible
+                interval = poll_interval
+                if timeout is not None:
+                    deadline = time.time() + timeout
+                yield visible
+                continue
+
+            wait = max_poll_interval
+            if deadline is not None:
+                wait = deadline - time.time()
+                if wait <= 0:
+                    return
+            # 트랜잭션 버전은 다른 테이블 폴더의 결정 파일로 공개되므로 이벤트 대신 짧게 폴링합니다.
+            if watcher is not None and latest == visible:
+                # 놓친 이벤트가 있더라도 max_poll_interval마다 한 번은 다시 확인합니다.
+                watcher.wait(min(wait, max_poll_interval))
+            else:
+                time.sleep(min(wait, interval))
+                interval = min(interval * 2, max_poll_interval)
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+
+def watch_table(table_path, callback=None, since=None, timeout=None, poll_interval=0.05, max_poll_interval=1.0):
+    """
+    테이블에 새 버전이 커밋될 때마다 그 버전 번호를 알려줍니다.
+
+    Linux에서는 inotify로 테이블 폴더와 metadata 폴더의 변경을 기다리므로, 커밋 직후 바로 깨어나고
+    기다리는 동안 CPU와 I/O를 쓰지 않습니다. inotify를 쓸 수 없으면 poll_interval부터 max_poll_interval까지
+    간격을 늘려 가며 버전을 확인합니다. 확인 사이에 여러 버전이 커밋되면 최신 버전만 알려주며,
+    transaction()으로 커밋 중인 버전은 공개된 뒤에 알려줍니다.
+
+    Args:
+        table_path (str): 스냅샷 테이블 경로.
+        callback (callable, optional): 새 버전 번호를 받을 함수. 지정하면 감시를 이 호출 안에서 수행하고,
+            callback이 False를 반환하거나 timeout이 지나면 끝납니다. None이면 버전 번호를 내는 이터레이터를
+            반환합니다. Defaults to None.
+        since (int, optional): 이 버전보다 새로운 버전부터 알려줍니다. None이면 현재 버전. Defaults to None.
+        timeout (float, optional): 새 버전 없이 이 시간(초)이 지나면 감시를 끝냅니다. None이면 계속 감시합니다.
+        poll_interval (float): 폴링할 때의 첫 확인 간격(초). Defaults to 0.05.
+        max_poll_interval (float): 폴링 간격의 상한(초). Defaults to 1.0.
+    """
+    versions = _watch_versions(table_path, since, timeout, poll_interval, max_poll_interval)
+    if callback is None:
+        return versions
+    for version in versions:
+        if callback(version) is False:
+            versions.close()
+            break
+    return None
@@ -1,6 +1,7 @@
+import os
 import pandas as pd
 import numpy as np
-from atomicwriter.core import read_table, write_snapshot
+from atio import read_table, write_snapshot
 import pytest
 # 사용 예시 파일에 추가
 def demo_snapshot_feature():
@@ -28,4 +29,928 @@ def demo_snapshot_feature():
     # 과거 데이터 읽기 (시간 여행)
     print("\n[과거(v1) 데이터 읽기 - 시간 여행]")
     v1_df = read_table(TABLE_DIR, version=1)
-    print(v1_df)
\ No newline at end of file
+    print(v1_df)
+
+
+def _manifest_entries(table_dir):
+    import glob
+    from atio.utils import read_json
+    entries = []
+    for path in glob.glob(os.path.join(table_dir, 'metadata', 'manifest-*.json')):
+        entries.extend(read_json(path)['files'])
+    return entries
+
+
+def test_manifest_records_file_stats(tmp_path):
+    table_dir = str(tmp_path / "table")
+    df = pd.DataFrame({'id': [3, 1, 2], 'name': ['b', None, 'a']})
+    write_snapshot(df, table_dir)
+
+    [entry] = _manifest_entries(table_dir)
+    assert entry['num_rows'] == 3
+    assert entry['size_bytes'] > 0
+    assert entry['column_stats']['id'] == {'null_count': 0, 'min': 1, 'max': 3}
+    assert entry['column_stats']['name'] == {'null_count': 1, 'min': 'a', 'max': 'b'}
+
+
+def test_read_table_filters_skip_files(tmp_path):
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1, 2, 3]}), table_dir)
+    write_snapshot(pd.DataFrame({'id': [10, 11, 12]}), table_dir, mode='append')
+
+    result = read_table(table_dir, filters=[('id', '>=', 10)])
+    assert sorted(result['id'].tolist()) == [10, 11, 12]
+
+    assert read_table(table_dir, filters=[('id', '>', 100)]) is None
+    both = read_table(table_dir, filters=[[('id', '==', 1)], [('id', '==', 12)]])
+    assert sorted(both['id'].tolist()) == [1, 12]
+
+
+def test_timestamp_and_date_filters_prune_files(tmp_path, monkeypatch):
+    import datetime as dt
+    import atio.read as reader
+    table_dir = str(tmp_path / "table")
+    times = pd.date_range('2024-01-01', periods=8 * 24, freq='h')
+    df = pd.DataFrame({'event_time': times, 'day': times.date, 'v': range(len(times))})
+    write_snapshot(df, table_dir, max_rows_per_file=24)
+
+    read_counts = []
+    original = reader._read_file_entries
+
+    def counting_read(table_path, entries, *args, **kwargs):
+        read_counts.append(len(entries))
+        return original(table_path, entries, *args, **kwargs)
+
+    monkeypatch.setattr(reader, '_read_file_entries', counting_read)
+    hour = [('event_time', '>=', pd.Timestamp('2024-01-03 10:00')), ('event_time', '<', dt.datetime(2024, 1, 3, 11))]
+    assert read_table(table_dir, filters=hour)['v'].tolist() == [58]
+    assert read_table(table_dir, filters=[('day', 'in', [dt.date(2024, 1, 5), dt.date(2024, 1, 7)])]).shape[0] == 48
+    assert read_counts == [1, 2]
+
+
+def test_read_table_columns_and_row_filters(tmp_path):
+    pl = pytest.importorskip("polars")
+    table_dir = str(tmp_path / "table")
+    df = pd.DataFrame({'id': [1, 2, 3, 4], 'name': list('abcd'), 'score': [0.1, 0.2, 0.3, 0.4]})
+    write_snapshot(df, table_dir)
+
+    result = read_table(table_dir, columns=['id', 'name'], filters=[('id', 'in', [2, 4])])
+    assert list(result.columns) == ['id', 'name']
+    assert result['id'].tolist() == [2, 4]
+
+    result = read_table(table_dir, output_as='polars', columns=['name'], filters=[('score', '>', 0.25)])
+    assert isinstance(result, pl.DataFrame)
+    assert result.columns == ['name']
+    assert result['name'].to_list() == ['c', 'd']
+
+
+def test_row_filters_handle_nulls_the_same_on_every_read_path(tmp_path):
+    from atio import delete_rows, enable_read_cache, disable_read_cache, scan_table
+    df = pd.DataFrame({'id': [1, 2, 3], 'x': [1.0, None, 3.0]})
+    parquet_dir, csv_dir = str(tmp_path / "parquet"), str(tmp_path / "csv")
+    write_snapshot(df, parquet_dir)
+    write_snapshot(df, csv_dir, format='csv')
+
+    # parquet 리더의 pyarrow 필터와 같이 !=는 null을 제외하고 not in은 null을 포함합니다.
+    for filters, expected in (([('x', '!=', 1.0)], [3]), ([('x', 'not in', [1.0])], [2, 3])):
+        for table_dir in (parquet_dir, csv_dir):
+            assert read_table(table_dir, filters=filters)['id'].tolist() == expected
+            assert read_table(table_dir, filters=filters, output_as='polars')['id'].to_list() == expected
+            assert scan_table(table_dir, filters=filters).collect()['id'].to_list() == expected
+        enable_read_cache()
+        try:
+            assert read_table(parquet_dir, filters=filters)['id'].tolist() == expected
+        finally:
+            disable_read_cache()
+
+    # 통계로 파일을 건너뛸 때도 not in은 null 행을 포함합니다 (min == max인 파일, 모두 null인 파일).
+    pruned_dir = str(tmp_path / "pruned")
+    write_snapshot(pd.DataFrame({'id': [1, 2], 'x': [1.0, None]}), pruned_dir)
+    write_snapshot(pd.DataFrame({'id': [3], 'x': [None]}, dtype='float64'), pruned_dir, mode='append')
+    assert sorted(read_table(pruned_dir, filters=[('x', 'not in', [1.0])])['id']) == [2, 3]
+    assert read_table(pruned_dir, filters=[('x', '!=', 1.0)]) is None
+
+    # 삭제 조건도 읽기와 같은 행만 지우므로 null 행은 남습니다.
+    delete_rows(parquet_dir, [('x', '!=', 3.0)])
+    assert read_table(parquet_dir)['id'].tolist() == [2, 3]
+    assert read_table(parquet_dir, filters=[('x', '!=', 1.0)])['id'].tolist() == [3]
+
+
+def test_read_table_keeps_pandas_index_across_files(tmp_path):
+    table_dir = str(tmp_path / "table")
+    first = pd.DataFrame({'v': [1, 2]}, index=pd.Index(['a', 'b'], name='key'))
+    write_snapshot(first, table_dir)
+    assert read_table(table_dir).index.tolist() == ['a', 'b']
+
+    write_snapshot(pd.DataFrame({'v': [3]}, index=pd.Index(['c'], name='key')), table_dir, mode='append')
+    result = read_table(table_dir)
+    assert result.index.name == 'key'
+    assert sorted(result.index) == ['a', 'b', 'c']
+    assert read_table(table_dir, filters=[('v', '>=', 2)]).sort_index().index.tolist() == ['b', 'c']
+
+    # 캐시나 메모리 매핑을 거쳐 읽어도 columns만 읽을 때 같은 인덱스를 돌려줍니다.
+    from atio import enable_read_cache, disable_read_cache
+    uncached = read_table(table_dir, columns=['v'])
+    assert uncached.index.name == 'key'
+    pd.testing.assert_frame_equal(read_table(table_dir, columns=['v'], memory_map=True), uncached)
+    enable_read_cache()
+    try:
+        for _ in range(2):
+            pd.testing.assert_frame_equal(read_table(table_dir, columns=['v']), uncached)
+    finally:
+        disable_read_cache()
+
+    # 행 번호 인덱스는 파일 수와 관계없이 0부터 다시 매겨집니다.
+    plain_dir = str(tmp_path / "plain")
+    write_snapshot(pd.DataFrame({'v': [1, 2, 3]}), plain_dir, format='csv')
+    assert read_table(plain_dir, filters=[('v', '>', 1)]).index.tolist() == [0, 1]
+    write_snapshot(pd.DataFrame({'v': [4]}), plain_dir, mode='append')
+    assert read_table(plain_dir).index.tolist() == [0, 1, 2, 3]
+
+
+def test_scan_table_and_iter_batches(tmp_path):
+    pl = pytest.importorskip("polars")
+    from atio import scan_table, iter_batches
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': range(10)}), table_dir)
+    write_snapshot(pd.DataFrame({'id': range(10, 20)}), table_dir, mode='append')
+
+    lazy = scan_table(table_dir, filters=[('id', '>=', 15)])
+    assert isinstance(lazy, pl.LazyFrame)
+    assert sorted(lazy.collect()['id'].to_list()) == [15, 16, 17, 18, 19]
+
+    dataset = scan_table(table_dir, output_as='arrow')
+    assert dataset.count_rows() == 20
+
+    batches = list(iter_batches(table_dir, batch_size=4, filters=[('id', '<', 10)]))
+    assert all(batch.num_rows <= 4 for batch in batches)
+    assert sum(batch.num_rows for batch in batches) == 10
+
+
+def test_read_table_non_parquet_formats(tmp_path):
+    pl = pytest.importorskip("polars")
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1, 2]}), table_dir, format='csv')
+    write_snapshot(pl.DataFrame({'id': [3, 4]}), table_dir, mode='append', format='ipc')
+    write_snapshot(pd.DataFrame({'id': [5, 6]}), table_dir, mode='append', format='parquet')
+
+    result = read_table(table_dir, filters=[('id', '!=', 4)], max_workers=2)
+    assert sorted(result['id'].tolist()) == [1, 2, 3, 5, 6]
+
+    result = read_table(table_dir, output_as='polars')
+    assert sorted(result['id'].to_list()) == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'json'])
+def test_pandas_csv_and_json_tables_round_trip(tmp_path, fmt):
+    pl = pytest.importorskip("polars")
+    from atio import table_info
+    table_dir = str(tmp_path / "table")
+    df = pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})
+    write_snapshot(df, table_dir, format=fmt)
+
+    pd.testing.assert_frame_equal(read_table(table_dir), df, check_dtype=False)
+    result = read_table(table_dir, output_as='polars')
+    assert result.columns == ['id', 'name'] and result['id'].to_list() == [1, 2]
+    assert list(table_info(table_dir)['columns']) == ['id', 'name']
+
+    # 이름 있는 인덱스는 컬럼으로 기록됩니다.
+    named_dir = str(tmp_path / "named")
+    write_snapshot(df.set_index('name'), named_dir, format=fmt)
+    assert sorted(read_table(named_dir).columns) == ['id', 'name']
+
+
+def test_optimize_table_compacts_small_files(tmp_path):
+    pytest.importorskip("polars")
+    from atio import optimize_table
+    from atio.snapshot import _load_snapshot
+    table_dir = str(tmp_path / "table")
+    for i in range(5):
+        write_snapshot(pd.DataFrame({'id': [i * 2, i * 2 + 1]}), table_dir, mode='append')
+    before = read_table(table_dir)
+
+    new_version = optimize_table(table_dir)
+    assert new_version == 6
+    _, snapshot = _load_snapshot(table_dir)
+    assert len(snapshot['manifests']) == 1
+    after = read_table(table_dir)
+    assert sorted(after['id'].tolist()) == sorted(before['id'].tolist())
+    assert len(read_table(table_dir, version=5)) == 10
+
+    # 합칠 파일이 하나뿐이면 아무것도 하지 않습니다.
+    assert optimize_table(table_dir) is None
+
+
+def test_read_table_as_of_timestamp(tmp_path):
+    import time
+    from datetime import datetime
+    from atio.snapshot import _version_log_path
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1]}), table_dir)
+    time.sleep(0.05)
+    between = datetime.now()
+    time.sleep(0.05)
+    write_snapshot(pd.DataFrame({'id': [2]}), table_dir, mode='append')
+
+    assert read_table(table_dir, as_of=between)['id'].tolist() == [1]
+    assert sorted(read_table(table_dir, as_of=datetime.now())['id'].tolist()) == [1, 2]
+    with pytest.raises(ValueError):
+        read_table(table_dir, as_of=datetime(2000, 1, 1))
+
+    # 버전 로그가 없는 (이전 형식의) 테이블은 메타데이터에서 복구합니다.
+    os.remove(_version_log_path(table_dir))
+    assert read_table(table_dir, as_of=between)['id'].tolist() == [1]
+
+
+def test_expire_snapshots_is_incremental(tmp_path):
+    from datetime import timedelta
+    from atio import expire_snapshots
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1]}), table_dir)
+    write_snapshot(pd.DataFrame({'id': [2]}), table_dir, mode='append')
+    write_snapshot(pd.DataFrame({'id': [3]}), table_dir)  # overwrite: v1, v2의 파일은 v3에서 참조되지 않음
+
+    planned = expire_snapshots(table_dir, keep_for=timedelta(0), dry_run=True)
+    assert len(planned) == 8  # v1, v2 각각의 metadata + snapshot + manifest + 데이터 파일
+    assert all(os.path.exists(f) for f in planned)
+
+    deleted = expire_snapshots(table_dir, keep_for=timedelta(0), dry_run=False)
+    assert deleted == planned
+    assert not any(os.path.exists(f) for f in deleted)
+    assert read_table(table_dir)['id'].tolist() == [3]
+
+    # 이미 정리한 버전은 다시 검사하지 않습니다.
+    assert expire_snapshots(table_dir, keep_for=timedelta(0), dry_run=False) == []
+
+
+def test_expire_snapshots_count_and_size_policies(tmp_path):
+    from atio import expire_snapshots
+    table_dir = str(tmp_path / "table")
+    for i in range(5):
+        write_snapshot(pd.DataFrame({'id': [i]}), table_dir)
+
+    expire_snapshots(table_dir, keep_for=None, keep_last=3, dry_run=False)
+    metadata_files = os.listdir(os.path.join(table_dir, 'metadata'))
+    assert sorted(f for f in metadata_files if f.endswith('.metadata.json')) == \
+        ['v3.metadata.json', 'v4.metadata.json', 'v5.metadata.json']
+
+    # 한도가 현재 버전보다 작아도 현재 버전은 보관됩니다.
+    expire_snapshots(table_dir, keep_for=None, max_total_bytes=1, dry_run=False)
+    assert read_table(table_dir)['id'].tolist() == [4]
+    assert len(os.listdir(os.path.join(table_dir, 'data'))) == 1
+
+
+def _append_worker(table_dir, worker_id, commits):
+    for i in range(commits):
+        write_snapshot(pd.DataFrame({'worker': [worker_id], 'seq': [i]}), table_dir, mode='append')
+
+
+def test_concurrent_append_commits_are_not_lost(tmp_path):
+    import multiprocessing
+    from atio.snapshot import _current_version
+    table_dir = str(tmp_path / "table")
+    workers, commits = 4, 5
+
+    ctx = multiprocessing.get_context('spawn')
+    processes = [ctx.Process(target=_append_worker, args=(table_dir, w, commits)) for w in range(workers)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+        assert p.exitcode == 0
+
+    assert _current_version(table_dir) == workers * commits
+    result = read_table(table_dir)
+    assert len(result) == workers * commits
+    assert len(result.drop_duplicates()) == workers * commits
+
+
+def test_readers_wait_for_metadata_written_without_hard_links(tmp_path, monkeypatch):
+    import threading
+    import atio.snapshot
+
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1]}), table_dir)
+
+    # 하드 링크를 지원하지 않는 파일시스템에서도 커밋됩니다.
+    def no_link(src, dst):
+        raise PermissionError("hard links are not supported")
+    monkeypatch.setattr(atio.snapshot.os, 'link', no_link)
+    write_snapshot(pd.DataFrame({'id': [2]}), table_dir, mode='append')
+    assert sorted(read_table(table_dir)['id'].tolist()) == [1, 2]
+
+    # 생성된 직후 아직 비어 있는 metadata 파일을 읽으면 내용이 채워질 때까지 기다립니다.
+    metadata_path = os.path.join(table_dir, 'metadata', 'v2.metadata.json')
+    with open(metadata_path, 'rb') as f:
+        content = f.read()
+    open(metadata_path, 'wb').close()
+
+    def fill():
+        with open(metadata_path, 'wb') as f:
+            f.write(content)
+    timer = threading.Timer(0.2, fill)
+    timer.start()
+    try:
+        assert sorted(read_table(table_dir)['id'].tolist()) == [1, 2]
+    finally:
+        timer.join()
+
+
+def test_partitioned_write_and_partition_pruning(tmp_path, monkeypatch):
+    import atio.snapshot
+    table_dir = str(tmp_path / "table")
+    df = pd.DataFrame({'day': ['2025-08-11', '2025-08-12', '2025-08-11'], 'sales': [1, 2, 3]})
+    write_snapshot(df, table_dir, partition_by='day')
+    write_snapshot(pd.DataFrame({'day': ['2025-08-13'], 'sales': [4]}), table_dir, mode='append', partition_by='day')
+
+    entries = _manifest_entries(table_dir)
+    assert sorted(entry['partition']['day'] for entry in entries) == ['2025-08-11', '2025-08-12', '2025-08-13']
+
+    opened = []
+    original_read_json = atio.snapshot.read_json
+    monkeypatch.setattr(atio.snapshot, 'read_json', lambda path: opened.append(path) or original_read_json(path))
+
+    result = read_table(table_dir, partitions={'day': '2025-08-11'})
+    assert sorted(result['sales'].tolist()) == [1, 3]
+    # 다른 파티션만 담은 manifest(두 번째 커밋)는 열지 않습니다.
+    assert sum('manifest-' in path for path in opened) == 1
+
+    result = read_table(table_dir, partitions={'day': ['2025-08-12', '2025-08-13']})
+    assert sorted(result['sales'].tolist()) == [2, 4]
+
+
+def test_partitioned_write_keeps_named_pandas_index(tmp_path):
+    table_dir = str(tmp_path / "table")
+    df = pd.DataFrame({'day': ['a', 'b', 'a'], 'v': [1, 2, 3]}, index=pd.Index(['x', 'y', 'z'], name='key'))
+    write_snapshot(df, table_dir, partition_by='day')
+    result = read_table(table_dir)
+    assert result.index.name == 'key'
+    assert result.sort_index()['v'].tolist() == [1, 2, 3]
+    assert read_table(table_dir, partitions={'day': 'a'}).index.tolist() == ['x', 'z']
+
+
+def test_partitions_filter_rejects_files_without_partition_column(tmp_path):
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'day': ['a', 'b'], 'sales': [1, 2]}), table_dir, partition_by='day')
+
+    # 잘못된 파티션 컬럼 이름은 테이블 전체를 돌려주지 않고 오류를 냅니다.
+    with pytest.raises(ValueError):
+        read_table(table_dir, partitions={'dya': 'a'})
+
+    # 파티션 없이 추가한 파일이 섞이면 partitions로 거를 수 없습니다.
+    write_snapshot(pd.DataFrame({'day': ['a', 'b'], 'sales': [3, 4]}), table_dir, mode='append')
+    with pytest.raises(ValueError):
+        read_table(table_dir, partitions={'day': 'a'})
+    assert sorted(read_table(table_dir, filters=[('day', '==', 'a')])['sales'].tolist()) == [1, 3]
+
+
+def test_read_changes_between_versions(tmp_path):
+    from atio import read_changes
+    table_dir = str(tmp_path / "table")
+    for i in range(3):
+        write_snapshot(pd.DataFrame({'id': [i * 10, i * 10 + 1]}), table_dir, mode='append')
+
+    added, removed = read_changes(table_dir, 1, 3)
+    assert sorted(added['id'].tolist()) == [10, 11, 20, 21]
+    assert removed is None
+
+    added_files, removed_files = read_changes(table_dir, 2, files_only=True)
+    assert len(added_files) == 1 and removed_files == []
+
+    # 변경된 파일에도 행 조건이 적용됩니다.
+    added, _ = read_changes(table_dir, 0, filters=[('id', '>=', 20)])
+    assert added['id'].tolist() == [20, 21]
+
+    write_snapshot(pd.DataFrame({'id': [99]}), table_dir, mode='overwrite')
+    added, removed = read_changes(table_dir, 3, 4)
+    assert added['id'].tolist() == [99]
+    assert sorted(removed['id'].tolist()) == [0, 1, 10, 11, 20, 21]
+
+    with pytest.raises(ValueError):
+        read_changes(table_dir, 4, 2)
+
+
+def test_sqlite_catalog_table(tmp_path):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from atio import expire_snapshots, optimize_table, read_changes
+    from atio.snapshot import _current_version
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [0]}), table_dir, catalog='sqlite')
+    before_appends = time.time()
+    time.sleep(0.01)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(
+            lambda i: write_snapshot(pd.DataFrame({'id': [i]}), table_dir, mode='append'), range(1, 9)
+        ))
+
+    # 버전/snapshot/manifest는 JSON 파일 대신 카탈로그에 기록됩니다.
+    assert os.path.exists(os.path.join(table_dir, '_catalog.db'))
+    assert os.listdir(os.path.join(table_dir, 'metadata')) == []
+    assert _current_version(table_dir) == 9
+    assert sorted(read_table(table_dir)['id'].tolist()) == list(range(9))
+    assert read_table(table_dir, as_of=before_appends)['id'].tolist() == [0]
+    added, _ = read_changes(table_dir, 1)
+    assert sorted(added['id'].tolist()) == list(range(1, 9))
+
+    assert optimize_table(table_dir) == 10
+    expire_snapshots(table_dir, keep_for=None, keep_last=1, dry_run=False)
+    assert len(os.listdir(os.path.join(table_dir, 'data'))) == 1
+    assert sorted(read_table(table_dir)['id'].tolist()) == list(range(9))
+    with pytest.raises(FileNotFoundError):
+        read_table(table_dir, version=9)
+
+    with pytest.raises(ValueError):
+        write_snapshot(pd.DataFrame({'id': [0]}), table_dir, catalog='json')
+
+
+def test_table_info_and_history_from_metadata(tmp_path, monkeypatch):
+    import atio.read
+    from atio import table_info, table_history
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1, 2, 3], 'name': ['a', 'b', 'c']}), table_dir)
+    write_snapshot(pd.DataFrame({'id': [4], 'name': ['d']}), table_dir, mode='append', format='csv')
+
+    # 데이터 파일은 읽지 않습니다.
+    monkeypatch.setattr(atio.read, '_read_data_file', None)
+    info = table_info(table_dir)
+    assert info['version'] == 2
+    assert info['num_rows'] == 4
+    assert info['num_files'] == 2
+    assert list(info['columns']) == ['id', 'name'] and info['columns']['id'] == 'int64'
+    assert info['size_bytes'] == sum(
+        os.path.getsize(os.path.join(table_dir, 'data', f)) for f in os.listdir(os.path.join(table_dir, 'data'))
+    )
+    assert table_info(table_dir, version=1)['num_rows'] == 3
+
+    history = table_history(table_dir)
+    assert [h['version'] for h in history] == [1, 2]
+    assert [h['table_rows'] for h in history] == [3, 4]
+    assert history[1]['added_rows'] == 1
+    assert history[1]['table_bytes'] == info['size_bytes']
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "ipc", "csv"])
+def test_write_snapshot_from_batch_stream(tmp_path, fmt):
+    import pyarrow as pa
+    from atio import table_info
+    table_dir = str(tmp_path / "table")
+
+    def batches():
+        for i in range(6):
+            yield pd.DataFrame({'id': np.arange(i * 1000, (i + 1) * 1000), 'name': [f'n{i}'] * 1000})
+
+    # 작은 target_file_size로 여러 파일에 나누어 쓰지만 하나의 버전으로 커밋됩니다.
+    assert write_snapshot(batches(), table_dir, format=fmt, target_file_size=1) == 1
+    entries = _manifest_entries(table_dir)
+    assert len(entries) == 6
+    assert sorted(e['column_stats']['id']['min'] for e in entries) == [i * 1000 for i in range(6)]
+    assert table_info(table_dir)['num_rows'] == 6000
+
+    result = read_table(table_dir, filters=[('id', '>=', 5500)])
+    assert result['id'].tolist() == list(range(5500, 6000))
+
+    # Arrow RecordBatch도 배치로 쓸 수 있습니다.
+    batch = pa.record_batch({'id': pa.array([1, 2], pa.int64()), 'name': pa.array(['x', 'y'])})
+    write_snapshot([batch, batch], table_dir, mode='append', format=fmt)
+    assert len(read_table(table_dir)) == 6004
+
+
+def test_write_snapshot_splits_large_frames(tmp_path):
+    import polars as pl
+    from atio.snapshot import _load_snapshot, _resolve_file_entries
+    table_dir = str(tmp_path / "table")
+    df = pd.DataFrame({'id': np.arange(10000), 'value': np.random.rand(10000)})
+
+    write_snapshot(df, table_dir, max_rows_per_file=3000)
+    entries = _manifest_entries(table_dir)
+    assert sorted(e['num_rows'] for e in entries) == [1000, 3000, 3000, 3000]
+    assert read_table(table_dir)['id'].tolist() == list(range(10000))
+
+    # target_file_size는 메모리 상 크기로 파일당 행 수를 추정합니다. (16 bytes/행)
+    write_snapshot(pl.from_pandas(df), table_dir, target_file_size=40000)
+    assert len(_resolve_file_entries(table_dir, _load_snapshot(table_dir)[1])) == 4
+
+    # 배치 스트림도 max_rows_per_file에 맞춰 배치를 나누어 씁니다.
+    write_snapshot([df.iloc[:5000], df.iloc[5000:]], table_dir, max_rows_per_file=4000)
+    entries = _resolve_file_entries(table_dir, _load_snapshot(table_dir)[1])
+    assert [e['num_rows'] for e in entries] == [4000, 4000, 2000]
+
+
+def test_read_cache_reuses_decoded_files(tmp_path, monkeypatch):
+    import atio.read
+    from atio import enable_read_cache, disable_read_cache, read_cache_info
+    table_dir = str(tmp_path / "table")
+    for i in range(3):
+        write_snapshot(pd.DataFrame({'id': np.arange(i * 100, (i + 1) * 100), 'x': np.ones(100)}),
+                       table_dir, mode='append', format='csv' if i == 2 else 'parquet')
+
+    enable_read_cache(max_bytes=10 * 1024 * 1024)
+    try:
+        expected = read_table(table_dir)
+        assert read_cache_info()['misses'] == 3
+
+        # 캐시된 Table만으로 읽으므로 파일을 다시 읽지 않습니다.
+        monkeypatch.setattr(atio.read, '_read_arrow_table', None)
+        pd.testing.assert_frame_equal(read_table(table_dir), expected)
+        result = read_table(table_dir, output_as='polars', filters=[('id', '>=', 250)])
+        assert result['id'].to_list() == list(range(250, 300))
+        assert read_cache_info()['hits'] == 4
+
+        # 예산을 넘으면 가장 오래 사용되지 않은 Table부터 제거합니다.
+        monkeypatch.undo()
+        enable_read_cache(max_bytes=2000)
+        read_table(table_dir)
+        info = read_cache_info()
+        assert info['current_bytes'] <= 2000 and info['entries'] == 1
+    finally:
+        disable_read_cache()
+    assert read_cache_info() is None
+
+
+def test_read_table_arrow_memory_map_is_zero_copy(tmp_path):
+    import polars as pl
+    import pyarrow as pa
+    table_dir = str(tmp_path / "table")
+    for i in range(2):
+        write_snapshot(pl.DataFrame({'id': np.arange(i * 100000, (i + 1) * 100000)}),
+                       table_dir, mode='append', format='ipc')
+
+    allocated = pa.total_allocated_bytes()
+    result = read_table(table_dir, output_as='arrow', memory_map=True)
+    assert isinstance(result, pa.Table)
+    assert result.num_rows == 200000 and result.column('id').num_chunks == 2
+    # 압축되지 않은 ipc 파일은 메모리 매핑된 버퍼를 그대로 참조합니다.
+    assert pa.total_allocated_bytes() - allocated < result.nbytes // 10
+
+    filtered = read_table(table_dir, output_as='arrow', memory_map=True, filters=[('id', '<', 5)])
+    assert filtered.column('id').to_pylist() == [0, 1, 2, 3, 4]
+
+
+def test_read_table_numpy_output(tmp_path):
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'a': [1, 2, 3], 'b': [0.5, 1.5, 2.5]}), table_dir)
+    write_snapshot(pd.DataFrame({'a': [4], 'b': [3.5]}), table_dir, mode='append')
+    result = read_table(table_dir, output_as='numpy', filters=[('a', '>=', 2)])
+    assert result.shape == (3, 2)
+    assert sorted(result[:, 0].tolist()) == [2.0, 3.0, 4.0]
+
+    array_dir = str(tmp_path / "arrays")
+    write_snapshot(np.arange(6).reshape(3, 2), array_dir, format='npy')
+    write_snapshot(np.arange(6, 10).reshape(2, 2), array_dir, mode='append', format='npy')
+    arrays = read_table(array_dir, output_as='numpy', memory_map=True)
+    assert sorted(arrays[:, 0].tolist()) == [0, 2, 4, 6, 8]
+
+    npz_dir = str(tmp_path / "npz")
+    write_snapshot({'x': np.arange(3), 'y': np.ones(3)}, npz_dir, format='npz')
+    assert read_table(npz_dir, output_as='numpy', columns=['x'])['x'].tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("catalog", ["json", "sqlite"])
+def test_content_addressed_files_are_reused(tmp_path, catalog):
+    from atio import expire_snapshots
+    table_dir = str(tmp_path / "table")
+    same = pd.DataFrame({'id': [1, 2, 3]})
+    write_snapshot(same, table_dir, content_addressed=True, catalog=catalog)
+    write_snapshot(pd.DataFrame({'id': [9]}), table_dir, content_addressed=True)
+    write_snapshot(same, table_dir, content_addressed=True)
+
+    # 같은 내용은 하나의 파일로 저장됩니다.
+    data_files = os.listdir(os.path.join(table_dir, 'data'))
+    assert len(data_files) == 2
+    assert read_table(table_dir)['id'].tolist() == [1, 2, 3]
+
+    # v1의 파일은 v3이 다시 참조하므로 v1, v2를 만료해도 삭제되지 않습니다.
+    old = os.path.getmtime(os.path.join(table_dir, 'data', data_files[0])) - 7200
+    for name in data_files:
+        os.utime(os.path.join(table_dir, 'data', name), (old, old))
+    deleted = expire_snapshots(table_dir, keep_for=None, keep_last=1, dry_run=False)
+    assert sum(path.startswith(os.path.join(table_dir, 'data')) for path in deleted) == 1
+    assert read_table(table_dir)['id'].tolist() == [1, 2, 3]
+
+
+@pytest.mark.parametrize("catalog", ["json", "sqlite"])
+def test_delete_rows_and_upsert_with_deletion_vectors(tmp_path, catalog):
+    from atio import delete_rows, upsert, read_changes, optimize_table, expire_snapshots, table_info, scan_table
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': range(10), 'v': range(10)}), table_dir, catalog=catalog)
+    write_snapshot(pd.DataFrame({'id': range(10, 20), 'v': range(10, 20)}), table_dir, mode='append')
+    data_files = set(os.listdir(os.path.join(table_dir, 'data')))
+
+    assert delete_rows(table_dir, [('id', 'in', [1, 2, 15])]) == 3
+    assert delete_rows(table_dir, [('id', '==', 99)]) is None
+    assert upsert(pd.DataFrame({'id': [3, 25], 'v': [-3, 25]}), table_dir, key='id') == 4
+
+    # 데이터 파일은 다시 쓰지 않고 읽을 때 삭제 벡터를 적용합니다.
+    assert data_files < set(os.listdir(os.path.join(table_dir, 'data')))
+    expected = [0, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 18, 19, 25]
+    result = read_table(table_dir).sort_values('id')
+    assert result['id'].tolist() == expected
+    assert result.loc[result['id'] == 3, 'v'].tolist() == [-3]
+    assert sorted(read_table(table_dir, filters=[('id', '<', 5)], output_as='polars')['id']) == [0, 3, 4]
+    assert sorted(scan_table(table_dir, filters=[('id', '>', 12)]).collect()['id']) == [13, 14, 16, 17, 18, 19, 25]
+    assert table_info(table_dir)['num_rows'] == len(expected)
+
+    added, removed = read_changes(table_dir, 2, 3)
+    assert added is None and sorted(removed['id']) == [1, 2, 15]
+
+    # optimize_table은 삭제된 행을 빼고 다시 쓰고, 만료 후에도 최신 버전을 그대로 읽을 수 있습니다.
+    optimize_table(table_dir)
+    assert 'deletion_vector' not in str(read_changes(table_dir, 0, files_only=True)[0])
+    expire_snapshots(table_dir, keep_for=None, keep_last=1, dry_run=False)
+    assert sorted(read_table(table_dir)['id']) == expected
+
+
+def test_expire_keeps_files_of_rewritten_manifests(tmp_path):
+    from atio import delete_rows, expire_snapshots
+    table_dir = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1, 2, 3]}), table_dir)
+    delete_rows(table_dir, [('id', '==', 2)])
+
+    # v2는 v1의 manifest를 다시 썼지만 데이터 파일은 그대로 참조합니다.
+    deleted = expire_snapshots(table_dir, keep_for=None, keep_last=1, dry_run=False)
+    assert not any(path.startswith(os.path.join(table_dir, 'data')) for path in deleted)
+    assert read_table(table_dir)['id'].tolist() == [1, 3]
+
+
+def test_lookup_skips_files_with_bloom_filters(tmp_path, monkeypatch):
+    import atio.read as reader
+    table_dir = str(tmp_path / "table")
+    # 파일마다 키 범위가 겹쳐 min/max만으로는 파일을 건너뛸 수 없습니다.
+    for i in range(5):
+        keys = [i, 10 + i, 20 + i]
+        write_snapshot(pd.DataFrame({'id': keys, 'name': [f'n{k}' for k in keys]}), table_dir, mode='append',
+                       index_columns=['id', 'name'])
+
+    read_counts = []
+    original = reader._read_file_entries
+
+    def counting_read(table_path, entries, *args, **kwargs):
+        read_counts.append(len(entries))
+        return original(table_path, entries, *args, **kwargs)
+
+    monkeypatch.setattr(reader, '_read_file_entries', counting_read)
+
+    assert reader.lookup(table_dir, 'id', 12)['name'].tolist() == ['n12']
+    assert sorted(reader.lookup(table_dir, 'name', ['n3', 'n24'], output_as='polars')['id']) == [3, 24]
+    assert reader.lookup(table_dir, 'id', 15) is None
+    assert read_counts == [1, 2]
+
+
+def test_zorder_key_orders_single_column_and_limits_column_count():
+    import warnings
+    from atio.snapshot import _zorder_key
+
+    ranks = np.array([3, 0, 2, 1, 3], dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        order = np.argsort(_zorder_key([ranks]), kind='stable')
+    assert ranks[order].tolist() == [0, 1, 2, 3, 3]
+
+    with pytest.raises(ValueError):
+        _zorder_key([ranks] * 65)
+
+
+@pytest.mark.parametrize('clustering', [{'sort_by': 'v'}, {'zorder_by': ['v', 'w']}])
+def test_clustering_keeps_named_pandas_index(tmp_path, clustering):
+    table_dir = str(tmp_path / "table")
+    df = pd.DataFrame({'v': [3, 1, 2], 'w': [1, 2, 3]}, index=pd.Index(['c', 'a', 'b'], name='key'))
+    write_snapshot(df, table_dir, **clustering)
+    result = read_table(table_dir)
+    assert result.index.name == 'key'
+    pd.testing.assert_frame_equal(result.sort_index(), df.sort_index())
+
+
+def test_optimize_table_keeps_pandas_index(tmp_path):
+    from atio import optimize_table, delete_rows
+    table_dir = str(tmp_path / "table")
+    for i in range(3):
+        write_snapshot(pd.DataFrame({'v': [i]}, index=pd.Index([f'k{i}'], name='key')), table_dir, mode='append')
+    delete_rows(table_dir, [('v', '==', 1)])
+    before = read_table(table_dir)
+
+    optimize_table(table_dir)
+    after = read_table(table_dir)
+    assert after.index.name == 'key' and list(after.columns) == ['v']
+    pd.testing.assert_frame_equal(after.sort_values('v'), before.sort_values('v'))
+
+    optimize_table(table_dir, sort_by='v')
+    pd.testing.assert_frame_equal(read_table(table_dir).sort_values('v'), before.sort_values('v'))
+
+
+def test_sort_and_zorder_clustering_tightens_file_ranges(tmp_path):
+    from atio import optimize_table
+    from atio.read import _select_file_entries
+    from atio.stats import _normalize_filters
+
+    def files_read(table_dir, filters):
+        return len(_select_file_entries(table_dir, None, _normalize_filters(filters))[1])
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'x': rng.integers(0, 1000, 8000), 'y': rng.integers(0, 1000, 8000)})
+
+    unsorted_dir, sorted_dir, zorder_dir = (str(tmp_path / name) for name in ('unsorted', 'sorted', 'zorder'))
+    write_snapshot(df, unsorted_dir, max_rows_per_file=1000)
+    write_snapshot(df, sorted_dir, max_rows_per_file=1000, sort_by='x')
+    write_snapshot(df, zorder_dir, max_rows_per_file=1000, zorder_by=['x', 'y'])
+    assert files_read(unsorted_dir, [('x', '<', 100)]) == 8
+    assert files_read(sorted_dir, [('x', '<', 100)]) <= 2
+    assert files_read(zorder_dir, [('x', '<', 100)]) < 8 and files_read(zorder_dir, [('y', '<', 100)]) < 8
+
+    # optimize_table은 모든 파일을 정렬해 다시 나누어 씁니다.
+    optimize_table(unsorted_dir, target_file_size=16000, sort_by=['x'])
+    assert files_read(unsorted_dir, [('x', '<', 100)]) < files_read(unsorted_dir, [])
+    assert read_table(unsorted_dir)['x'].tolist() == sorted(df['x'])
+
+
+def test_transaction_publishes_tables_atomically(tmp_path, monkeypatch):
+    import time
+    import atio.snapshot as snapshot
+    orders, items = str(tmp_path / "orders"), str(tmp_path / "items")
+    write_snapshot(pd.DataFrame({'id': [1]}), orders)
+    write_snapshot(pd.DataFrame({'id': [1]}), items, catalog='sqlite')
+
+    # 결정 파일이 생기기 직전까지 reader는 두 테이블 모두 이전 버전을 봅니다.
+    seen_before_decision = []
+    original_decide = snapshot._decide_txn
+
+    def decide(decision_path, status):
+        seen_before_decision.append((len(read_table(orders)), len(read_table(items))))
+        return original_decide(decision_path, status)
+
+    monkeypatch.setattr(snapshot, '_decide_txn', decide)
+    with snapshot.transaction() as txn:
+        txn.write_snapshot(pd.DataFrame({'id': [2]}), orders, mode='append')
+        txn.write_snapshot(pd.DataFrame({'id': [2]}), items, mode='append')
+    assert seen_before_decision == [(1, 1)]
+    assert txn.versions == {orders: 2, items: 2}
+    assert len(read_table(orders)) == 2 and len(read_table(items)) == 2
+
+    # 한 테이블이라도 스테이징에 실패하면 어느 테이블에도 버전을 만들지 않습니다.
+    with pytest.raises(ValueError):
+        with snapshot.transaction() as txn:
+            txn.write_snapshot(pd.DataFrame({'id': [3]}), orders, mode='append')
+            txn.write_snapshot(object(), items, mode='append')
+    assert sorted(read_table(orders)['id']) == [1, 2]
+    assert snapshot._current_version(orders) == 2
+
+    # 느린 테이블이 스테이징하는 동안 먼저 끝난 테이블은 버전을 확보하지 않습니다.
+    versions_while_staging = []
+    original_write_files = snapshot._write_frame_files
+
+    def slow_write_files(obj, tmpdir, *args, **kwargs):
+        if tmpdir.startswith(items):
+            time.sleep(0.3)
+            versions_while_staging.append(snapshot._current_version(orders))
+        return original_write_files(obj, tmpdir, *args, **kwargs)
+
+    monkeypatch.setattr(snapshot, '_write_frame_files', slow_write_files)
+    with snapshot.transaction() as txn:
+        txn.write_snapshot(pd.DataFrame({'id': [5]}), orders, mode='append')
+        txn.write_snapshot(pd.DataFrame({'id': [5]}), items, mode='append')
+    assert versions_while_staging == [2]
+    assert txn.versions == {orders: 3, items: 3}
+    assert sorted(read_table(orders)['id']) == [1, 2, 5]
+
+
+def test_expire_keeps_version_visible_behind_pending_transaction(tmp_path, monkeypatch):
+    import atio.snapshot as snapshot
+    from atio import expire_snapshots
+    table = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1]}), table)
+
+    # 결정 파일이 생기지 않은 (커밋 도중 중단된) 트랜잭션 버전 v2
+    monkeypatch.setattr(snapshot._TXN_CONTEXT, 'decision_path', str(tmp_path / 'never-decided.json'), raising=False)
+    monkeypatch.setattr(snapshot._TXN_CONTEXT, 'staged', lambda: None, raising=False)
+    write_snapshot(pd.DataFrame({'id': [2]}), table, mode='append')
+    monkeypatch.setattr(snapshot._TXN_CONTEXT, 'decision_path', None)
+
+    # reader가 보는 v1은 keep_last=1이어도 만료되지 않습니다.
+    expire_snapshots(table, keep_for=None, keep_last=1, dry_run=False)
+    assert read_table(table)['id'].tolist() == [1]
+
+    monkeypatch.setattr(snapshot, '_TXN_WAIT_SECONDS', 0.1)
+    write_snapshot(pd.DataFrame({'id': [3]}), table, mode='append')
+    assert sorted(read_table(table)['id']) == [1, 3]
+
+
+@pytest.mark.parametrize('catalog', ['json', 'sqlite'])
+def test_expire_does_not_treat_aborted_version_as_oldest_live(tmp_path, monkeypatch, catalog):
+    import atio.snapshot as snapshot
+    from atio import expire_snapshots
+    table = str(tmp_path / "table")
+    write_snapshot(pd.DataFrame({'id': [1]}), table, catalog=catalog)
+
+    # 트랜잭션의 overwrite로 만든 v2가 중단되고, 이후 append(v3)는 v1 위에 쌓여 v1의 manifest를 참조합니다.
+    decision_path = str(tmp_path / 'aborted.json')
+    monkeypatch.setattr(snapshot._TXN_CONTEXT, 'decision_path', decision_path, raising=False)
+    monkeypatch.setattr(snapshot._TXN_CONTEXT, 'staged', lambda: None, raising=False)
+    write_snapshot(pd.DataFrame({'id': [2]}), table)
+    monkeypatch.setattr(snapshot._TXN_CONTEXT, 'decision_path', None)
+    snapshot._decide_txn(decision_path, 'aborted')
+    write_snapshot(pd.DataFrame({'id': [3]}), table, mode='append')
+
+    expire_snapshots(table, keep_for=None, keep_last=2, dry_run=False)
+    assert sorted(read_table(table)['id']) == [1, 3]
+
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watch_table_reports_new_versions(tmp_path, monkeypatch, use_inotify):
+    import threading
+    import time
+    import atio.watch
+    from atio import watch_table
+
+    if not use_inotify:
+        monkeypatch.setattr(atio.watch._DirectoryWatcher, 'open', classmethod(lambda cls, paths: None))
+    table = str(tmp_path / 'table')
+    write_snapshot(pd.DataFrame({'a': [1]}), table)
+
+    def writer():
+        for i in range(2):
+            time.sleep(0.2)
+            write_snapshot(pd.DataFrame({'a': [i]}), table, mode='append')
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    seen = []
+    watch_table(table, callback=lambda v: seen.append(v) or v < 3, timeout=5)
+    thread.join()
+    assert seen == [2, 3]
+
+    # 이미 커밋된 버전은 since 이후부터 바로 알려주고, 새 버전이 없으면 timeout 후 끝납니다.
+    assert list(watch_table(table, since=1, timeout=0.2)) == [3]
+
+
+@pytest.mark.parametrize('catalog', ['json', 'sqlite'])
+def test_schema_evolution_is_recorded_and_applied_on_read(tmp_path, catalog):
+    import pyarrow as pa
+    from atio.snapshot import _load_snapshot, _current_version
+    from atio import scan_table, table_info
+
+    table_dir = str(tmp_path / 'table')
+    write_snapshot(pd.DataFrame({'id': np.array([1, 2], dtype='int32'), 'name': ['a', 'b']}), table_dir, catalog=catalog)
+    # 새 컬럼 추가와 정수 타입 넓히기는 허용됩니다.
+    write_snapshot(pd.DataFrame({'id': np.array([3], dtype='int64'), 'name': ['c'], 'score': [0.5]}), table_dir,
+                   mode='append')
+    schema = {'id': 'int64', 'name': 'large_string', 'score': 'double'}
+    assert _load_snapshot(table_dir)[1]['schema'] == schema
+    assert table_info(table_dir)['columns'] == schema
+
+    # 이전 파일에 없는 컬럼은 null로, 좁은 타입은 넓어진 타입으로 읽힙니다.
+    result = read_table(table_dir, output_as='arrow')
+    assert result.schema == pa.schema([('id', pa.int64()), ('name', pa.large_string()), ('score', pa.float64())])
+    assert sorted(result.column('score').to_pylist(), key=str) == [0.5, None, None]
+    assert read_table(table_dir, columns=['id'], filters=[('score', '>', 0)])['id'].tolist() == [3]
+    assert scan_table(table_dir).collect().sort('id')['score'].to_list() == [None, None, 0.5]
+    assert scan_table(table_dir, output_as='arrow').to_table().num_rows == 3
+
+    # 기존 컬럼의 타입을 호환되지 않게 바꾸면 커밋하지 않습니다.
+    with pytest.raises(ValueError):
+        write_snapshot(pd.DataFrame({'id': ['x']}), table_dir, mode='append')
+    assert _current_version(table_dir) == 2
+
+    # overwrite는 새 데이터의 스키마로 테이블 스키마를 바꿉니다.
+    write_snapshot(pd.DataFrame({'id': ['x']}), table_dir)
+    assert _load_snapshot(table_dir)[1]['schema'] == {'id': 'large_string'}
+
+
+def test_delete_rows_and_upsert_after_adding_a_column(tmp_path):
+    from atio import delete_rows, upsert
+    table_dir = str(tmp_path / 'table')
+    write_snapshot(pd.DataFrame({'id': [1, 2]}), table_dir)
+    write_snapshot(pd.DataFrame({'id': [3, 4], 'score': [0.5, -1.0]}), table_dir, mode='append')
+
+    # 이전 파일에는 score 컬럼이 없으므로 null로 보고 조건을 평가합니다.
+    delete_rows(table_dir, [('score', '>', 0)])
+    assert sorted(read_table(table_dir)['id']) == [1, 2, 4]
+    upsert(pd.DataFrame({'id': [1], 'score': [2.0]}), table_dir, key='id')
+    result = read_table(table_dir).sort_values('id')
+    assert result['id'].tolist() == [1, 2, 4]
+    assert result['score'].tolist()[0] == 2.0
+
+
+def test_schema_evolution_widens_int64_to_double_and_keeps_categories(tmp_path):
+    import pyarrow as pa
+    from atio.snapshot import _load_snapshot
+
+    # NaN이 섞인 pandas 정수 컬럼은 float64이므로 int64 컬럼을 double로 넓혀 추가합니다.
+    table_dir = str(tmp_path / 'numbers')
+    write_snapshot(pd.DataFrame({'id': [1, 2**53 + 1]}), table_dir)
+    write_snapshot(pd.DataFrame({'id': [3.0, np.nan]}), table_dir, mode='append')
+    assert _load_snapshot(table_dir)[1]['schema'] == {'id': 'double'}
+    result = read_table(table_dir, output_as='arrow')
+    assert result.schema.field('id').type == pa.float64()
+    assert sorted(result.column('id').to_pylist(), key=str) == [1.0, 3.0, float(2**53), None]
+
+    # 범주형 컬럼끼리는 인덱스 타입만 넓히고 범주형으로 유지합니다.
+    table_dir = str(tmp_path / 'categories')
+    write_snapshot(pd.DataFrame({'tag': pd.Categorical(['a', 'b'])}), table_dir)
+    many = [f'c{i}' for i in range(300)]
+    write_snapshot(pd.DataFrame({'tag': pd.Categorical(many)}), table_dir, mode='append')
+    tag_type = _load_snapshot(table_dir)[1]['schema']['tag']
+    assert tag_type.startswith('dictionary<') and 'indices=int16' in tag_type
+    result = read_table(table_dir, output_as='arrow')
+    assert pa.types.is_dictionary(result.schema.field('tag').type)
+    assert sorted(result.column('tag').to_pylist()) == sorted(['a', 'b'] + many)
+    assert isinstance(read_table(table_dir)['tag'].dtype, pd.CategoricalDtype)